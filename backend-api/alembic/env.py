@@ -2,10 +2,15 @@ from logging.config import fileConfig
 
 from alembic import context
 from app.core.config import settings
+from app.models.access import ResourceAccess  # noqa: F401
 from app.models.base import Base
-from app.models.category import Category  # noqa: F401
+from app.models.category import Category, CategoryRank  # noqa: F401
+from app.models.meal_plan import MealPlanEntry, MealPlanTemplate  # noqa: F401
+from app.models.product import Product  # noqa: F401
 from app.models.recipe import Recipe  # noqa: F401
+from app.models.schema_marker import SchemaMarker  # noqa: F401
 from app.models.shopping_item import ShoppingItem  # noqa: F401
+from app.models.sync import IdempotencyKey, ShoppingItemChange  # noqa: F401
 from app.models.tag import Tag  # noqa: F401
 from app.models.user import User  # noqa: F401
 from sqlalchemy import engine_from_config, pool
@@ -0,0 +1,35 @@
+"""log list access changes in shopping_item_changes
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "a3b4c5d6e7f8"
+down_revision: str | Sequence[str] | None = "f2a3b4c5d6e7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Rows with user_id and no item_id: that user gained or lost the list
+    with op.batch_alter_table("shopping_item_changes") as batch_op:
+        batch_op.add_column(sa.Column("user_id", UUID(as_uuid=True), nullable=True))
+        batch_op.alter_column("item_id", existing_type=UUID(as_uuid=True), nullable=True)
+    op.create_index(
+        "ix_shopping_item_changes_user_revision", "shopping_item_changes", ["user_id", "revision"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shopping_item_changes_user_revision", table_name="shopping_item_changes")
+    op.execute("DELETE FROM shopping_item_changes WHERE item_id IS NULL")
+    with op.batch_alter_table("shopping_item_changes") as batch_op:
+        batch_op.alter_column("item_id", existing_type=UUID(as_uuid=True), nullable=False)
+        batch_op.drop_column("user_id")
@@ -0,0 +1,26 @@
+"""add request fingerprint and status code to idempotency_keys
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: str | Sequence[str] | None = "f6a7b8c9d0e1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("idempotency_keys", sa.Column("request_fingerprint", sa.String(), nullable=True))
+    op.add_column("idempotency_keys", sa.Column("status_code", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "status_code")
+    op.drop_column("idempotency_keys", "request_fingerprint")
@@ -0,0 +1,29 @@
+"""record the writing transaction of shopping_item_changes
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "b4c5d6e7f8a9"
+down_revision: str | Sequence[str] | None = "a3b4c5d6e7f8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # On PostgreSQL sync cursors compare transaction IDs, not revisions
+    with op.batch_alter_table("shopping_item_changes") as batch_op:
+        batch_op.add_column(sa.Column("txid", sa.BigInteger(), nullable=True))
+    op.create_index("ix_shopping_item_changes_list_txid", "shopping_item_changes", ["list_id", "txid"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shopping_item_changes_list_txid", table_name="shopping_item_changes")
+    with op.batch_alter_table("shopping_item_changes") as batch_op:
+        batch_op.drop_column("txid")
@@ -0,0 +1,90 @@
+"""add products dictionary; items and ingredients reference it by ID
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "b8c9d0e1f2a3"
+down_revision: str | Sequence[str] | None = "a7b8c9d0e1f2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _normalize(name: str) -> str:
+    # Same as app.models.product.normalize_name; SQL lower() is ASCII-only on SQLite
+    return name.strip().lower()
+
+
+def upgrade() -> None:
+    products = op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.UniqueConstraint("name", name="uq_products_name"),
+    )
+    op.add_column("shopping_items", sa.Column("product_id", sa.Integer(), nullable=True))
+    op.add_column("ingredients", sa.Column("product_id", sa.Integer(), nullable=True))
+
+    conn = op.get_bind()
+    item_names = conn.execute(sa.text("SELECT DISTINCT name_norm FROM shopping_items")).scalars().all()
+    ingredient_names = conn.execute(sa.text("SELECT DISTINCT name FROM ingredients")).scalars().all()
+
+    normalized = sorted({_normalize(n) for n in (*item_names, *ingredient_names)})
+    if normalized:
+        op.bulk_insert(products, [{"name": n} for n in normalized])
+    product_ids: dict[str, int] = {
+        row.name: row.id for row in conn.execute(sa.text("SELECT name, id FROM products"))
+    }
+
+    if item_names:
+        conn.execute(
+            sa.text("UPDATE shopping_items SET product_id = :product_id WHERE name_norm = :name"),
+            [{"product_id": product_ids[_normalize(n)], "name": n} for n in item_names],
+        )
+    if ingredient_names:
+        conn.execute(
+            sa.text("UPDATE ingredients SET product_id = :product_id WHERE name = :name"),
+            [{"product_id": product_ids[_normalize(n)], "name": n} for n in ingredient_names],
+        )
+
+    with op.batch_alter_table("shopping_items") as batch_op:
+        batch_op.alter_column("product_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key("fk_shopping_items_product_id", "products", ["product_id"], ["id"])
+        batch_op.drop_constraint("uq_shopping_per_source", type_="unique")
+        batch_op.create_unique_constraint(
+            "uq_shopping_per_source", ["list_id", "product_id", "unit_norm", "recipe_id"]
+        )
+        batch_op.drop_column("name_norm")
+
+    with op.batch_alter_table("ingredients") as batch_op:
+        batch_op.alter_column("product_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key("fk_ingredients_product_id", "products", ["product_id"], ["id"])
+
+
+def downgrade() -> None:
+    op.add_column("shopping_items", sa.Column("name_norm", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE shopping_items SET name_norm = "
+        "(SELECT products.name FROM products WHERE products.id = shopping_items.product_id)"
+    )
+
+    with op.batch_alter_table("shopping_items") as batch_op:
+        batch_op.drop_constraint("uq_shopping_per_source", type_="unique")
+        batch_op.create_unique_constraint(
+            "uq_shopping_per_source", ["list_id", "name_norm", "unit_norm", "recipe_id"]
+        )
+        batch_op.drop_constraint("fk_shopping_items_product_id", type_="foreignkey")
+        batch_op.drop_column("product_id")
+        batch_op.alter_column("name_norm", existing_type=sa.String(), nullable=False)
+
+    with op.batch_alter_table("ingredients") as batch_op:
+        batch_op.drop_constraint("fk_ingredients_product_id", type_="foreignkey")
+        batch_op.drop_column("product_id")
+
+    op.drop_table("products")
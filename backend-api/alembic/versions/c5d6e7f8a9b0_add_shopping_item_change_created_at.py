@@ -0,0 +1,32 @@
+"""timestamp shopping_item_changes for retention
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c5d6e7f8a9b0"
+down_revision: str | Sequence[str] | None = "b4c5d6e7f8a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Existing rows count from the upgrade; SQLite can't ALTER ADD a column
+    # with a non-constant default, hence the table copy
+    with op.batch_alter_table("shopping_item_changes", recreate="always") as batch_op:
+        batch_op.add_column(
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+        )
+    op.create_index("ix_shopping_item_changes_created_at", "shopping_item_changes", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shopping_item_changes_created_at", table_name="shopping_item_changes")
+    with op.batch_alter_table("shopping_item_changes") as batch_op:
+        batch_op.drop_column("created_at")
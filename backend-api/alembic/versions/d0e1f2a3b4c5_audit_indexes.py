@@ -0,0 +1,74 @@
+"""index audit: drop redundant indexes, add covering/partial ones for hot paths
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "d0e1f2a3b4c5"
+down_revision: str | Sequence[str] | None = "c9d0e1f2a3b4"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Prefixes of wider indexes / unique constraints that already exist
+    op.drop_index("ix_shopping_items_list_id", table_name="shopping_items")  # uq_shopping_per_source
+    op.drop_index("ix_tags_user_id", table_name="tags")  # uq_tag_user_name
+    op.drop_index("ix_categories_user_id", table_name="categories")  # uq_category_user_name
+    op.drop_index("ix_meal_plan_entries_user_id", table_name="meal_plan_entries")  # uq_meal_plan_user_date_slot
+    op.drop_index(
+        "ix_password_reset_codes_email", table_name="password_reset_codes"
+    )  # ix_password_reset_codes_email_used_expires_at
+    # Same columns as the primary key
+    with op.batch_alter_table("shopping_list_shares") as batch_op:
+        batch_op.drop_constraint("uq_shopping_list_share", type_="unique")
+
+    # Suggestions and category hints: a user's items by product
+    op.drop_index("ix_shopping_items_user_id", table_name="shopping_items")
+    op.create_index(
+        "ix_shopping_items_user_product",
+        "shopping_items",
+        ["user_id", "product_id"],
+        postgresql_include=["name", "category_id"],
+    )
+    # Clearing checked items and the per-list checked count
+    op.create_index(
+        "ix_shopping_items_list_checked",
+        "shopping_items",
+        ["list_id"],
+        postgresql_where=sa.text("checked"),
+        sqlite_where=sa.text("checked = 1"),
+    )
+    # Recipe ingredients were only reachable by a full scan
+    op.create_index(
+        "ix_ingredients_recipe_product",
+        "ingredients",
+        ["recipe_id", "product_id"],
+        postgresql_include=["name", "category_id"],
+    )
+    # "Shared with me" and user deletion; the primary keys lead with the resource
+    op.create_index("ix_recipe_shares_user_id", "recipe_shares", ["user_id", "recipe_id"])
+    op.create_index("ix_shopping_list_shares_user_id", "shopping_list_shares", ["user_id", "list_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shopping_list_shares_user_id", table_name="shopping_list_shares")
+    op.drop_index("ix_recipe_shares_user_id", table_name="recipe_shares")
+    op.drop_index("ix_ingredients_recipe_product", table_name="ingredients")
+    op.drop_index("ix_shopping_items_list_checked", table_name="shopping_items")
+    op.drop_index("ix_shopping_items_user_product", table_name="shopping_items")
+    op.create_index("ix_shopping_items_user_id", "shopping_items", ["user_id"])
+
+    with op.batch_alter_table("shopping_list_shares") as batch_op:
+        batch_op.create_unique_constraint("uq_shopping_list_share", ["list_id", "user_id"])
+    op.create_index("ix_password_reset_codes_email", "password_reset_codes", ["email"])
+    op.create_index("ix_meal_plan_entries_user_id", "meal_plan_entries", ["user_id"])
+    op.create_index("ix_categories_user_id", "categories", ["user_id"])
+    op.create_index("ix_tags_user_id", "tags", ["user_id"])
+    op.create_index("ix_shopping_items_list_id", "shopping_items", ["list_id"])
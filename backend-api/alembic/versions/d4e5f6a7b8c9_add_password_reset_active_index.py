@@ -0,0 +1,27 @@
+"""add composite index for active password reset code lookup
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "d4e5f6a7b8c9"
+down_revision: str | Sequence[str] | None = "c3d4e5f6a7b8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_password_reset_codes_email_used_expires_at",
+        "password_reset_codes",
+        ["email", "used", "expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_password_reset_codes_email_used_expires_at", table_name="password_reset_codes")
@@ -0,0 +1,27 @@
+"""drop ix_shopping_items_list_category_name
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "d6e7f8a9b0c1"
+down_revision: str | Sequence[str] | None = "c5d6e7f8a9b0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The store-walk sort leads with the joined category rank, so this index
+    # never served it; lookups by list use uq_shopping_per_source
+    op.drop_index("ix_shopping_items_list_category_name", table_name="shopping_items")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_shopping_items_list_category_name", "shopping_items", ["list_id", "category_id", "name"]
+    )
@@ -0,0 +1,47 @@
+"""add meal_plan_templates; allow cleared meal plan entries
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "e1f2a3b4c5d6"
+down_revision: str | Sequence[str] | None = "d0e1f2a3b4c5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "meal_plan_templates",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "recipe_id", UUID(as_uuid=True), sa.ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("meal_slot", sa.String(), nullable=False),
+        sa.Column("starts_on", sa.Date(), nullable=False),
+        sa.Column("ends_on", sa.Date(), nullable=True),
+        sa.Column("interval_weeks", sa.Integer(), nullable=False),
+        sa.CheckConstraint("interval_weeks IN (1, 2)", name="ck_meal_plan_templates_interval"),
+    )
+    op.create_index("ix_meal_plan_templates_user_id", "meal_plan_templates", ["user_id"])
+
+    # A row without a recipe overrides a template occurrence the user cleared
+    with op.batch_alter_table("meal_plan_entries") as batch_op:
+        batch_op.alter_column("recipe_id", existing_type=UUID(as_uuid=True), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM meal_plan_entries WHERE recipe_id IS NULL")
+    with op.batch_alter_table("meal_plan_entries") as batch_op:
+        batch_op.alter_column("recipe_id", existing_type=UUID(as_uuid=True), nullable=False)
+
+    op.drop_index("ix_meal_plan_templates_user_id", table_name="meal_plan_templates")
+    op.drop_table("meal_plan_templates")
@@ -0,0 +1,52 @@
+"""add resource_access table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "e5f6a7b8c9d0"
+down_revision: str | Sequence[str] | None = "d4e5f6a7b8c9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resource_access",
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("resource_type", sa.String(), nullable=False),
+        sa.Column("resource_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "resource_type", "resource_id"),
+    )
+    op.create_index("ix_resource_access_resource", "resource_access", ["resource_type", "resource_id"])
+
+    # Backfill: owners first, then shares (skipping any self-share of the owner)
+    op.execute(
+        """
+        INSERT INTO resource_access (user_id, resource_type, resource_id, role)
+        SELECT user_id, 'shopping_list', id, 'owner' FROM shopping_lists
+        UNION ALL
+        SELECT s.user_id, 'shopping_list', s.list_id, 'member'
+        FROM shopping_list_shares s JOIN shopping_lists l ON l.id = s.list_id
+        WHERE s.user_id <> l.user_id
+        UNION ALL
+        SELECT user_id, 'recipe', id, 'owner' FROM recipes
+        UNION ALL
+        SELECT s.user_id, 'recipe', s.recipe_id, 'member'
+        FROM recipe_shares s JOIN recipes r ON r.id = s.recipe_id
+        WHERE s.user_id <> r.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resource_access_resource", table_name="resource_access")
+    op.drop_table("resource_access")
@@ -0,0 +1,30 @@
+"""add schema_markers
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "f2a3b4c5d6e7"
+down_revision: str | Sequence[str] | None = "e1f2a3b4c5d6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Empty on upgrade: the first startup seeds the predefined categories
+    # once more and records their version here
+    op.create_table(
+        "schema_markers",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.String(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("schema_markers")
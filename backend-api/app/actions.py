@@ -1,14 +1,41 @@
 import typing as t
 from uuid import UUID
 
-from sqlalchemy import or_, select
+from fastapi import HTTPException
+from sqlalchemy import (
+    ColumnElement,
+    ScalarSelect,
+    and_,
+    delete,
+    event,
+    exists,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.orm import Session
 
-from app.models.category import Category
-from app.models.recipe import Recipe
-from app.models.shopping_item import ShoppingItem, ShoppingList
-from app.models.user import User
-from app.schemas.shopping_item import ShoppingItemIn
+from app.models.access import (
+    RESOURCE_RECIPE,
+    RESOURCE_SHOPPING_LIST,
+    ResourceAccess,
+)
+from app.models.category import Category, CategoryRank
+from app.models.product import Product, normalize_name
+from app.models.recipe import Recipe, recipe_shares
+from app.models.shopping_item import ShoppingItem, ShoppingList, shopping_list_shares
+from app.models.sync import (
+    record_access_changes,
+    record_item_changes,
+    record_item_changes_matching,
+)
+from app.schemas.shopping_item import (
+    ShoppingItemBulkOp,
+    ShoppingItemBulkResult,
+    ShoppingItemIn,
+    ShoppingItemUpdate,
+)
+from app.units import add_quantities, compatible_units, convert
 
 
 def resolve_category_id(
@@ -24,13 +51,29 @@ def resolve_category_id(
         )
     )
     if cat is None:
-        from fastapi import HTTPException
         raise HTTPException(status_code=400, detail="Invalid category")
     return category_id
 
 
+def valid_category_ids(
+    db: Session, category_ids: t.Iterable[UUID], user_id: UUID
+) -> set[UUID]:
+    """Batch variant of resolve_category_id: return the subset usable by the user."""
+    ids = set(category_ids)
+    if not ids:
+        return set()
+    return set(
+        db.scalars(
+            select(Category.id).where(
+                Category.id.in_(ids),
+                or_(Category.user_id == user_id, Category.user_id.is_(None)),
+            )
+        ).all()
+    )
+
+
 def normalize_key(name: str, unit: str | None) -> tuple[str, str]:
-    name_norm = name.strip().lower()
+    name_norm = normalize_name(name)
 
     if unit is None:
         unit_norm = ""
@@ -40,51 +83,324 @@ def normalize_key(name: str, unit: str | None) -> tuple[str, str]:
     return name_norm, unit_norm
 
 
+def product_id_of(name_norm: str) -> ScalarSelect[int]:
+    """Product ID of a normalized name, as a subquery (NULL matches no item)."""
+    return select(Product.id).where(Product.name == name_norm).scalar_subquery()
+
+
 def create_or_merge_item(
-    *, db: Session, shopping_list: ShoppingList, data: ShoppingItemIn
+    *,
+    db: Session,
+    shopping_list: ShoppingList,
+    data: ShoppingItemIn,
+    item_id: UUID | None = None,
+    category_guess: ScalarSelect[UUID] | None = None,
+    leftover_unit: str | None = None,
+    commit: bool = True,
 ) -> ShoppingItem:
+    """
+    Add an item, or merge the quantity into an existing one with the same
+    (name, unit, recipe). Compatible units are summed and rescaled
+    (500 g + 1 kg = 1.5 kg). `item_id` lets offline clients pick the ID of a
+    new item; a merged item keeps its own ID. `category_guess` (see
+    app.category_hints) is used when `data` carries no category.
+    `leftover_unit` is a recipe unit with no shopping-list equivalent (see
+    app.units.to_shopping_unit); it takes the place of the unit in the merge
+    key, so 2 łyżka and 1 szklanka of sugar stay separate items.
+    With commit=False the change is only flushed, for callers that commit
+    more in the same transaction.
+    """
+    category_id = data.category_id if data.category_id is not None else category_guess
     clean_name = data.name.strip()
     clean_unit = data.unit.strip() if data.unit is not None else None
-    name_norm, unit_norm = normalize_key(clean_name, clean_unit)
+    name_norm, unit_norm = normalize_key(clean_name, clean_unit if leftover_unit is None else leftover_unit)
 
     recipe_id = data.recipe_id
 
-    existing = db.scalar(
-        select(ShoppingItem).where(
+    # Same product in a convertible unit (g/kg, ml/l) merges too; exact unit first
+    matches = db.scalars(
+        select(ShoppingItem)
+        .where(
             ShoppingItem.list_id == shopping_list.id,
-            ShoppingItem.name_norm == name_norm,
-            ShoppingItem.unit_norm == unit_norm,
+            ShoppingItem.product_id == product_id_of(name_norm),
+            ShoppingItem.unit_norm.in_(compatible_units(unit_norm)),
             ShoppingItem.recipe_id == recipe_id,
         )
-    )
+        .order_by(ShoppingItem.unit_norm != unit_norm)
+    ).all()
 
-    if existing:
-        existing.quantity += data.quantity
+    if matches:
+        existing, *duplicates = matches
+        quantity, unit = data.quantity, unit_norm
+        for duplicate in duplicates:
+            quantity, unit = add_quantities(quantity, unit, duplicate.quantity, duplicate.unit_norm)
+            db.delete(duplicate)
+        # Remove duplicates before existing may take over one of their units
+        db.flush()
+
+        total, total_unit = add_quantities(existing.quantity, existing.unit_norm, quantity, unit)
+        if total_unit != existing.unit_norm:
+            existing.unit = total_unit
+            existing.unit_norm = total_unit
+        existing.quantity = total
         existing.checked = False
-        if existing.category_id is None and data.category_id is not None:
-            existing.category_id = data.category_id
-        db.commit()
-        db.refresh(existing)
+        if existing.category_id is None and category_id is not None:
+            existing.category_id = category_id
+        _save(db, existing, commit)
         return existing
 
     new_item = ShoppingItem(
+        id=item_id,
         user_id=shopping_list.user_id,
         list_id=shopping_list.id,
         recipe_id=recipe_id,
         name=clean_name,
         unit=clean_unit,
         quantity=data.quantity,
+        note=data.note,
         checked=False,
-        name_norm=name_norm,
         unit_norm=unit_norm,
-        category_id=data.category_id,
+        category_id=category_id,
     )
     db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    _save(db, new_item, commit)
     return new_item
 
 
+def _save(db: Session, item: ShoppingItem, commit: bool) -> None:
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    db.refresh(item)
+
+
+def category_walk_order() -> list[ColumnElement[t.Any]]:
+    """
+    ORDER BY clauses for categories in a user's store-walk order: ranked
+    categories first, then system categories and the user's own by name.
+    Expects Category and the user's CategoryRank to be (outer) joined.
+    """
+    return [
+        CategoryRank.rank.is_(None),
+        CategoryRank.rank.asc(),
+        Category.user_id.is_not(None),
+        Category.name.asc(),
+    ]
+
+
+def list_item_rows(
+    db: Session, *criteria: ColumnElement[bool], walk_order_for: UUID | None = None
+) -> list[dict[str, t.Any]]:
+    """
+    Items matching `criteria` as plain dicts shaped like ShoppingItemOut (plus
+    list_id). Ordered by name, or with `walk_order_for` by that user's
+    category order and then name, uncategorized items last. Selects only
+    the needed columns, so no ORM objects or recipe descriptions are loaded.
+    """
+    stmt = (
+        select(
+            ShoppingItem.id,
+            ShoppingItem.list_id,
+            ShoppingItem.name,
+            ShoppingItem.quantity,
+            ShoppingItem.unit,
+            ShoppingItem.note,
+            ShoppingItem.recipe_id,
+            ShoppingItem.category_id,
+            ShoppingItem.checked,
+            Recipe.title.label("recipe_title"),
+            Category.name.label("category_name"),
+            Category.icon.label("category_icon"),
+            Category.user_id.label("category_user_id"),
+        )
+        .outerjoin(Recipe, Recipe.id == ShoppingItem.recipe_id)
+        .outerjoin(Category, Category.id == ShoppingItem.category_id)
+        .where(*criteria)
+    )
+    if walk_order_for is None:
+        stmt = stmt.order_by(ShoppingItem.name)
+    else:
+        stmt = stmt.outerjoin(
+            CategoryRank,
+            and_(CategoryRank.user_id == walk_order_for, CategoryRank.category_id == ShoppingItem.category_id),
+        ).order_by(ShoppingItem.category_id.is_(None), *category_walk_order(), ShoppingItem.name)
+
+    rows = db.execute(stmt)
+    return [
+        {
+            "id": row.id,
+            "list_id": row.list_id,
+            "name": row.name,
+            "quantity": row.quantity,
+            "unit": row.unit,
+            "note": row.note,
+            "recipe_id": row.recipe_id,
+            "category_id": row.category_id,
+            "checked": row.checked,
+            "recipe_title": row.recipe_title,
+            "category": {
+                "id": row.category_id,
+                "name": row.category_name,
+                "icon": row.category_icon,
+                "is_system": row.category_user_id is None,
+            }
+            if row.category_name is not None
+            else None,
+        }
+        for row in rows
+    ]
+
+
+def delete_list_items(
+    db: Session,
+    list_id: UUID,
+    *,
+    checked_only: bool = False,
+    recipe_id: UUID | None = None,
+) -> list[UUID]:
+    """Delete a list's items with a single DELETE and return the IDs of removed rows."""
+    stmt = delete(ShoppingItem).where(ShoppingItem.list_id == list_id)
+    if checked_only:
+        stmt = stmt.where(ShoppingItem.checked)
+    if recipe_id is not None:
+        stmt = stmt.where(ShoppingItem.recipe_id == recipe_id)
+
+    deleted = list(db.scalars(stmt.returning(ShoppingItem.id)).all())
+    record_item_changes(db, list_id, deleted)
+    return deleted
+
+
+def bulk_update_items(
+    db: Session,
+    list_id: UUID,
+    ops: t.Sequence[ShoppingItemBulkOp],
+    user_id: UUID,
+) -> list[ShoppingItemBulkResult]:
+    """
+    Apply a batch of item patches in one transaction:
+    - an op with a foreign category is rejected on its own; other ops on
+      the same item still apply
+    - valid ops targeting the same item are coalesced in order (later fields win)
+    - items sharing identical new values are updated with a single UPDATE
+    - one result per op, in request order
+    """
+    allowed_categories = valid_category_ids(
+        db, {op.category_id for op in ops if op.category_id is not None}, user_id
+    )
+
+    invalid: set[int] = set()
+    changes: dict[UUID, dict[str, t.Any]] = {}
+    for index, op in enumerate(ops):
+        if op.category_id is not None and op.category_id not in allowed_categories:
+            invalid.add(index)
+            continue
+        changes.setdefault(op.id, {}).update(op.model_dump(exclude_unset=True, exclude={"id"}))
+
+    groups: dict[tuple[tuple[str, t.Any], ...], list[UUID]] = {}
+    for item_id, values in changes.items():
+        values = {k: v for k, v in values.items() if v is not None or k in ("note", "category_id")}
+        groups.setdefault(tuple(sorted(values.items())), []).append(item_id)
+
+    found: set[UUID] = set()
+    for values_key, item_ids in groups.items():
+        in_list = (ShoppingItem.list_id == list_id, ShoppingItem.id.in_(item_ids))
+        if values_key:
+            updated = db.scalars(
+                update(ShoppingItem)
+                .where(*in_list)
+                .values(dict(values_key))
+                .returning(ShoppingItem.id)
+            )
+            found.update(updated.all())
+        else:
+            # empty patch: only report whether the item exists
+            found.update(db.scalars(select(ShoppingItem.id).where(*in_list)).all())
+
+    record_item_changes(db, list_id, found)
+    db.commit()
+
+    results: list[ShoppingItemBulkResult] = []
+    for index, op in enumerate(ops):
+        if index in invalid:
+            results.append(ShoppingItemBulkResult(id=op.id, status="invalid", detail="Invalid category"))
+        elif op.id in found:
+            results.append(ShoppingItemBulkResult(id=op.id, status="updated"))
+        else:
+            results.append(ShoppingItemBulkResult(id=op.id, status="not_found", detail="Item not found"))
+    return results
+
+
+def update_list_item(
+    db: Session, item: ShoppingItem, patch: ShoppingItemUpdate, user_id: UUID, *, commit: bool = True
+) -> ShoppingItem:
+    """
+    Apply a partial update and commit (or only flush, with commit=False).
+    When the new (name, unit) collides with another item from the same
+    source, the two are merged and the surviving item is returned. Raises
+    400 on an empty name or foreign category.
+    """
+    data = patch.model_dump(exclude_unset=True)
+
+    if "name" in data and (data["name"] is None or data["name"].strip() == ""):
+        raise HTTPException(status_code=400, detail="Name cannot be empty")
+
+    target_name = item.name
+    target_unit = item.unit
+
+    if "name" in data and data["name"] is not None:
+        target_name = data["name"].strip()
+
+    if "unit" in data:
+        if data["unit"] is None:
+            target_unit = None
+        else:
+            target_unit = data["unit"].strip()
+
+    if "quantity" in data and data["quantity"] is not None:
+        item.quantity = data["quantity"]
+
+    if "checked" in data and data["checked"] is not None:
+        item.checked = data["checked"]
+
+    if "note" in data:
+        item.note = data["note"]
+
+    if "recipe_id" in data:
+        item.recipe_id = data["recipe_id"] if data["recipe_id"] else None
+
+    if "category_id" in data:
+        item.category_id = resolve_category_id(db, data["category_id"], user_id)
+
+    if target_name == item.name and target_unit == item.unit:
+        _save(db, item, commit)
+        return item
+
+    existing, _, unit_norm = find_and_merge_existing(
+        db=db,
+        list_id=item.list_id,
+        name=target_name,
+        unit=target_unit,
+        quantity=item.quantity,
+        recipe_id=item.recipe_id,
+        exclude_item_id=item.id,
+        # An unchanged unit keeps its key, including a leftover recipe unit
+        unit_norm=item.unit_norm if target_unit == item.unit else None,
+    )
+
+    if existing:
+        db.delete(item)
+        _save(db, existing, commit)
+        return existing
+
+    item.name = target_name
+    item.unit = target_unit
+    item.unit_norm = unit_norm
+
+    _save(db, item, commit)
+    return item
+
+
 def find_and_merge_existing(
     *,
     db: Session,
@@ -94,46 +410,178 @@ def find_and_merge_existing(
     quantity: float,
     recipe_id: UUID | None = None,
     exclude_item_id: UUID | None = None,
+    unit_norm: str | None = None,
 ) -> t.Tuple[ShoppingItem | None, str, str]:
     """
     Core logic:
-    - normalize (name, unit)
-    - find existing item in given list with same normalized key AND same recipe_id
-      (optionally excluding one item)
+    - normalize (name, unit); `unit_norm`, if given, is used as is
+    - find existing item in given list with same normalized key (or a convertible
+      unit) AND same recipe_id (optionally excluding one item)
     - if found: merge quantity, uncheck
     - return (existing_or_none, name_norm, unit_norm)
     """
-    name_norm, unit_norm = normalize_key(name, unit)
+    name_norm, derived_unit_norm = normalize_key(name, unit)
+    if unit_norm is None:
+        unit_norm = derived_unit_norm
 
-    q = select(ShoppingItem).where(
-        ShoppingItem.list_id == list_id,
-        ShoppingItem.name_norm == name_norm,
-        ShoppingItem.unit_norm == unit_norm,
-        ShoppingItem.recipe_id == recipe_id,
+    q = (
+        select(ShoppingItem)
+        .where(
+            ShoppingItem.list_id == list_id,
+            ShoppingItem.product_id == product_id_of(name_norm),
+            ShoppingItem.unit_norm.in_(compatible_units(unit_norm)),
+            ShoppingItem.recipe_id == recipe_id,
+        )
+        .order_by(ShoppingItem.unit_norm != unit_norm)
     )
 
     if exclude_item_id is not None:
         q = q.where(ShoppingItem.id != exclude_item_id)
 
-    existing = db.scalar(q)
+    existing = db.scalars(q).first()
     if existing:
-        existing.quantity += quantity
+        # Converted into the existing unit, so no other row's unit is taken over
+        existing.quantity += convert(quantity, unit_norm, existing.unit_norm)
         existing.checked = False
         return existing, name_norm, unit_norm
 
     return None, name_norm, unit_norm
 
 
-def user_can_edit_list(user: User, shopping_list: ShoppingList) -> bool:
-    return shopping_list.user_id == user.id or any(
-        u.id == user.id for u in shopping_list.shared_with_users
+# ---------------------------------- Access ----------------------------------
+#
+# Access answers are memoized on the session (one session per request) and
+# dropped on commit/rollback, since sharing changes only become visible then.
+
+_ACCESS_CACHE = "access_cache"
+
+
+def _access_cache(db: Session) -> dict[tuple[str, UUID, UUID], bool]:
+    return db.info.setdefault(_ACCESS_CACHE, {})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _reset_access_cache(session: Session, *_: t.Any) -> None:
+    session.info.pop(_ACCESS_CACHE, None)
+
+
+def list_access_clause(user_id: UUID) -> ColumnElement[bool]:
+    """Owner, or an EXISTS probe on the (list_id, user_id) primary key of shares."""
+    return or_(
+        ShoppingList.user_id == user_id,
+        exists().where(
+            shopping_list_shares.c.list_id == ShoppingList.id,
+            shopping_list_shares.c.user_id == user_id,
+        ),
+    )
+
+
+def recipe_access_clause(user_id: UUID) -> ColumnElement[bool]:
+    return or_(
+        Recipe.user_id == user_id,
+        exists().where(
+            recipe_shares.c.recipe_id == Recipe.id,
+            recipe_shares.c.user_id == user_id,
+        ),
+    )
+
+
+def get_list_for_user(db: Session, list_id: UUID, user_id: UUID) -> ShoppingList | None:
+    """Fetch a list the user owns or is shared on, with the access check in the same query."""
+    shopping_list = db.scalar(
+        select(ShoppingList).where(ShoppingList.id == list_id, list_access_clause(user_id))
+    )
+    _access_cache(db)[("list", list_id, user_id)] = shopping_list is not None
+    return shopping_list
+
+
+def get_recipe_for_user(db: Session, recipe_id: UUID, user_id: UUID) -> Recipe | None:
+    recipe = db.scalar(
+        select(Recipe).where(Recipe.id == recipe_id, recipe_access_clause(user_id))
+    )
+    _access_cache(db)[("recipe", recipe_id, user_id)] = recipe is not None
+    return recipe
+
+
+def user_can_access_list(db: Session, list_id: UUID, user_id: UUID) -> bool:
+    """Access check for endpoints that don't need the list row itself."""
+    key = ("list", list_id, user_id)
+    cache = _access_cache(db)
+    if key not in cache:
+        cache[key] = bool(
+            db.scalar(
+                select(
+                    exists().where(ShoppingList.id == list_id, list_access_clause(user_id))
+                )
+            )
+        )
+    return cache[key]
+
+
+def user_can_access_recipe(db: Session, recipe_id: UUID, user_id: UUID) -> bool:
+    key = ("recipe", recipe_id, user_id)
+    cache = _access_cache(db)
+    if key not in cache:
+        cache[key] = bool(
+            db.scalar(
+                select(exists().where(Recipe.id == recipe_id, recipe_access_clause(user_id)))
+            )
+        )
+    return cache[key]
+
+
+def revoke_resource_access(db: Session, resource_type: str, resource_id: UUID) -> None:
+    """Drop access rows of a resource removed with a set-based DELETE (no ORM flush hook)."""
+    if resource_type == RESOURCE_SHOPPING_LIST:
+        record_access_changes(
+            db.connection(),
+            select(ResourceAccess.resource_id, ResourceAccess.user_id).where(
+                ResourceAccess.resource_type == resource_type,
+                ResourceAccess.resource_id == resource_id,
+            ),
+        )
+    db.execute(
+        delete(ResourceAccess).where(
+            ResourceAccess.resource_type == resource_type,
+            ResourceAccess.resource_id == resource_id,
+        )
     )
 
 
-def user_can_edit_recipe(user: User, recipe: Recipe) -> bool:
-    return recipe.user_id == user.id or any(
-        u.id == user.id for u in recipe.shared_with_users
+def revoke_owned_resource_access(db: Session, user_id: UUID) -> None:
+    """
+    Drop other users' access rows to everything the user owns, ahead of
+    account deletion, and log what the cascade does to lists and items
+    other users still sync.
+    """
+    owned_lists = select(ShoppingList.id).where(ShoppingList.user_id == user_id)
+    owned_recipes = select(Recipe.id).where(Recipe.user_id == user_id)
+    record_access_changes(
+        db.connection(),
+        select(ResourceAccess.resource_id, ResourceAccess.user_id).where(
+            ResourceAccess.resource_type == RESOURCE_SHOPPING_LIST,
+            ResourceAccess.resource_id.in_(owned_lists),
+            ResourceAccess.user_id != user_id,
+        ),
+    )
+    # Items in lists shared by others lose their recipe (SET NULL). User
+    # categories have no FK to users and outlive the account, so items keep them
+    record_item_changes_matching(
+        db,
+        ShoppingItem.list_id.not_in(owned_lists),
+        ShoppingItem.recipe_id.in_(owned_recipes),
     )
+    for resource_type, owned in (
+        (RESOURCE_SHOPPING_LIST, owned_lists),
+        (RESOURCE_RECIPE, owned_recipes),
+    ):
+        db.execute(
+            delete(ResourceAccess).where(
+                ResourceAccess.resource_type == resource_type,
+                ResourceAccess.resource_id.in_(owned),
+            )
+        )
 
 
 def list_participants(lst: ShoppingList) -> set[UUID]:
@@ -0,0 +1,104 @@
+"""
+Category inference for new shopping items.
+
+Each user's map of normalized product name -> category is built once from
+their shopping items and recipe ingredients (the most used category wins)
+and then kept current from the categories they pick. Maps live in a
+per-process LRU; a stale or foreign category never reaches the database
+because guesses are applied through `usable_category`.
+"""
+import threading
+from collections import Counter, OrderedDict
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.product import Product, normalize_name
+from app.models.recipe import Ingredient, Recipe
+from app.models.shopping_item import ShoppingItem
+from sqlalchemy import ScalarSelect, func, or_, select, union_all
+from sqlalchemy.orm import Session
+
+
+class CategoryHints:
+    def __init__(self, max_users: int) -> None:
+        self.max_users = max_users
+        self._maps: OrderedDict[UUID, dict[str, UUID]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def guess(self, db: Session, user_id: UUID, name: str) -> UUID | None:
+        """Category the user most likely wants for `name`; loads their history on first use."""
+        with self._lock:
+            hints = self._maps.get(user_id)
+            if hints is not None:
+                self._maps.move_to_end(user_id)
+        if hints is None:
+            hints = _load_history(db, user_id)
+            self._store(user_id, hints)
+        return hints.get(normalize_name(name))
+
+    def remember(self, user_id: UUID, name: str, category_id: UUID | None) -> None:
+        """Record a category the user picked; only maps already in memory are updated."""
+        if category_id is None:
+            return
+        with self._lock:
+            hints = self._maps.get(user_id)
+            if hints is not None:
+                hints[normalize_name(name)] = category_id
+
+    def forget(self, user_id: UUID) -> None:
+        with self._lock:
+            self._maps.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._maps.clear()
+
+    def _store(self, user_id: UUID, hints: dict[str, UUID]) -> None:
+        if self.max_users == 0:
+            return
+        with self._lock:
+            self._maps[user_id] = hints
+            self._maps.move_to_end(user_id)
+            while len(self._maps) > self.max_users:
+                self._maps.popitem(last=False)
+
+
+def _load_history(db: Session, user_id: UUID) -> dict[str, UUID]:
+    items = select(ShoppingItem.product_id, ShoppingItem.category_id).where(
+        ShoppingItem.user_id == user_id,
+        ShoppingItem.category_id.is_not(None),
+    )
+    ingredients = (
+        select(Ingredient.product_id, Ingredient.category_id)
+        .join(Recipe, Recipe.id == Ingredient.recipe_id)
+        .where(Recipe.user_id == user_id, Ingredient.category_id.is_not(None))
+    )
+    history = union_all(items, ingredients).subquery()
+    rows = db.execute(
+        select(Product.name, history.c.category_id, func.count().label("uses"))
+        .join(Product, Product.id == history.c.product_id)
+        .group_by(Product.name, history.c.category_id)
+    ).all()
+
+    uses: Counter[tuple[str, UUID]] = Counter({(row.name, row.category_id): row.uses for row in rows})
+    hints: dict[str, UUID] = {}
+    # Ascending, so the most used category of each name is written last
+    for (name, category_id), _ in reversed(uses.most_common()):
+        hints[name] = category_id
+    return hints
+
+
+def usable_category(category_id: UUID, user_id: UUID) -> ScalarSelect[UUID]:
+    """`category_id` if it still exists and the user may use it, else NULL; evaluated inside the write."""
+    return (
+        select(Category.id)
+        .where(
+            Category.id == category_id,
+            or_(Category.user_id == user_id, Category.user_id.is_(None)),
+        )
+        .scalar_subquery()
+    )
+
+
+category_hints = CategoryHints(settings.CATEGORY_HINTS_CACHE_USERS)
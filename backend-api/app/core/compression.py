@@ -0,0 +1,277 @@
+"""
+Response compression and content-hash ETags.
+
+The ETag is a hash of the finished body, so a matching If-None-Match saves
+bandwidth and compression but not the work of producing the response: the
+route still runs its queries and serializes the body before the middleware
+can answer 304. A route that can derive a validator more cheaply (a list
+revision, a max updated_at) should set the ETag header itself and answer
+304 before serializing; the middleware keeps an ETag the route has set.
+"""
+import hashlib
+import threading
+import typing as t
+import zlib
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+
+class _Compressor(t.Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    # Everything compressed so far, decodable by the client; the stream stays open
+    def sync(self) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _Gzip:
+    def __init__(self) -> None:
+        self._obj = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def sync(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._obj = brotli.Compressor(quality=5)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def sync(self) -> bytes:
+        return self._obj.flush()
+
+    def flush(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self) -> None:
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def sync(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+# In server preference order
+ENCODERS: dict[str, t.Callable[[], _Compressor]] = {
+    **({"br": _Brotli} if brotli is not None else {}),
+    **({"zstd": _Zstd} if zstandard is not None else {}),
+    "gzip": _Gzip,
+}
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best supported encoding the client accepts (q > 0), or None."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ENCODERS:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware: negotiates br/zstd/gzip from Accept-Encoding for
+    JSON and text responses of at least `minimum_size` bytes.
+
+    Complete 200 responses to GET get a content-hash ETag. If-None-Match
+    hits answer 304, and the compressed bytes are kept per (ETag, encoding)
+    so an unchanged response is not compressed again. Streaming responses
+    are compressed and flushed chunk by chunk, so the client sees each chunk
+    as soon as it is sent, and are never cached.
+    """
+
+    def __init__(self, app: ASGIApp, *, minimum_size: int = 1024, cache_max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedCache(cache_max_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        conditional = scope["method"] == "GET"
+        if encoding is None and not conditional:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _Responder(self, send, encoding, conditional, request_headers.get("if-none-match"))
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        send: Send,
+        encoding: str | None,
+        conditional: bool,
+        if_none_match: str | None,
+    ) -> None:
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.conditional = conditional
+        self.if_none_match = if_none_match
+        self.start: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if message.get("more_body", False):
+                await self._start_stream(start)
+            else:
+                await self._send_whole(start, message.get("body", b""))
+                return
+
+        if self.compressor is None:
+            await self._send(message)
+            return
+        more_body = message.get("more_body", False)
+        body = self.compressor.compress(message.get("body", b""))
+        body += self.compressor.sync() if more_body else self.compressor.flush()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _encoding_for(self, headers: MutableHeaders) -> str | None:
+        """The negotiated encoding, or None if this response is sent as is."""
+        if "content-encoding" in headers or not headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES):
+            return None
+        return self.encoding
+
+    async def _start_stream(self, start: Message) -> None:
+        headers = MutableHeaders(scope=start)
+        encoding = self._encoding_for(headers)
+        if encoding is not None:
+            self.compressor = ENCODERS[encoding]()
+            del headers["content-length"]
+            headers["content-encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+        else:
+            self.passthrough = True
+        await self._send(start)
+
+    async def _send_whole(self, start: Message, body: bytes) -> None:
+        headers = MutableHeaders(scope=start)
+        etag = headers.get("etag")
+        if etag is None and self.conditional and start["status"] == 200:
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            headers["etag"] = etag
+
+        if etag is not None and self.if_none_match is not None and _etag_matches(etag, self.if_none_match):
+            del headers["content-length"]
+            start["status"] = 304
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = self._encoding_for(headers)
+        if encoding is not None and len(body) >= self.middleware.minimum_size:
+            cache = self.middleware.cache
+            compressed = cache.get((etag, encoding)) if etag else None
+            if compressed is None:
+                compressor = ENCODERS[encoding]()
+                compressed = compressor.compress(body) + compressor.flush()
+                if etag:
+                    cache.put((etag, encoding), compressed)
+            if len(compressed) < len(body):
+                body = compressed
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": body})
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
@@ -25,6 +25,43 @@ class Settings(BaseSettings):
 
     RESEND_API_KEY: str = ""
     RESET_CODE_FROM_EMAIL: str = "noreply@yourdomain.com"
+    # Interval of the background purge of expired reset codes, idempotency keys
+    # and sync changes; 0 disables it (e.g. when run from a cron job instead)
+    RESET_CODE_PURGE_INTERVAL_SECONDS: int = Field(default=3600, ge=0)
+    RESET_CODE_PURGE_BATCH_SIZE: int = Field(default=500, ge=1)
+
+    # Idempotency-Key replay window
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = Field(default=86400, ge=60)
+    IDEMPOTENCY_CACHE_SIZE: int = Field(default=2048, ge=0)
+
+    # Age after which the shopping item change log is purged; clients whose
+    # last sync is older get a full snapshot instead of a delta
+    SYNC_CHANGE_RETENTION_DAYS: int = Field(default=30, ge=1)
+
+    # Users whose name -> category history is kept in memory for new items
+    CATEGORY_HINTS_CACHE_USERS: int = Field(default=1024, ge=0)
+
+    SLOW_QUERY_MS: float = 200.0
+    SERVER_TIMING_ENABLED: bool = True
+    # /metrics is off by default; with METRICS_TOKEN set it also needs
+    # "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, ge=0)
+    # Compressed bodies kept for repeat responses with the same ETag
+    COMPRESSION_CACHE_MAX_BYTES: int = Field(default=16 * 1024 * 1024, ge=0)
+
+    # Sampling profiler; requests carrying PROFILING_HEADER are always profiled.
+    # Outside dev the header is only honoured with PROFILING_TOKEN as its value.
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = Field(default=0.01, ge=0, le=1)
+    PROFILING_ROUTES: str = "get_shopping_list_items,get_recipes"
+    PROFILING_INTERVAL_MS: float = Field(default=5.0, gt=0)
+    PROFILING_OUTPUT_DIR: str = "./profiles"
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_TOKEN: str = ""
 
     @property
     def is_dev(self) -> bool:
@@ -34,5 +71,9 @@ class Settings(BaseSettings):
     def cors_origin_list(self) -> list[str]:
         return [o.strip() for o in self.CORS_ORIGINS.split(",") if o.strip()]
 
+    @property
+    def profiling_route_set(self) -> set[str]:
+        return {r.strip() for r in self.PROFILING_ROUTES.split(",") if r.strip()}
+
 
 settings = Settings()
@@ -1,15 +1,29 @@
-from sqlalchemy import create_engine
+import typing as t
+
+from sqlalchemy import Connection, Engine, create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+
+_is_sqlite = settings.DATABASE_URL.startswith("sqlite")
 
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args=(
-        {"check_same_thread": False}
-        if settings.DATABASE_URL.startswith("sqlite")
-        else {}
-    ),
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
 )
+
+if _is_sqlite:
+    # Set-based deletes rely on ON DELETE CASCADE, which SQLite only enforces when asked to
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
@@ -19,3 +33,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(bind: Connection | Engine) -> t.Callable[..., t.Any]:
+    """`insert` of the bind's dialect, for ON CONFLICT (PostgreSQL and SQLite share the API)."""
+    return postgresql.insert if bind.dialect.name == "postgresql" else sqlite.insert
@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.db import get_db
+from app.core.deps import get_current_user
+from app.models.sync import IdempotencyKey
+from app.models.user import User
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from sqlalchemy import Connection, Engine, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str | None
+    status_code: int
+    body: bytes
+    expires_at: float  # time.monotonic()
+
+
+class ResponseCache:
+    """Small in-process LRU in front of the idempotency_keys table."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[UUID, str], StoredResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[UUID, str]) -> StoredResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple[UUID, str], entry: StoredResponse) -> None:
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.IDEMPOTENCY_CACHE_SIZE)
+
+
+class IdempotentReplay(Exception):
+    def __init__(self, response: Response) -> None:
+        self.response = response
+
+
+@dataclass
+class _Pending:
+    # Engine, or the test connection; the request's session is closed by then
+    bind: Engine | Connection
+    user_id: UUID
+    key: str
+    fingerprint: str
+
+
+def _replay(entry: StoredResponse, fingerprint: str) -> Exception:
+    if entry.fingerprint != fingerprint:
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request",
+        )
+    response = Response(content=entry.body, status_code=entry.status_code, media_type="application/json")
+    response.headers["Idempotent-Replayed"] = "true"
+    return IdempotentReplay(response)
+
+
+def idempotent_request(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_HEADER, max_length=255),
+) -> None:
+    """
+    Route dependency: the first request with a given Idempotency-Key runs
+    normally and its 2xx response is stored; retries get the stored response
+    back without running the endpoint. Needs the router to use IdempotentRoute.
+    """
+    if idempotency_key is None:
+        return
+
+    user_id = current_user.id
+    fingerprint = f"{request.method} {request.url.path}"
+    cached = response_cache.get((user_id, idempotency_key))
+    if cached is not None:
+        raise _replay(cached, fingerprint)
+
+    now = datetime.now(timezone.utc)
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == idempotency_key,
+            IdempotencyKey.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+        )
+    )
+    stored = db.scalar(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == idempotency_key)
+    )
+    if stored is not None:
+        if stored.request_fingerprint is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"This {IDEMPOTENCY_HEADER} was already used for a sync mutation",
+            )
+        if stored.response_body is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress",
+            )
+        entry = StoredResponse(
+            fingerprint=stored.request_fingerprint,
+            status_code=stored.status_code or status.HTTP_200_OK,
+            body=stored.response_body.encode(),
+            expires_at=time.monotonic() + settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+        )
+        response_cache.put((user_id, idempotency_key), entry)
+        raise _replay(entry, fingerprint)
+
+    # Reserve the key first so a concurrent retry can't run the endpoint too
+    db.add(IdempotencyKey(user_id=user_id, key=idempotency_key, created_at=now, request_fingerprint=fingerprint))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress",
+        )
+    request.state.idempotency = _Pending(
+        bind=db.get_bind(), user_id=user_id, key=idempotency_key, fingerprint=fingerprint
+    )
+
+
+def _finish(pending: _Pending, response: Response | None) -> None:
+    # Runs after the endpoint returned, when get_db has already closed its session
+    with Session(bind=pending.bind, autoflush=False) as db:
+        row = db.get(IdempotencyKey, (pending.user_id, pending.key))
+        if row is None:
+            return
+        if response is None or not 200 <= response.status_code < 300:
+            # Failed requests release the key so the client can retry them
+            db.delete(row)
+            db.commit()
+            return
+
+        row.status_code = response.status_code
+        row.response_body = bytes(response.body).decode()
+        db.commit()
+    response_cache.put(
+        (pending.user_id, pending.key),
+        StoredResponse(
+            fingerprint=pending.fingerprint,
+            status_code=response.status_code,
+            body=bytes(response.body),
+            expires_at=time.monotonic() + settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+        ),
+    )
+
+
+class IdempotentRoute(APIRoute):
+    """Route class that replays and records responses for `idempotent_request`."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except IdempotentReplay as replay:
+                return replay.response
+            except Exception:
+                pending = getattr(request.state, "idempotency", None)
+                if pending is not None:
+                    await run_in_threadpool(_finish, pending, None)
+                raise
+
+            pending = getattr(request.state, "idempotency", None)
+            if pending is not None:
+                await run_in_threadpool(_finish, pending, response)
+            return response
+
+        return route_handler
@@ -0,0 +1,157 @@
+import logging
+import re
+import time
+import typing as t
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import registry
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    method: str = ""
+    route: str = "unmatched"
+    endpoint: str = ""
+    db_statements: int = 0
+    db_seconds: float = 0.0
+
+
+# Set per request by QueryStatsMiddleware. Sync endpoints run in a threadpool
+# with a copy of the context, so they see (and mutate) the same object.
+_current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _current_stats.get()
+
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, bind-parameter lists and literals so equal query shapes group together."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _IN_LIST.sub("(?)", statement)
+    return _LITERAL.sub("?", statement)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_seconds += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query route=%s duration_ms=%.1f sql=%s",
+            stats.endpoint if stats else "-",
+            elapsed * 1000,
+            normalize_sql(statement),
+            extra={
+                "route": stats.endpoint if stats else None,
+                "duration_ms": round(elapsed * 1000, 1),
+                "sql": normalize_sql(statement),
+            },
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute statement count and DB time to the active request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware: opens a RequestStats for each HTTP request, adds a
+    Server-Timing header and records duration, response size and DB usage
+    in the metrics registry.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(method=scope["method"])
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        response_bytes = 0
+        registry.request_started()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status = message["status"]
+                _resolve_route(scope, stats)
+                if settings.SERVER_TIMING_ENABLED:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    timing = (
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_statements} queries", '
+                        f"app;dur={total_ms:.1f}"
+                    )
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            _resolve_route(scope, stats)
+            seconds = time.perf_counter() - started
+            registry.record_request(
+                method=stats.method,
+                route=stats.route,
+                status=status,
+                seconds=seconds,
+                db_statements=stats.db_statements,
+                db_seconds=stats.db_seconds,
+                response_bytes=response_bytes,
+            )
+            logger.info(
+                "Request method=%s route=%s status=%s duration_ms=%.1f db_statements=%s db_ms=%.1f",
+                stats.method,
+                stats.route,
+                status,
+                seconds * 1000,
+                stats.db_statements,
+                stats.db_seconds * 1000,
+                extra={
+                    "method": stats.method,
+                    "route": stats.route,
+                    "endpoint": stats.endpoint,
+                    "status": status,
+                    "duration_ms": round(seconds * 1000, 1),
+                    "db_statements": stats.db_statements,
+                    "db_ms": round(stats.db_seconds * 1000, 1),
+                },
+            )
+
+
+def _resolve_route(scope: Scope, stats: RequestStats) -> None:
+    # FastAPI stores the matched route in the scope once routing has happened
+    route: t.Any = scope.get("route")
+    if route is not None:
+        stats.route = route.path
+        stats.endpoint = route.name
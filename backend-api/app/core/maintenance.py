@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.password_reset import PasswordResetCode
+from app.models.sync import IdempotencyKey, ShoppingItemChange, sync_position
+from sqlalchemy import delete, func, or_, select, tuple_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+def purge_password_reset_codes(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """Delete used or expired reset codes in batches. Returns the number of rows deleted."""
+    now = now or datetime.now(timezone.utc)
+    batch_size = batch_size or settings.RESET_CODE_PURGE_BATCH_SIZE
+
+    deleted = 0
+    while True:
+        ids = db.scalars(
+            select(PasswordResetCode.id)
+            .where(or_(PasswordResetCode.used, PasswordResetCode.expires_at <= now))
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        db.execute(delete(PasswordResetCode).where(PasswordResetCode.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+
+        if len(ids) < batch_size:
+            break
+
+    return deleted
+
+
+def purge_idempotency_keys(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """Delete idempotency keys older than the replay window, in batches."""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    batch_size = batch_size or settings.RESET_CODE_PURGE_BATCH_SIZE
+
+    deleted = 0
+    while True:
+        keys = db.execute(
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.created_at <= cutoff)
+            .limit(batch_size)
+        ).all()
+        if not keys:
+            break
+
+        db.execute(
+            delete(IdempotencyKey).where(
+                tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_([tuple(k) for k in keys])
+            )
+        )
+        db.commit()
+        deleted += len(keys)
+
+        if len(keys) < batch_size:
+            break
+
+    return deleted
+
+
+def purge_sync_changes(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Delete shopping item changes older than the retention window, in batches.
+
+    Deletes everything before the newest expired row and keeps that row as
+    the floor: a sync cursor below it may have missed purged changes
+    (app.sync.changes_since).
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.SYNC_CHANGE_RETENTION_DAYS)
+    batch_size = batch_size or settings.RESET_CODE_PURGE_BATCH_SIZE
+    position = sync_position(db)
+    floor = db.scalar(select(func.max(position)).where(ShoppingItemChange.created_at <= cutoff))
+    if floor is None:
+        return 0
+
+    deleted = 0
+    while True:
+        revisions = db.scalars(
+            select(ShoppingItemChange.revision)
+            .where(or_(position < floor, position.is_(None)))
+            .limit(batch_size)
+        ).all()
+        if not revisions:
+            break
+
+        db.execute(delete(ShoppingItemChange).where(ShoppingItemChange.revision.in_(revisions)))
+        db.commit()
+        deleted += len(revisions)
+
+        if len(revisions) < batch_size:
+            break
+
+    return deleted
+
+
+def run_password_reset_purge() -> int:
+    db = SessionLocal()
+    try:
+        deleted = purge_password_reset_codes(db)
+    finally:
+        db.close()
+    logger.info("Purged password reset codes deleted=%s", deleted)
+    return deleted
+
+
+def run_idempotency_key_purge() -> int:
+    db = SessionLocal()
+    try:
+        deleted = purge_idempotency_keys(db)
+    finally:
+        db.close()
+    logger.info("Purged idempotency keys deleted=%s", deleted)
+    return deleted
+
+
+def run_sync_change_purge() -> int:
+    db = SessionLocal()
+    try:
+        deleted = purge_sync_changes(db)
+    finally:
+        db.close()
+    logger.info("Purged sync changes deleted=%s", deleted)
+    return deleted
+
+
+async def purge_expired_rows_periodically() -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown."""
+    while True:
+        await asyncio.sleep(settings.RESET_CODE_PURGE_INTERVAL_SECONDS)
+        for purge in (run_password_reset_purge, run_idempotency_key_purge, run_sync_change_purge):
+            try:
+                await run_in_threadpool(purge)
+            except Exception:
+                logger.exception("Periodic purge failed job=%s", purge.__name__)
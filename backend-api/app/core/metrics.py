@@ -0,0 +1,145 @@
+import bisect
+import threading
+from dataclasses import dataclass, field
+
+# Upper bounds in seconds; the implicit +Inf bucket is the request count
+DURATION_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+SIZE_BUCKETS: tuple[float, ...] = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576,
+)  # fmt: skip
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    db_statements: int = 0
+    db_seconds: float = 0.0
+    response_bytes: int = 0
+    duration_counts: list[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+    size_counts: list[int] = field(default_factory=lambda: [0] * len(SIZE_BUCKETS))
+
+
+@dataclass
+class MetricsRegistry:
+    """In-process, per-route aggregates. Cheap enough to update on every request."""
+
+    routes: dict[tuple[str, str], RouteStats] = field(default_factory=dict)
+    in_flight: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def record_request(
+        self,
+        *,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        db_statements: int,
+        db_seconds: float,
+        response_bytes: int = 0,
+    ) -> None:
+        # Buckets are non-cumulative here and summed up when rendering
+        duration_bucket = bisect.bisect_left(DURATION_BUCKETS, seconds)
+        size_bucket = bisect.bisect_left(SIZE_BUCKETS, response_bytes)
+        with self._lock:
+            self.in_flight -= 1
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[(method, route)] = RouteStats()
+            stats.requests += 1
+            stats.errors += status >= 500
+            stats.total_seconds += seconds
+            stats.db_statements += db_statements
+            stats.db_seconds += db_seconds
+            stats.response_bytes += response_bytes
+            if duration_bucket < len(DURATION_BUCKETS):
+                stats.duration_counts[duration_bucket] += 1
+            if size_bucket < len(SIZE_BUCKETS):
+                stats.size_counts[size_bucket] += 1
+
+    def snapshot(self) -> dict[tuple[str, str], RouteStats]:
+        with self._lock:
+            return {
+                key: RouteStats(
+                    requests=s.requests,
+                    errors=s.errors,
+                    total_seconds=s.total_seconds,
+                    db_statements=s.db_statements,
+                    db_seconds=s.db_seconds,
+                    response_bytes=s.response_bytes,
+                    duration_counts=list(s.duration_counts),
+                    size_counts=list(s.size_counts),
+                )
+                for key, s in self.routes.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes.clear()
+
+    def render(self, gauges: dict[str, tuple[str, float]] | None = None) -> str:
+        """Prometheus text exposition (version 0.0.4). `gauges` maps name -> (help, value)."""
+        routes = self.snapshot()
+        lines: list[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, bounds: tuple[float, ...], pick_counts, pick_sum) -> None:
+            for (method, route), stats in routes.items():
+                labels = _labels(method=method, route=route)
+                cumulative = 0
+                for bound, count in zip(bounds, pick_counts(stats)):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {stats.requests}')
+                lines.append(f"{name}_sum{{{labels}}} {pick_sum(stats)}")
+                lines.append(f"{name}_count{{{labels}}} {stats.requests}")
+
+        header("http_request_duration_seconds", "histogram", "Request duration by route template.")
+        histogram(
+            "http_request_duration_seconds",
+            DURATION_BUCKETS,
+            lambda s: s.duration_counts,
+            lambda s: round(s.total_seconds, 6),
+        )
+        header("http_response_size_bytes", "histogram", "Response body size by route template.")
+        histogram("http_response_size_bytes", SIZE_BUCKETS, lambda s: s.size_counts, lambda s: s.response_bytes)
+
+        for name, help_text, pick in (
+            ("http_request_errors_total", "Responses with a 5xx status.", lambda s: s.errors),
+            ("db_statements_total", "SQL statements executed.", lambda s: s.db_statements),
+            ("db_seconds_total", "Time spent executing SQL.", lambda s: round(s.db_seconds, 6)),
+        ):
+            header(name, "counter", help_text)
+            for (method, route), stats in routes.items():
+                lines.append(f"{name}{{{_labels(method=method, route=route)}}} {pick(stats)}")
+
+        header("http_requests_in_flight", "gauge", "Requests currently being served.")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+
+        for name, (help_text, value) in (gauges or {}).items():
+            header(name, "gauge", help_text)
+            lines.append(f"{name} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+registry = MetricsRegistry()
@@ -1,9 +1,13 @@
+import hashlib
 from dataclasses import dataclass
 from uuid import UUID, NAMESPACE_DNS, uuid5
 
+from app.core.db import dialect_insert
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+MARKER_NAME = "predefined_categories"
+
 
 @dataclass(frozen=True)
 class PredefinedCategory:
@@ -16,20 +20,40 @@ class PredefinedCategory:
         return uuid5(NAMESPACE_DNS, f"predefined-category:{self.name}")
 
 
-def seed_predefined_categories(db: Session) -> None:
-    """Insert any missing predefined categories (idempotent)."""
+def predefined_categories_seeded(db: Session) -> bool:
+    """Whether any version of the predefined categories was seeded into this database."""
+    from app.models.schema_marker import SchemaMarker
+
+    return db.get(SchemaMarker, MARKER_NAME) is not None
+
+
+def seed_predefined_categories(db: Session) -> bool:
+    """
+    Insert missing predefined categories and refresh their icons (idempotent).
+    Skipped after a single primary-key read when the schema marker already
+    records the current PREDEFINED_CATEGORIES_VERSION. Returns whether it ran.
+    """
     from app.models.category import Category  # local import to avoid circular
+    from app.models.schema_marker import SchemaMarker
 
-    existing = set(
-        db.scalars(select(Category.name).where(Category.user_id.is_(None))).all()
+    marker = db.scalar(select(SchemaMarker.version).where(SchemaMarker.name == MARKER_NAME))
+    if marker == PREDEFINED_CATEGORIES_VERSION:
+        return False
+
+    insert = dialect_insert(db.connection())
+    stmt = insert(Category)
+    # The IDs are stable, so this is safe when several workers start at once
+    db.execute(
+        stmt.on_conflict_do_update(index_elements=["id"], set_={"icon": stmt.excluded.icon}),
+        [{"id": c.id, "user_id": None, "name": c.name, "icon": c.icon} for c in PREDEFINED_CATEGORIES],
+    )
+    db.execute(
+        insert(SchemaMarker)
+        .values(name=MARKER_NAME, version=PREDEFINED_CATEGORIES_VERSION)
+        .on_conflict_do_update(index_elements=["name"], set_={"version": PREDEFINED_CATEGORIES_VERSION})
     )
-    missing = [c for c in PREDEFINED_CATEGORIES if c.name not in existing]
-    if missing:
-        db.add_all([
-            Category(id=c.id, user_id=None, name=c.name, icon=c.icon)
-            for c in missing
-        ])
-        db.commit()
+    db.commit()
+    return True
 
 
 PREDEFINED_CATEGORIES: list[PredefinedCategory] = [
@@ -61,3 +85,8 @@ PREDEFINED_CATEGORIES: list[PredefinedCategory] = [
     PredefinedCategory("woda i napoje", "💧"),
     PredefinedCategory("zwierzęta", "🐾"),
 ]
+
+# Changes whenever the list above does, so deployments re-run the seed once
+PREDEFINED_CATEGORIES_VERSION = hashlib.sha256(
+    "\n".join(f"{c.name}\t{c.icon}" for c in PREDEFINED_CATEGORIES).encode()
+).hexdigest()[:16]
@@ -0,0 +1,187 @@
+import functools
+import hmac
+import inspect
+import logging
+import os
+import random
+import sys
+import threading
+import types
+import typing as t
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+import anyio
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class _Sampler(threading.Thread):
+    """
+    Wall-clock sampler: every `interval` seconds, walk the stack of the
+    thread running the profiled request (`thread_id`, set once the endpoint
+    starts) from `root` (the endpoint function). Other requests to the same
+    endpoint run in other threads and are not sampled. Stacks are stored
+    root-first in collapsed ("folded") form.
+    """
+
+    def __init__(self, root: types.CodeType, interval: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.root = root
+        self.interval = interval
+        self.thread_id: int | None = None
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id) if self.thread_id is not None else None
+            stack = _collapse(frame, self.root)
+            if stack is not None:
+                self.stacks[stack] += 1
+
+    def stop(self) -> Counter[str]:
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+
+# Sampler of the request being profiled, seen by its endpoint (contextvars
+# follow the request into the threadpool)
+_active_sampler: ContextVar[_Sampler | None] = ContextVar("active_sampler", default=None)
+
+
+def _track_thread(call: t.Callable[..., t.Any]) -> t.Callable[..., t.Any]:
+    """Wrap an endpoint so the profiled request's sampler learns which thread runs it."""
+
+    def enter() -> None:
+        sampler = _active_sampler.get()
+        if sampler is not None:
+            sampler.thread_id = threading.get_ident()
+
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def tracked_async(*args: t.Any, **kwargs: t.Any) -> t.Any:
+            enter()
+            return await call(*args, **kwargs)
+
+        return tracked_async
+
+    @functools.wraps(call)
+    def tracked(*args: t.Any, **kwargs: t.Any) -> t.Any:
+        enter()
+        return call(*args, **kwargs)
+
+    return tracked
+
+
+def _collapse(frame: types.FrameType | None, root: types.CodeType) -> str | None:
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        if code is root:
+            return ";".join(reversed(names))
+        frame = frame.f_back
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler for selected routes (by endpoint name).
+
+    A request is profiled when it carries `header` or wins the
+    `sample_rate` draw, and only one request is profiled at a time, so the
+    overhead is bounded by the sample rate. With a `token`, the header only
+    counts when its value matches it; `header=None` turns the header off.
+    Aggregated stacks are written to `<output_dir>/<endpoint>.folded`,
+    which flamegraph.pl, speedscope and similar tools read directly.
+
+    A profiled route's endpoint is wrapped on first use (see _track_thread)
+    so that only the profiled request's thread is sampled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        routes: set[str],
+        sample_rate: float,
+        interval_ms: float,
+        output_dir: str,
+        header: str | None = "x-profile",
+        token: str | None = None,
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.output_dir = Path(output_dir)
+        self.header = header.lower().encode() if header else None
+        self.token = token.encode() if token else None
+        self._slot = threading.Lock()
+        self._profiles: dict[str, Counter[str]] = {}
+        self._tracked: set[int] = set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        route = _match_route(scope)
+        if route is None or route.name not in self.routes or not self._slot.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            self._track(route)
+            sampler = _Sampler(inspect.unwrap(route.endpoint).__code__, self.interval)
+            token = _active_sampler.set(sampler)
+            sampler.start()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _active_sampler.reset(token)
+                stacks = sampler.stop()
+                # Still holding the slot: one store at a time per profile file
+                await anyio.to_thread.run_sync(self._store, route.name, stacks)
+        finally:
+            self._slot.release()
+
+    def _track(self, route: t.Any) -> None:
+        # FastAPI looks up dependant.call on every request; the slot is held
+        if id(route) in self._tracked or getattr(route, "dependant", None) is None:
+            return
+        route.dependant.call = _track_thread(route.dependant.call)
+        self._tracked.add(id(route))
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        if self.header is not None:
+            for name, value in scope["headers"]:
+                if name == self.header and (self.token is None or hmac.compare_digest(value, self.token)):
+                    return True
+        return random.random() < self.sample_rate
+
+    def _store(self, endpoint: str, stacks: Counter[str]) -> None:
+        if not stacks:
+            return
+        profile = self._profiles.setdefault(endpoint, Counter())
+        profile.update(stacks)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{endpoint}.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in profile.most_common()))
+        logger.info("Profile updated endpoint=%s samples=%s path=%s", endpoint, sum(stacks.values()), path)
+
+
+def _match_route(scope: Scope):
+    # Starlette puts the application on the scope before running the middleware stack
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
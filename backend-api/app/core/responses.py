@@ -0,0 +1,24 @@
+import typing as t
+from functools import cache
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+@cache
+def _adapter(schema: t.Any) -> TypeAdapter[t.Any]:
+    return TypeAdapter(schema)
+
+
+def fast_json(schema: t.Any, content: t.Any, *, status_code: int = 200) -> Response:
+    """
+    Validate `content` (ORM objects, rows or dicts) against `schema` and
+    serialize it straight to JSON bytes in pydantic-core.
+
+    Returning a Response makes FastAPI skip its own response_model
+    validation, jsonable_encoder pass and json.dumps. Keep `response_model`
+    on the route so the OpenAPI schema stays the same.
+    """
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -1,19 +1,27 @@
 import typing as t
 from datetime import datetime, timedelta, timezone
+from functools import cache
 
 from app.core.config import settings
-from jose import jwt
-from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# passlib and jose.jwt (with its crypto backends) are imported on first use:
+# they add tens of milliseconds to every cold start, and in header auth mode
+# only login, registration and password changes need them
+
+
+@cache
+def _pwd_context() -> t.Any:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -22,6 +30,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire, "type": "access"})
+    from jose import jwt
+
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
@@ -31,10 +41,14 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
         expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     )
     to_encode.update({"exp": expire, "type": "refresh"})
+    from jose import jwt
+
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def decode_token(token: str, expected_type: str | None = None) -> dict[str, t.Any]:
+    from jose import jwt
+
     payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     if expected_type is not None:
         token_type = payload.get("type")
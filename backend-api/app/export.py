@@ -0,0 +1,114 @@
+import json
+import typing as t
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.models.category import Category
+from app.models.meal_plan import MealPlanEntry, MealPlanTemplate
+from app.models.recipe import Ingredient, Recipe, recipe_tag
+from app.models.shopping_item import ShoppingItem, ShoppingList
+from app.models.tag import Tag
+from sqlalchemy import Connection, Engine, RowMapping, Select, select
+from sqlalchemy.orm import Session
+
+EXPORT_VERSION = 1
+EXPORT_BATCH_SIZE = 500
+
+
+def _sections(user_id: UUID) -> list[tuple[str, Select]]:
+    owned_recipes = select(Recipe.id).where(Recipe.user_id == user_id)
+    owned_lists = select(ShoppingList.id).where(ShoppingList.user_id == user_id)
+    return [
+        (
+            "category",
+            select(Category.id, Category.name, Category.icon).where(Category.user_id == user_id),
+        ),
+        ("tag", select(Tag.id, Tag.name).where(Tag.user_id == user_id)),
+        (
+            "recipe",
+            select(Recipe.id, Recipe.title, Recipe.description, Recipe.source).where(Recipe.user_id == user_id),
+        ),
+        (
+            "ingredient",
+            select(
+                Ingredient.id,
+                Ingredient.recipe_id,
+                Ingredient.name,
+                Ingredient.quantity,
+                Ingredient.unit,
+                Ingredient.note,
+                Ingredient.category_id,
+            ).where(Ingredient.recipe_id.in_(owned_recipes)),
+        ),
+        (
+            "recipe_tag",
+            select(recipe_tag.c.recipe_id, recipe_tag.c.tag_id).where(recipe_tag.c.recipe_id.in_(owned_recipes)),
+        ),
+        (
+            "shopping_list",
+            select(ShoppingList.id, ShoppingList.name, ShoppingList.description).where(
+                ShoppingList.user_id == user_id
+            ),
+        ),
+        (
+            "shopping_item",
+            select(
+                ShoppingItem.id,
+                ShoppingItem.list_id,
+                ShoppingItem.name,
+                ShoppingItem.quantity,
+                ShoppingItem.unit,
+                ShoppingItem.note,
+                ShoppingItem.checked,
+                ShoppingItem.recipe_id,
+                ShoppingItem.category_id,
+            ).where(ShoppingItem.list_id.in_(owned_lists)),
+        ),
+        (
+            "meal_plan_entry",
+            select(
+                MealPlanEntry.id,
+                MealPlanEntry.date,
+                MealPlanEntry.meal_slot,
+                MealPlanEntry.recipe_id,
+            ).where(MealPlanEntry.user_id == user_id),
+        ),
+        (
+            "meal_plan_template",
+            select(
+                MealPlanTemplate.id,
+                MealPlanTemplate.recipe_id,
+                MealPlanTemplate.meal_slot,
+                MealPlanTemplate.starts_on,
+                MealPlanTemplate.ends_on,
+                MealPlanTemplate.interval_weeks,
+            ).where(MealPlanTemplate.user_id == user_id),
+        ),
+    ]
+
+
+def _line(record_type: str, data: t.Mapping[str, t.Any] | RowMapping) -> str:
+    return json.dumps({"type": record_type, "data": dict(data)}, default=str, ensure_ascii=False) + "\n"
+
+
+def iter_account_export(bind: Engine | Connection, user_id: UUID, email: str) -> t.Iterator[bytes]:
+    """
+    Everything the user owns as NDJSON, one `{"type", "data"}` record per line.
+
+    Each section is read with a server-side cursor (`yield_per`) and sent one
+    batch at a time, so memory does not grow with the size of the account.
+    The stream outlives the request's session, so it opens its own on `bind`.
+    """
+    with Session(bind=bind, autoflush=False) as db:
+        header = {
+            "version": EXPORT_VERSION,
+            "user_id": user_id,
+            "email": email,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+        }
+        yield _line("export", header).encode()
+
+        for record_type, query in _sections(user_id):
+            result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            for batch in result.mappings().partitions():
+                yield "".join(_line(record_type, row) for row in batch).encode()
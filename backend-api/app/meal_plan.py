@@ -0,0 +1,160 @@
+import typing as t
+from datetime import date, timedelta
+from uuid import UUID, uuid5
+
+from app.core.db import dialect_insert
+from app.models.meal_plan import MealPlanEntry, MealPlanTemplate
+from app.models.recipe import Recipe
+from sqlalchemy import ColumnElement, or_, select
+from sqlalchemy.orm import Session
+
+# (date, meal_slot, recipe_id); no recipe_id clears a template occurrence
+Assignment = tuple[date, str, UUID | None]
+
+
+def list_entries(db: Session, user_id: UUID, *criteria: ColumnElement[bool]) -> list[dict[str, t.Any]]:
+    """
+    The user's concrete entries matching `criteria`, by date and slot, as
+    dicts shaped like MealPlanEntryOut. Only the recipe id and title are
+    selected; cleared template occurrences are left out.
+    """
+    rows = db.execute(
+        select(
+            MealPlanEntry.id,
+            MealPlanEntry.date,
+            MealPlanEntry.meal_slot,
+            Recipe.id.label("recipe_id"),
+            Recipe.title.label("recipe_title"),
+        )
+        .join(Recipe, Recipe.id == MealPlanEntry.recipe_id)
+        .where(MealPlanEntry.user_id == user_id, *criteria)
+        .order_by(MealPlanEntry.date, MealPlanEntry.meal_slot)
+    )
+    return [
+        {
+            "id": row.id,
+            "date": row.date,
+            "meal_slot": row.meal_slot,
+            "recipe": {"id": row.recipe_id, "title": row.recipe_title},
+        }
+        for row in rows
+    ]
+
+
+def occurrences(
+    starts_on: date, interval_weeks: int, ends_on: date | None, date_from: date, date_to: date
+) -> t.Iterator[date]:
+    """Dates of a template's occurrences between `date_from` and `date_to`, inclusive."""
+    step = 7 * interval_weeks
+    last = date_to if ends_on is None else min(date_to, ends_on)
+    day = starts_on
+    if day < date_from:
+        day += timedelta(days=-(-(date_from - starts_on).days // step) * step)
+    while day <= last:
+        yield day
+        day += timedelta(days=step)
+
+
+def _templates_between(
+    db: Session, user_id: UUID, date_from: date, date_to: date, *criteria: ColumnElement[bool]
+) -> t.Sequence[t.Any]:
+    return db.execute(
+        select(
+            MealPlanTemplate.id,
+            MealPlanTemplate.meal_slot,
+            MealPlanTemplate.starts_on,
+            MealPlanTemplate.ends_on,
+            MealPlanTemplate.interval_weeks,
+            Recipe.id.label("recipe_id"),
+            Recipe.title.label("recipe_title"),
+        )
+        .join(Recipe, Recipe.id == MealPlanTemplate.recipe_id)
+        .where(
+            MealPlanTemplate.user_id == user_id,
+            MealPlanTemplate.starts_on <= date_to,
+            or_(MealPlanTemplate.ends_on.is_(None), MealPlanTemplate.ends_on >= date_from),
+            *criteria,
+        )
+        # Where two templates land on one slot, the later-starting one wins
+        .order_by(MealPlanTemplate.starts_on, MealPlanTemplate.id)
+    ).all()
+
+
+def plan_between(db: Session, user_id: UUID, date_from: date, date_to: date) -> list[dict[str, t.Any]]:
+    """
+    The user's plan for `date_from`..`date_to`, inclusive: concrete entries
+    merged with template occurrences expanded on the fly. A concrete row on a
+    slot, including a cleared one, overrides the occurrence. Occurrences get
+    a stable ID derived from the template and date, and carry `template_id`.
+    """
+    concrete = db.execute(
+        select(
+            MealPlanEntry.id,
+            MealPlanEntry.date,
+            MealPlanEntry.meal_slot,
+            Recipe.id.label("recipe_id"),
+            Recipe.title.label("recipe_title"),
+        )
+        .outerjoin(Recipe, Recipe.id == MealPlanEntry.recipe_id)
+        .where(MealPlanEntry.user_id == user_id, MealPlanEntry.date >= date_from, MealPlanEntry.date <= date_to)
+    ).all()
+
+    slots: dict[tuple[date, str], dict[str, t.Any]] = {}
+    for row in _templates_between(db, user_id, date_from, date_to):
+        for day in occurrences(row.starts_on, row.interval_weeks, row.ends_on, date_from, date_to):
+            slots[(day, row.meal_slot)] = {
+                "id": uuid5(row.id, day.isoformat()),
+                "date": day,
+                "meal_slot": row.meal_slot,
+                "recipe": {"id": row.recipe_id, "title": row.recipe_title},
+                "template_id": row.id,
+            }
+    for row in concrete:
+        slots.pop((row.date, row.meal_slot), None)
+        if row.recipe_id is not None:
+            slots[(row.date, row.meal_slot)] = {
+                "id": row.id,
+                "date": row.date,
+                "meal_slot": row.meal_slot,
+                "recipe": {"id": row.recipe_id, "title": row.recipe_title},
+            }
+    return [slots[key] for key in sorted(slots)]
+
+
+def template_occurs(db: Session, user_id: UUID, day: date, slot: str) -> bool:
+    """Whether any of the user's templates puts a recipe in this slot."""
+    return any(
+        next(occurrences(row.starts_on, row.interval_weeks, row.ends_on, day, day), None)
+        for row in _templates_between(db, user_id, day, day, MealPlanTemplate.meal_slot == slot)
+    )
+
+
+def owned_recipe_ids(db: Session, user_id: UUID, recipe_ids: t.Iterable[UUID]) -> set[UUID]:
+    """Subset of `recipe_ids` owned by the user, in one query."""
+    ids = set(recipe_ids)
+    if not ids:
+        return set()
+    return set(db.scalars(select(Recipe.id).where(Recipe.id.in_(ids), Recipe.user_id == user_id)).all())
+
+
+def upsert_entries(db: Session, user_id: UUID, assignments: t.Iterable[Assignment]) -> None:
+    """
+    Write assignments with one INSERT .. ON CONFLICT on (user_id, date,
+    meal_slot); an occupied slot keeps its entry ID and gets the new recipe.
+    Later assignments to the same slot win. Does not commit.
+    """
+    rows = {
+        (day, slot): {"user_id": user_id, "date": day, "meal_slot": slot, "recipe_id": recipe_id}
+        for day, slot, recipe_id in assignments
+    }
+    if not rows:
+        return
+
+    stmt = dialect_insert(db.connection())(MealPlanEntry)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "date", "meal_slot"],
+            set_={"recipe_id": stmt.excluded.recipe_id},
+        ),
+        list(rows.values()),
+    )
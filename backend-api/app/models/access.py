@@ -0,0 +1,149 @@
+import typing as t
+from uuid import UUID
+
+from app.models.base import Base
+from app.models.recipe import Recipe
+from app.models.shopping_item import ShoppingList
+from app.models.sync import record_access_changes
+from app.models.user import User
+from sqlalchemy import (
+    ForeignKey,
+    Index,
+    String,
+    Table,
+    and_,
+    delete,
+    event,
+    insert,
+    inspect,
+    select,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+RESOURCE_SHOPPING_LIST = "shopping_list"
+RESOURCE_RECIPE = "recipe"
+
+ROLE_OWNER = "owner"
+ROLE_MEMBER = "member"
+
+
+class ResourceAccess(Base):
+    """
+    Materialized "who can see what": one row per (user, list/recipe) pair,
+    so listing endpoints are a primary-key range scan on user_id.
+
+    Maintained by the flush hook below for ORM changes; set-based deletes
+    must clean up explicitly (see app.actions.revoke_resource_access).
+    """
+
+    __tablename__ = "resource_access"
+
+    user_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    resource_type: Mapped[str] = mapped_column(String, primary_key=True)
+    resource_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    role: Mapped[str] = mapped_column(String, nullable=False)
+
+    __table_args__ = (
+        Index("ix_resource_access_resource", "resource_type", "resource_id"),
+    )
+
+
+_SHARED_RESOURCES: dict[type, tuple[str, str]] = {
+    ShoppingList: (RESOURCE_SHOPPING_LIST, "shared_with_users"),
+    Recipe: (RESOURCE_RECIPE, "shared_with_users"),
+}
+_USER_SIDE: dict[str, str] = {
+    RESOURCE_SHOPPING_LIST: "shopping_lists_shared_with_me",
+    RESOURCE_RECIPE: "recipes_shared_with_me",
+}
+
+_Key = tuple[UUID, str, UUID]
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_resource_access(session: Session, _flush_context: t.Any) -> None:
+    # Attribute history still holds the pre-flush changes at this point.
+    grants: dict[_Key, str] = {}
+    revokes: set[_Key] = set()
+    dropped: set[tuple[str, UUID]] = set()
+
+    for obj in session.new | session.dirty:
+        if isinstance(obj, User):
+            for resource_type, attr in _USER_SIDE.items():
+                history = inspect(obj).attrs[attr].history
+                for res in history.added:
+                    grants[(obj.id, resource_type, res.id)] = ROLE_MEMBER
+                for res in history.deleted:
+                    revokes.add((obj.id, resource_type, res.id))
+            continue
+
+        spec = _SHARED_RESOURCES.get(type(obj))
+        if spec is None:
+            continue
+        resource_type, attr = spec
+        state = inspect(obj)
+
+        owner = state.attrs.user_id.history
+        for user_id in owner.deleted:
+            revokes.add((user_id, resource_type, obj.id))
+        for user_id in owner.added:
+            grants[(user_id, resource_type, obj.id)] = ROLE_OWNER
+
+        shares = state.attrs[attr].history
+        for user in shares.added:
+            grants[(user.id, resource_type, obj.id)] = ROLE_MEMBER
+        for user in shares.deleted:
+            revokes.add((user.id, resource_type, obj.id))
+
+    for obj in session.deleted:
+        spec = _SHARED_RESOURCES.get(type(obj))
+        if spec is not None:
+            dropped.add((spec[0], obj.id))
+
+    if not (grants or revokes or dropped):
+        return
+
+    table = t.cast(Table, ResourceAccess.__table__)
+    conn = session.connection()
+
+    def _match(key: _Key) -> t.Any:
+        user_id, resource_type, resource_id = key
+        return and_(
+            table.c.user_id == user_id,
+            table.c.resource_type == resource_type,
+            table.c.resource_id == resource_id,
+        )
+
+    # Core statements: the ORM flush is still in progress. Sync clients are
+    # told about lists appearing or disappearing (app.sync.changes_since).
+    record_access_changes(
+        conn, {(rid, u) for u, rt, rid in revokes | grants.keys() if rt == RESOURCE_SHOPPING_LIST}
+    )
+    for resource_type, resource_id in dropped:
+        if resource_type == RESOURCE_SHOPPING_LIST:
+            record_access_changes(
+                conn,
+                select(table.c.resource_id, table.c.user_id).where(
+                    table.c.resource_type == resource_type, table.c.resource_id == resource_id
+                ),
+            )
+    for key in revokes | grants.keys():
+        conn.execute(delete(table).where(_match(key)))
+    if grants:
+        conn.execute(
+            insert(table),
+            [
+                {"user_id": u, "resource_type": rt, "resource_id": rid, "role": role}
+                for (u, rt, rid), role in grants.items()
+            ],
+        )
+    for resource_type, resource_id in dropped:
+        conn.execute(
+            delete(table).where(
+                table.c.resource_type == resource_type,
+                table.c.resource_id == resource_id,
+            )
+        )
@@ -1,7 +1,7 @@
 from uuid import UUID, uuid4
 
 from app.models.base import Base
-from sqlalchemy import String, UniqueConstraint
+from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,7 +11,7 @@ class Category(Base):
 
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
     user_id: Mapped[UUID | None] = mapped_column(
-        PG_UUID(as_uuid=True), nullable=True, default=None, index=True
+        PG_UUID(as_uuid=True), nullable=True, default=None
     )
     name: Mapped[str] = mapped_column(String, nullable=False)
     icon: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
@@ -24,5 +24,23 @@ class Category(Base):
         return self.user_id is None
 
     __table_args__ = (
+        # Also serves lookups by user_id alone
         UniqueConstraint("user_id", "name", name="uq_category_user_name"),
     )
+
+
+class CategoryRank(Base):
+    """
+    A user's store-walk order of categories (lower rank first). Categories
+    without a row follow the ranked ones in the default order.
+    """
+
+    __tablename__ = "category_ranks"
+
+    user_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    category_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
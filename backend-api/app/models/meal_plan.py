@@ -2,22 +2,64 @@ from datetime import date
 from uuid import UUID, uuid4
 
 from app.models.base import Base
-from sqlalchemy import Date, ForeignKey, String, UniqueConstraint
+from sqlalchemy import (
+    CheckConstraint,
+    Date,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
 class MealPlanEntry(Base):
+    """
+    A concrete slot in the plan. Rows also override template occurrences on
+    the same slot; `recipe_id` is NULL when the user cleared an occurrence.
+    """
+
     __tablename__ = "meal_plan_entries"
 
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     date: Mapped[date] = mapped_column(Date, nullable=False)
     meal_slot: Mapped[str] = mapped_column(String, nullable=False)  # breakfast|lunch|dinner|supper
-    recipe_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("recipes.id", ondelete="CASCADE"))
+    recipe_id: Mapped[UUID | None] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("recipes.id", ondelete="CASCADE"), nullable=True
+    )
 
-    recipe = relationship("Recipe", lazy="joined")
+    recipe = relationship("Recipe")
 
     __table_args__ = (
+        # Also serves range lookups on (user_id, date)
         UniqueConstraint("user_id", "date", "meal_slot", name="uq_meal_plan_user_date_slot"),
     )
+
+
+class MealPlanTemplate(Base):
+    """
+    A recurring assignment: `recipe_id` in `meal_slot` on `starts_on` and
+    every `interval_weeks` weeks after it, up to `ends_on` if set.
+    Occurrences are computed when the plan is read; nothing is written per
+    occurrence until the user edits one.
+    """
+
+    __tablename__ = "meal_plan_templates"
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    recipe_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False
+    )
+    meal_slot: Mapped[str] = mapped_column(String, nullable=False)
+    starts_on: Mapped[date] = mapped_column(Date, nullable=False)
+    ends_on: Mapped[date | None] = mapped_column(Date, nullable=True)
+    interval_weeks: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    recipe = relationship("Recipe")
+
+    __table_args__ = (CheckConstraint("interval_weeks IN (1, 2)", name="ck_meal_plan_templates_interval"),)
@@ -0,0 +1,67 @@
+import typing as t
+
+from app.core.db import dialect_insert
+from app.models.base import Base
+from app.models.recipe import Ingredient
+from app.models.shopping_item import ShoppingItem
+from sqlalchemy import Connection, Integer, String, event, select
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from sqlalchemy.orm.attributes import get_history
+
+
+class Product(Base):
+    """
+    Dictionary of normalized product names. Shopping items and ingredients
+    reference it by integer ID, so merging and suggestion ranking compare
+    small integer keys instead of strings. Rows are shared by all users and
+    never deleted; ownership stays on the referencing rows.
+    """
+
+    __tablename__ = "products"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+
+
+def normalize_name(name: str) -> str:
+    return name.strip().lower()
+
+
+def intern_products(conn: Connection, names: t.Iterable[str]) -> dict[str, int]:
+    """Return {normalized name: product ID}, creating missing products."""
+    wanted = {normalize_name(name) for name in names}
+    if not wanted:
+        return {}
+
+    by_name = {
+        row.name: row.id for row in conn.execute(select(Product.name, Product.id).where(Product.name.in_(wanted)))
+    }
+    missing = wanted - by_name.keys()
+    if missing:
+        # A concurrent request may intern the same name first
+        conn.execute(
+            dialect_insert(conn)(Product).on_conflict_do_nothing(index_elements=["name"]),
+            [{"name": name} for name in missing],
+        )
+        by_name.update(
+            (row.name, row.id)
+            for row in conn.execute(select(Product.name, Product.id).where(Product.name.in_(missing)))
+        )
+    return by_name
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_product_ids(session: Session, _flush_context: t.Any, _instances: t.Any) -> None:
+    pending = [
+        obj
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, (ShoppingItem, Ingredient))
+        and (obj.product_id is None or get_history(obj, "name").has_changes())
+    ]
+    if not pending:
+        return
+
+    # Core statements on the flush's connection: the ORM flush hasn't started yet
+    product_ids = intern_products(session.connection(), (obj.name for obj in pending))
+    for obj in pending:
+        obj.product_id = product_ids[normalize_name(obj.name)]
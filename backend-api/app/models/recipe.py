@@ -26,6 +26,7 @@ recipe_shares = Table(
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    Index("ix_recipe_shares_user_id", "user_id", "recipe_id"),
 )
 
 
@@ -40,6 +41,7 @@ class Ingredient(Base):
     )
 
     name: Mapped[str]
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
     quantity: Mapped[float]
     unit: Mapped[str]
     note: Mapped[str | None] = mapped_column(nullable=True, default=None)
@@ -53,6 +55,15 @@ class Ingredient(Base):
     recipe = relationship("Recipe", back_populates="ingredients")
     category = relationship("Category", back_populates="ingredients")
 
+    __table_args__ = (
+        Index(
+            "ix_ingredients_recipe_product",
+            "recipe_id",
+            "product_id",
+            postgresql_include=["name", "category_id"],
+        ),
+    )
+
 
 class Recipe(Base):
     __tablename__ = "recipes"
@@ -61,7 +72,7 @@ class Recipe(Base):
         PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
     user_id: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
     )
 
     title: Mapped[str]
@@ -69,7 +80,10 @@ class Recipe(Base):
     source: Mapped[str | None]
 
     ingredients = relationship(
-        "Ingredient", cascade="all, delete-orphan", back_populates="recipe"
+        "Ingredient",
+        cascade="all, delete-orphan",
+        back_populates="recipe",
+        passive_deletes=True,
     )
     tags = relationship("Tag", secondary=recipe_tag, back_populates="recipes")
     shared_with_users = relationship(
@@ -77,6 +91,8 @@ class Recipe(Base):
         secondary=recipe_shares,
         back_populates="recipes_shared_with_me",
     )
-    shopping_items = relationship("ShoppingItem", back_populates="recipe")
+    shopping_items = relationship(
+        "ShoppingItem", back_populates="recipe", passive_deletes=True
+    )
 
     __table_args__ = (Index("ix_recipes_user_id", "user_id"),)
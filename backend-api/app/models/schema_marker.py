@@ -0,0 +1,15 @@
+from app.models.base import Base
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class SchemaMarker(Base):
+    """
+    Version of a piece of reference data the app maintains itself (e.g. the
+    predefined categories), so startup can skip work that has already run.
+    """
+
+    __tablename__ = "schema_markers"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[str] = mapped_column(String, nullable=False)
@@ -9,6 +9,7 @@ from sqlalchemy import (
     case,
     func,
     select,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
@@ -24,7 +25,7 @@ shopping_list_shares = Table(
         primary_key=True,
     ),
     Column("user_id", PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
-    UniqueConstraint("list_id", "user_id", name="uq_shopping_list_share"),
+    Index("ix_shopping_list_shares_user_id", "user_id", "list_id"),
 )
 
 
@@ -34,10 +35,10 @@ class ShoppingItem(Base):
         PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
     list_id: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), ForeignKey("shopping_lists.id", ondelete="CASCADE"), index=True
+        PG_UUID(as_uuid=True), ForeignKey("shopping_lists.id", ondelete="CASCADE")
     )
     user_id: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
     )
     name: Mapped[str]
     unit: Mapped[str | None] = mapped_column(nullable=True, default=None)
@@ -59,7 +60,8 @@ class ShoppingItem(Base):
         default=None,
     )
 
-    name_norm: Mapped[str]
+    # Normalized name, interned in the products dictionary (app.models.product)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
     unit_norm: Mapped[str]
 
     shopping_list = relationship("ShoppingList", back_populates="items")
@@ -69,12 +71,29 @@ class ShoppingItem(Base):
     __table_args__ = (
         UniqueConstraint(
             "list_id",
-            "name_norm",
+            "product_id",
             "unit_norm",
             "recipe_id",
             name="uq_shopping_per_source",
         ),
-        Index("ix_shopping_items_list_id", "list_id"),
+        # Lookups by list alone use the unique constraint above. The store-walk
+        # listing sorts a list's rows after fetching them: its leading key is
+        # the viewer's category rank from category_ranks, which no index on
+        # this table can provide
+        # Suggestions and category hints: a user's items by product
+        Index(
+            "ix_shopping_items_user_product",
+            "user_id",
+            "product_id",
+            postgresql_include=["name", "category_id"],
+        ),
+        # Clearing checked items and the per-list checked count
+        Index(
+            "ix_shopping_items_list_checked",
+            "list_id",
+            postgresql_where=text("checked"),
+            sqlite_where=text("checked = 1"),
+        ),
         CheckConstraint(
             "unit IN ('l', 'kg', 'ml', 'g', 'szt.', 'op.') OR unit IS NULL",
             name="ck_shopping_items_unit_allowed",
@@ -93,7 +112,10 @@ class ShoppingList(Base):
     name: Mapped[str]
     description: Mapped[str | None] = mapped_column(default=None)
     items = relationship(
-        "ShoppingItem", back_populates="shopping_list", cascade="all, delete-orphan"
+        "ShoppingItem",
+        back_populates="shopping_list",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     shared_with_users = relationship(
         "User",
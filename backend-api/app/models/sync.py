@@ -0,0 +1,164 @@
+import typing as t
+from datetime import datetime
+from uuid import UUID
+
+from app.models.base import Base
+from app.models.shopping_item import ShoppingItem
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Connection,
+    DateTime,
+    ForeignKey,
+    Index,
+    Insert,
+    Integer,
+    Select,
+    Text,
+    event,
+    func,
+    insert,
+    null,
+    select,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import InstrumentedAttribute, Mapped, Session, mapped_column
+
+
+class ShoppingItemChange(Base):
+    """
+    Append-only change log for shopping items: `revision` is the sync cursor
+    handed to clients, who ask for everything after it. Deleted items are
+    recognised by their row no longer existing. Rows with `user_id` and no
+    `item_id` record that the user gained or lost access to the list.
+
+    ORM changes are recorded by the flush hook below; set-based statements
+    must call record_item_changes. On PostgreSQL each row also records the
+    writing transaction's ID, which the sync cursor is based on (see
+    sync_horizon).
+    """
+
+    __tablename__ = "shopping_item_changes"
+
+    # BIGINT does not auto-increment on SQLite, INTEGER PRIMARY KEY does
+    revision: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    list_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    item_id: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
+    user_id: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
+    # txid_current() of the writer on PostgreSQL; NULL on SQLite
+    txid: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # Rows older than SYNC_CHANGE_RETENTION_DAYS are purged (app.core.maintenance)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_shopping_item_changes_list_revision", "list_id", "revision"),
+        Index("ix_shopping_item_changes_user_revision", "user_id", "revision"),
+        Index("ix_shopping_item_changes_list_txid", "list_id", "txid"),
+    )
+
+
+class IdempotencyKey(Base):
+    """
+    Result of a client mutation, keyed by the client's idempotency key.
+    Used by POST /sync and by the Idempotency-Key header
+    (app.core.idempotency); rows expire after IDEMPOTENCY_KEY_TTL_SECONDS.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # "<METHOD> <path>" for header-keyed requests, so a key can't be replayed
+    # elsewhere; NULL for POST /sync mutation keys
+    request_fingerprint: Mapped[str | None] = mapped_column(default=None)
+    # NULL while the first request with this key is still running
+    status_code: Mapped[int | None] = mapped_column(default=None)
+    response_body: Mapped[str | None] = mapped_column(Text, default=None)
+
+
+def _writer_txid(conn: Connection) -> ColumnElement[t.Any]:
+    return func.txid_current() if conn.dialect.name == "postgresql" else null()
+
+
+def _insert_changes(conn: Connection) -> Insert:
+    return insert(ShoppingItemChange).values(txid=_writer_txid(conn))
+
+
+def sync_horizon(db: Session) -> tuple[InstrumentedAttribute[t.Any], int]:
+    """
+    The change log column sync cursors compare against, and its current
+    value: every change at or below it is committed (or rolled back) and
+    visible, and nothing will be written below it later.
+
+    On PostgreSQL revisions are drawn at INSERT time, so revision 5 can
+    commit after 6; a cursor of 6 would skip it. Transaction IDs below the
+    oldest one still running (the snapshot's xmin) are all finished, so the
+    cursor is that xmin minus one, compared against `txid`. Writers don't
+    block each other; a long-running transaction only delays delivery.
+    SQLite runs one writer at a time, so the highest revision is final.
+    """
+    position = sync_position(db)
+    if position is ShoppingItemChange.txid:
+        xmin = db.execute(select(func.txid_snapshot_xmin(func.txid_current_snapshot()))).scalar_one()
+        return position, int(xmin) - 1
+    return position, db.scalar(select(func.max(position))) or 0
+
+
+def sync_position(db: Session) -> InstrumentedAttribute[t.Any]:
+    """The change log column sync cursors compare against (see sync_horizon)."""
+    return ShoppingItemChange.txid if db.get_bind().dialect.name == "postgresql" else ShoppingItemChange.revision
+
+
+def record_item_changes(db: Session, list_id: UUID, item_ids: t.Iterable[UUID]) -> None:
+    rows = [{"list_id": list_id, "item_id": item_id} for item_id in item_ids]
+    if rows:
+        db.execute(_insert_changes(db.connection()), rows)
+
+
+def record_item_changes_matching(db: Session, *criteria: ColumnElement[bool]) -> None:
+    """
+    Log items matching `criteria`, for statements that change them as a side
+    effect, e.g. ON DELETE SET NULL when a recipe or category is deleted.
+    Call before that statement runs.
+    """
+    txid = _writer_txid(db.connection())
+    db.execute(
+        insert(ShoppingItemChange).from_select(
+            ["list_id", "item_id", "txid"], select(ShoppingItem.list_id, ShoppingItem.id, txid).where(*criteria)
+        )
+    )
+
+
+def record_access_changes(conn: Connection, source: Select[t.Any] | t.Iterable[tuple[UUID, UUID]]) -> None:
+    """
+    Log that users gained or lost access to lists. `source` is (list_id,
+    user_id) pairs, or a SELECT of those two columns for set-based changes.
+    """
+    if isinstance(source, Select):
+        conn.execute(
+            insert(ShoppingItemChange).from_select(
+                ["list_id", "user_id", "txid"], source.add_columns(_writer_txid(conn))
+            )
+        )
+        return
+    rows = [{"list_id": list_id, "user_id": user_id} for list_id, user_id in source]
+    if rows:
+        conn.execute(_insert_changes(conn), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _log_item_changes(session: Session, _flush_context: t.Any) -> None:
+    rows = [
+        {"list_id": obj.list_id, "item_id": obj.id}
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, ShoppingItem) and (obj not in session.dirty or session.is_modified(obj))
+    ]
+    if rows:
+        # Core statements: the ORM flush is still in progress
+        conn = session.connection()
+        conn.execute(_insert_changes(conn), rows)
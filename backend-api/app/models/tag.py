@@ -2,7 +2,7 @@ from uuid import UUID, uuid4
 
 from app.models.base import Base
 from app.models.recipe import recipe_tag
-from sqlalchemy import ForeignKey, Index, UniqueConstraint
+from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -14,12 +14,12 @@ class Tag(Base):
         PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
     user_id: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
     )
     name: Mapped[str] = mapped_column(nullable=False)
     recipes = relationship("Recipe", secondary=recipe_tag, back_populates="tags")
 
     __table_args__ = (
+        # Also serves lookups by user_id alone
         UniqueConstraint("user_id", "name", name="uq_tag_user_name"),
-        Index("ix_tags_user_id", "user_id"),
     )
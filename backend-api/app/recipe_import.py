@@ -0,0 +1,149 @@
+import typing as t
+from uuid import UUID, uuid4
+
+from app.actions import valid_category_ids
+from app.models.access import RESOURCE_RECIPE, ROLE_OWNER, ResourceAccess
+from app.models.product import intern_products, normalize_name
+from app.models.recipe import Ingredient, Recipe, recipe_tag
+from app.models.tag import Tag
+from app.schemas.recipe import RecipeImportError, RecipeIn
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+IMPORT_CHUNK_SIZE = 100
+# Longer lines are reported as errors without being buffered in full
+IMPORT_MAX_LINE_BYTES = 1024 * 1024
+
+
+async def iter_import_lines(chunks: t.AsyncIterator[bytes]) -> t.AsyncIterator[bytes]:
+    """
+    Split a streamed body into lines. Only the unfinished line is kept
+    between chunks; once it passes IMPORT_MAX_LINE_BYTES, what was buffered
+    is yielded (parse_import_line reports it) and the rest is dropped.
+    """
+    buffer = bytearray()
+    overlong = False
+    async for chunk in chunks:
+        *lines, rest = chunk.split(b"\n")
+        for raw in lines:
+            if overlong:
+                overlong = False
+            else:
+                buffer += raw
+                yield bytes(buffer)
+            buffer.clear()
+        if not overlong:
+            buffer += rest
+            if len(buffer) > IMPORT_MAX_LINE_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+                overlong = True
+    if not overlong:
+        yield bytes(buffer)
+
+
+def parse_import_line(line_no: int, raw: bytes) -> RecipeIn | RecipeImportError:
+    if len(raw) > IMPORT_MAX_LINE_BYTES:
+        return RecipeImportError(line=line_no, detail=f"record: longer than {IMPORT_MAX_LINE_BYTES} bytes")
+    try:
+        return RecipeIn.model_validate_json(raw)
+    except ValidationError as exc:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}" for err in exc.errors()
+        )
+        return RecipeImportError(line=line_no, detail=detail)
+
+
+def import_recipe_chunk(
+    db: Session, user_id: UUID, records: t.Sequence[tuple[int, RecipeIn]]
+) -> tuple[list[UUID], list[RecipeImportError]]:
+    """
+    Insert one chunk of validated recipes in a single transaction.
+
+    Tags and categories are resolved for the whole chunk with one query
+    each; recipes, ingredients, tag links and access rows go in as
+    multi-row INSERTs. A record with a foreign category is reported and
+    skipped; unknown tag ids are ignored, as in POST /recipes/.
+    """
+    tag_ids = {tag_id for _, rec in records for tag_id in rec.tag_ids}
+    known_tags = (
+        set(db.scalars(select(Tag.id).where(Tag.id.in_(tag_ids), Tag.user_id == user_id)).all())
+        if tag_ids
+        else set()
+    )
+    known_categories = valid_category_ids(
+        db,
+        (ing.category_id for _, rec in records for ing in rec.ingredients if ing.category_id is not None),
+        user_id,
+    )
+
+    recipes: list[dict[str, t.Any]] = []
+    ingredients: list[dict[str, t.Any]] = []
+    tag_links: list[dict[str, t.Any]] = []
+    errors: list[RecipeImportError] = []
+    lines: list[int] = []
+
+    for line_no, rec in records:
+        if any(ing.category_id is not None and ing.category_id not in known_categories for ing in rec.ingredients):
+            errors.append(RecipeImportError(line=line_no, detail="Invalid category"))
+            continue
+
+        recipe_id = uuid4()
+        lines.append(line_no)
+        recipes.append(
+            {
+                "id": recipe_id,
+                "user_id": user_id,
+                "title": rec.title,
+                "description": rec.description,
+                "source": rec.source,
+            }
+        )
+        ingredients.extend(
+            {
+                "id": uuid4(),
+                "recipe_id": recipe_id,
+                "name": ing.name,
+                "quantity": ing.quantity,
+                "unit": ing.unit,
+                "note": ing.note,
+                "category_id": ing.category_id,
+            }
+            for ing in rec.ingredients
+        )
+        tag_links.extend(
+            {"recipe_id": recipe_id, "tag_id": tag_id}
+            for tag_id in dict.fromkeys(rec.tag_ids)
+            if tag_id in known_tags
+        )
+
+    if not recipes:
+        return [], errors
+
+    try:
+        db.execute(insert(Recipe), recipes)
+        if ingredients:
+            # Bulk INSERTs also bypass the flush hook that assigns product IDs
+            product_ids = intern_products(db.connection(), (ing["name"] for ing in ingredients))
+            for ing in ingredients:
+                ing["product_id"] = product_ids[normalize_name(ing["name"])]
+            db.execute(insert(Ingredient), ingredients)
+        if tag_links:
+            db.execute(insert(recipe_tag), tag_links)
+        # Bulk INSERTs bypass the flush hook that maintains resource_access
+        db.execute(
+            insert(ResourceAccess),
+            [
+                {"user_id": user_id, "resource_type": RESOURCE_RECIPE, "resource_id": r["id"], "role": ROLE_OWNER}
+                for r in recipes
+            ],
+        )
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        errors.extend(RecipeImportError(line=line_no, detail="Could not save recipe") for line_no in lines)
+        return [], errors
+
+    return [r["id"] for r in recipes], errors
@@ -1,14 +1,18 @@
 import logging
 
+from app.actions import revoke_owned_resource_access
 from app.core.db import get_db
 
 logger = logging.getLogger(__name__)
 from app.core.deps import get_current_user, require_premium
 from app.core.security import create_access_token, create_refresh_token, hash_password, verify_password
+from app.export import iter_account_export
 from app.models.user import User
 from app.schemas.account import AccountOut, ChangePasswordRequest, UpdatePlanRequest
 from app.schemas.auth import Token
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -56,13 +60,29 @@ def update_plan(
     return Token(access_token=access_token, refresh_token=refresh_token)
 
 
+@router.get("/export")
+def export_account(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    logger.info("Account export user=%s", current_user.id)
+    # get_db closes `db` before the body is sent; the export opens its own session
+    return StreamingResponse(
+        iter_account_export(db.get_bind(), current_user.id, current_user.email),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="kitchen-companion-export.ndjson"'},
+    )
+
+
 @router.delete("/me", status_code=204)
 def delete_account(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     logger.info("Account deleted user=%s email=%s", current_user.id, current_user.email)
-    db.delete(current_user)
+    # Everything the user owns is removed by ON DELETE CASCADE in the same statement
+    revoke_owned_resource_access(db, current_user.id)
+    db.execute(delete(User).where(User.id == current_user.id))
     db.commit()
 
 
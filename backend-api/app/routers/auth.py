@@ -4,7 +4,6 @@ import string
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-import resend
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -141,6 +140,9 @@ def request_reset(
     db.commit()
 
     if settings.RESEND_API_KEY:
+        # Only this endpoint sends email; importing resend costs ~100 ms at startup
+        import resend
+
         resend.api_key = settings.RESEND_API_KEY
         resend.Emails.send({
             "from": settings.RESET_CODE_FROM_EMAIL,
@@ -1,12 +1,14 @@
 from uuid import UUID
 
+from app.actions import category_walk_order, valid_category_ids
+from app.category_hints import category_hints
 from app.core.db import get_db
 from app.core.deps import get_current_user
-from app.models.category import Category
+from app.models.category import Category, CategoryRank
 from app.models.user import User
-from app.schemas.category import CategoryIn, CategoryOut
+from app.schemas.category import CategoryIn, CategoryOrderIn, CategoryOut
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import or_, select
+from sqlalchemy import and_, delete, insert, or_, select
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -17,11 +19,42 @@ def get_categories(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> list[Category]:
+    return _categories_in_walk_order(db, current_user.id)
+
+
+@router.put("/order", response_model=list[CategoryOut])
+def set_category_order(
+    payload: CategoryOrderIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> list[Category]:
+    category_ids = list(dict.fromkeys(payload.category_ids))
+    if len(valid_category_ids(db, category_ids, current_user.id)) != len(category_ids):
+        raise HTTPException(status_code=400, detail="Invalid category")
+
+    db.execute(delete(CategoryRank).where(CategoryRank.user_id == current_user.id))
+    if category_ids:
+        db.execute(
+            insert(CategoryRank),
+            [
+                {"user_id": current_user.id, "category_id": category_id, "rank": rank}
+                for rank, category_id in enumerate(category_ids)
+            ],
+        )
+    db.commit()
+    return _categories_in_walk_order(db, current_user.id)
+
+
+def _categories_in_walk_order(db: Session, user_id: UUID) -> list[Category]:
     return list(
         db.scalars(
             select(Category)
-            .where(or_(Category.user_id == current_user.id, Category.user_id.is_(None)))
-            .order_by(Category.user_id.is_(None).desc(), Category.name)
+            .outerjoin(
+                CategoryRank,
+                and_(CategoryRank.user_id == user_id, CategoryRank.category_id == Category.id),
+            )
+            .where(or_(Category.user_id == user_id, Category.user_id.is_(None)))
+            .order_by(*category_walk_order())
         ).all()
     )
 
@@ -96,3 +129,4 @@ def delete_category(
 
     db.delete(category)
     db.commit()
+    category_hints.forget(current_user.id)
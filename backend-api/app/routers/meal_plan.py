@@ -1,33 +1,150 @@
 from datetime import date, timedelta
+from uuid import UUID
 
 from app.core.db import get_db
 from app.core.deps import require_premium
-from app.models.meal_plan import MealPlanEntry
+from app.core.responses import fast_json
+from app.meal_plan import list_entries, owned_recipe_ids, plan_between, template_occurs, upsert_entries
+from app.models.meal_plan import MealPlanEntry, MealPlanTemplate
 from app.models.recipe import Recipe
 from app.models.user import User
-from app.schemas.meal_plan import AssignRecipeRequest, MealPlanEntryOut, VALID_SLOTS
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from app.schemas.meal_plan import (
+    VALID_SLOTS,
+    AssignRecipeRequest,
+    BulkAssignRequest,
+    CopyWeekRequest,
+    MealPlanEntryOut,
+    MealPlanTemplateIn,
+    MealPlanTemplateOut,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, joinedload
 
 router = APIRouter()
 
 
+# Enough for a month view plus the partial weeks around it
+MAX_RANGE_DAYS = 62
+
+
 @router.get("/", response_model=list[MealPlanEntryOut])
-def get_week(
-    week_start: date = Query(..., description="Monday of the week (YYYY-MM-DD)"),
+def get_entries(
+    week_start: date | None = Query(None, description="Monday of the week (YYYY-MM-DD)"),
+    date_from: date | None = Query(None, alias="from", description="First day, inclusive"),
+    date_to: date | None = Query(None, alias="to", description="Last day, inclusive"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_premium),
-):
-    week_end = week_start + timedelta(days=7)
-    entries = db.scalars(
-        select(MealPlanEntry).where(
+) -> Response:
+    if week_start is not None:
+        date_from, date_to = week_start, week_start + timedelta(days=6)
+    if date_from is None or date_to is None:
+        raise HTTPException(status_code=400, detail="Provide week_start, or both from and to")
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_RANGE_DAYS} days")
+
+    return fast_json(list[MealPlanEntryOut], plan_between(db, current_user.id, date_from, date_to))
+
+
+@router.put("/batch", response_model=list[MealPlanEntryOut])
+def assign_recipes(
+    body: BulkAssignRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_premium),
+) -> Response:
+    recipe_ids = {a.recipe_id for a in body.entries}
+    if owned_recipe_ids(db, current_user.id, recipe_ids) != recipe_ids:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    upsert_entries(db, current_user.id, ((a.date, a.meal_slot, a.recipe_id) for a in body.entries))
+    db.commit()
+
+    slots = {(a.date, a.meal_slot) for a in body.entries}
+    entries = list_entries(db, current_user.id, tuple_(MealPlanEntry.date, MealPlanEntry.meal_slot).in_(slots))
+    return fast_json(list[MealPlanEntryOut], entries)
+
+
+@router.post("/copy-week", response_model=list[MealPlanEntryOut])
+def copy_week(
+    body: CopyWeekRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_premium),
+) -> Response:
+    if body.source_week_start == body.target_week_start:
+        raise HTTPException(status_code=400, detail="Source and target weeks are the same")
+
+    # Source entries reference the user's own recipes already; slots empty in
+    # the source week, including cleared template occurrences, are left as
+    # they are in the target week
+    shift = body.target_week_start - body.source_week_start
+    source = db.execute(
+        select(MealPlanEntry.date, MealPlanEntry.meal_slot, MealPlanEntry.recipe_id).where(
             MealPlanEntry.user_id == current_user.id,
-            MealPlanEntry.date >= week_start,
-            MealPlanEntry.date < week_end,
+            MealPlanEntry.date >= body.source_week_start,
+            MealPlanEntry.date < body.source_week_start + timedelta(days=7),
+            MealPlanEntry.recipe_id.is_not(None),
         )
     ).all()
-    return entries
+    upsert_entries(db, current_user.id, ((row.date + shift, row.meal_slot, row.recipe_id) for row in source))
+    db.commit()
+
+    target_end = body.target_week_start + timedelta(days=7)
+    entries = list_entries(
+        db, current_user.id, MealPlanEntry.date >= body.target_week_start, MealPlanEntry.date < target_end
+    )
+    return fast_json(list[MealPlanEntryOut], entries)
+
+
+@router.get("/templates", response_model=list[MealPlanTemplateOut])
+def list_templates(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_premium),
+):
+    return db.scalars(
+        select(MealPlanTemplate)
+        .options(joinedload(MealPlanTemplate.recipe))
+        .where(MealPlanTemplate.user_id == current_user.id)
+        .order_by(MealPlanTemplate.starts_on, MealPlanTemplate.id)
+    ).all()
+
+
+@router.post("/templates", response_model=MealPlanTemplateOut, status_code=status.HTTP_201_CREATED)
+def create_template(
+    body: MealPlanTemplateIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_premium),
+):
+    if body.ends_on is not None and body.ends_on < body.starts_on:
+        raise HTTPException(status_code=400, detail="'ends_on' must not be before 'starts_on'")
+    if not owned_recipe_ids(db, current_user.id, [body.recipe_id]):
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    template = MealPlanTemplate(user_id=current_user.id, **body.model_dump())
+    db.add(template)
+    db.commit()
+    db.refresh(template)
+    return template
+
+
+@router.delete("/templates/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_template(
+    template_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_premium),
+):
+    template = db.scalar(
+        select(MealPlanTemplate).where(
+            MealPlanTemplate.id == template_id, MealPlanTemplate.user_id == current_user.id
+        )
+    )
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    # Overrides of its occurrences stay; they are ordinary entries now
+    db.delete(template)
+    db.commit()
 
 
 @router.put("/{entry_date}/{slot}", response_model=MealPlanEntryOut, status_code=status.HTTP_200_OK)
@@ -87,6 +204,10 @@ def remove_recipe(
             MealPlanEntry.meal_slot == slot,
         )
     )
-    if entry:
+    if template_occurs(db, current_user.id, entry_date, slot):
+        # Keep a cleared row so the template doesn't fill the slot again
+        upsert_entries(db, current_user.id, [(entry_date, slot, None)])
+        db.commit()
+    elif entry:
         db.delete(entry)
         db.commit()
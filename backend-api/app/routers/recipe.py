@@ -2,50 +2,62 @@ from uuid import UUID
 
 from app.actions import (
     create_or_merge_item,
+    get_list_for_user,
+    get_recipe_for_user,
     list_participants,
     recipe_participants,
     resolve_category_id,
-    user_can_edit_list,
-    user_can_edit_recipe,
+    revoke_resource_access,
 )
 from app.core.db import get_db
 from app.core.deps import get_current_user
-from app.models.recipe import Ingredient, Recipe, recipe_shares
-from app.models.shopping_item import ShoppingItem, ShoppingList
+from app.core.idempotency import IdempotentRoute, idempotent_request
+from app.core.responses import fast_json
+from app.models.access import RESOURCE_RECIPE, ResourceAccess
+from app.models.recipe import Ingredient, Recipe
+from app.models.shopping_item import ShoppingItem
+from app.models.sync import record_item_changes_matching
 from app.models.tag import Tag
 from app.models.user import User
+from app.recipe_import import (
+    IMPORT_CHUNK_SIZE,
+    import_recipe_chunk,
+    iter_import_lines,
+    parse_import_line,
+)
 from app.schemas.recipe import (
     IngredientsToShoppingList,
+    RecipeImportError,
+    RecipeImportResult,
     RecipeIn,
     RecipeOut,
     RecipePatch,
     RecipeShareIn,
 )
-from app.schemas.shopping_item import ShoppingItemIn, ShoppingItemOut, Unit
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import or_, select
+from app.schemas.shopping_item import MAX_QUANTITY, ShoppingItemIn, ShoppingItemOut
+from app.units import to_shopping_unit
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session, selectinload
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 
 
 @router.get("/", response_model=list[RecipeOut])
 def get_recipes(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-) -> list[Recipe]:
+) -> Response:
     q = (
         select(Recipe)
-        .outerjoin(recipe_shares, recipe_shares.c.recipe_id == Recipe.id)
+        .join(ResourceAccess, ResourceAccess.resource_id == Recipe.id)
         .where(
-            or_(
-                Recipe.user_id == current_user.id,
-                recipe_shares.c.user_id == current_user.id,
-            )
+            ResourceAccess.user_id == current_user.id,
+            ResourceAccess.resource_type == RESOURCE_RECIPE,
         )
-        .distinct()
         .options(selectinload(Recipe.shared_with_users))
     )
-    return list(db.scalars(q).all())
+    return fast_json(list[RecipeOut], db.scalars(q).all())
 
 
 @router.post("/", response_model=RecipeOut)
@@ -83,6 +95,49 @@ def add_recipe(
     return recipe
 
 
+@router.post("/import", response_model=RecipeImportResult)
+async def import_recipes(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> RecipeImportResult:
+    # Body is NDJSON: one RecipeIn document per line, validated as it arrives
+    # Read once: each chunk's commit expires current_user, and reloading it
+    # here would be a blocking query on the event loop
+    user_id = current_user.id
+    recipe_ids: list[UUID] = []
+    errors: list[RecipeImportError] = []
+    pending: list[tuple[int, RecipeIn]] = []
+    line_no = 0
+
+    async def flush() -> None:
+        imported, failed = await run_in_threadpool(import_recipe_chunk, db, user_id, pending.copy())
+        recipe_ids.extend(imported)
+        errors.extend(failed)
+        pending.clear()
+
+    async def handle(raw: bytes) -> None:
+        nonlocal line_no
+        line_no += 1
+        if not raw.strip():
+            return
+        parsed = parse_import_line(line_no, raw)
+        if isinstance(parsed, RecipeImportError):
+            errors.append(parsed)
+            return
+        pending.append((line_no, parsed))
+        if len(pending) >= IMPORT_CHUNK_SIZE:
+            await flush()
+
+    async for raw in iter_import_lines(request.stream()):
+        await handle(raw)
+    if pending:
+        await flush()
+
+    errors.sort(key=lambda e: e.line)
+    return RecipeImportResult(imported=len(recipe_ids), failed=len(errors), recipe_ids=recipe_ids, errors=errors)
+
+
 @router.put("/{recipe_id}", response_model=RecipeOut)
 def update_recipe(
     recipe_id: UUID,
@@ -90,8 +145,8 @@ def update_recipe(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Recipe:
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe or not user_can_edit_recipe(current_user, recipe):
+    recipe = get_recipe_for_user(db, recipe_id, current_user.id)
+    if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     recipe.title = recipe_in.title
@@ -128,8 +183,8 @@ def patch_recipe(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Recipe:
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe or not user_can_edit_recipe(current_user, recipe):
+    recipe = get_recipe_for_user(db, recipe_id, current_user.id)
+    if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     if patch.title is not None:
@@ -170,12 +225,21 @@ def delete_recipe(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    recipe = db.scalar(
-        select(Recipe).where(Recipe.id == recipe_id, Recipe.user_id == current_user.id)
+    # Ingredients, tag links and shares cascade; shopping items keep their row with recipe_id NULL
+    record_item_changes_matching(
+        db,
+        ShoppingItem.recipe_id.in_(
+            select(Recipe.id).where(Recipe.id == recipe_id, Recipe.user_id == current_user.id)
+        ),
     )
-    if not recipe:
+    deleted_id = db.scalar(
+        delete(Recipe)
+        .where(Recipe.id == recipe_id, Recipe.user_id == current_user.id)
+        .returning(Recipe.id)
+    )
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    db.delete(recipe)
+    revoke_resource_access(db, RESOURCE_RECIPE, recipe_id)
     db.commit()
     return None
 
@@ -241,19 +305,48 @@ def unshare_recipe(
     return None
 
 
-@router.post("/{list_id}/from-recipe/{recipe_id}", response_model=list[ShoppingItemOut])
+def _ingredient_item(ing: Ingredient, recipe_id: UUID, scale: float) -> tuple[ShoppingItemIn, str | None]:
+    """
+    The shopping item for a scaled ingredient, and its leftover unit. Units
+    without a shopping-list equivalent ("łyżka") are kept in the note and
+    passed to create_or_merge_item as `leftover_unit`.
+    """
+    quantity, unit, leftover = to_shopping_unit(ing.quantity * scale, ing.unit)
+    if quantity > MAX_QUANTITY:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Scaled quantity of {ing.name!r} exceeds {MAX_QUANTITY:g}",
+        )
+    note = ", ".join(part for part in (leftover, ing.note) if part) or None
+    item = ShoppingItemIn(
+        name=ing.name,
+        quantity=quantity,
+        unit=unit,
+        note=note[:500] if note else None,
+        recipe_id=recipe_id,
+        category_id=ing.category_id,
+    )
+    return item, leftover
+
+
+@router.post(
+    "/{list_id}/from-recipe/{recipe_id}",
+    response_model=list[ShoppingItemOut],
+    dependencies=[Depends(idempotent_request)],
+)
 def add_from_recipe(
     list_id: UUID,
     recipe_id: UUID,
+    scale: float = Query(default=1.0, gt=0, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> list[ShoppingItem]:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    shopping_list = get_list_for_user(db, list_id, current_user.id)
+    if shopping_list is None:
         raise HTTPException(status_code=404, detail="List not found")
 
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe or not user_can_edit_recipe(current_user, recipe):
+    recipe = get_recipe_for_user(db, recipe_id, current_user.id)
+    if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     list_users = list_participants(shopping_list)
@@ -269,19 +362,15 @@ def add_from_recipe(
             ),
         )
 
+    # Build every item first, so an over-limit quantity adds nothing
+    items = [_ingredient_item(ing, recipe_id, scale) for ing in recipe.ingredients]
     added: list[ShoppingItem] = []
-    for ing in recipe.ingredients:
+    for item, leftover in items:
         added_item = create_or_merge_item(
             db=db,
             shopping_list=shopping_list,
-            data=ShoppingItemIn(
-                name=ing.name,
-                quantity=ing.quantity,
-                unit=Unit(ing.unit) if ing.unit else None,
-                note=ing.note,
-                recipe_id=recipe_id,
-                category_id=ing.category_id,
-            ),
+            data=item,
+            leftover_unit=leftover,
         )
         added.append(added_item)
     return added
@@ -290,22 +379,24 @@ def add_from_recipe(
 @router.post(
     "/{recipe_id}/shopping-lists/{list_id}/items",
     response_model=list[ShoppingItemOut],
+    dependencies=[Depends(idempotent_request)],
 )
 def add_selected_ingredients_to_shopping_list(
     recipe_id: UUID,
     list_id: UUID,
     payload: IngredientsToShoppingList,
+    scale: float = Query(default=1.0, gt=0, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> list[ShoppingItem]:
     # 1. Load recipe & check access
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe or not user_can_edit_recipe(current_user, recipe):
+    recipe = get_recipe_for_user(db, recipe_id, current_user.id)
+    if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     # 2. Load shopping list & check access
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    shopping_list = get_list_for_user(db, list_id, current_user.id)
+    if shopping_list is None:
         raise HTTPException(status_code=404, detail="List not found")
 
     # 3. Check sharing rules (same as full add_from_recipe)
@@ -342,19 +433,14 @@ def add_selected_ingredients_to_shopping_list(
         )
 
     # 5. Add each ingredient as a ShoppingItem row (per-source model)
+    items = [_ingredient_item(ing, recipe_id, scale) for ing in ingredients]
     added: list[ShoppingItem] = []
-    for ing in ingredients:
+    for item, leftover in items:
         added_item = create_or_merge_item(
             db=db,
             shopping_list=shopping_list,
-            data=ShoppingItemIn(
-                name=ing.name,
-                quantity=ing.quantity,
-                unit=Unit(ing.unit) if ing.unit else None,
-                note=ing.note,
-                recipe_id=recipe_id,
-                category_id=ing.category_id,
-            ),
+            data=item,
+            leftover_unit=leftover,
         )
         added.append(added_item)
 
@@ -1,30 +1,40 @@
 from uuid import UUID
 
 from app.actions import (
+    bulk_update_items,
     create_or_merge_item,
-    find_and_merge_existing,
+    delete_list_items,
+    get_list_for_user,
+    list_item_rows,
     resolve_category_id,
-    user_can_edit_list,
+    revoke_resource_access,
+    update_list_item,
+    user_can_access_list,
 )
+from app.category_hints import category_hints, usable_category
 from app.core.db import get_db
 from app.core.deps import get_current_user
+from app.core.idempotency import IdempotentRoute, idempotent_request
+from app.core.responses import fast_json
+from app.models.access import RESOURCE_SHOPPING_LIST, ResourceAccess
 from app.models.shopping_item import ShoppingItem, ShoppingList
 from app.models.user import User
 from app.schemas.shopping_item import (
+    ShoppingItemBulkResult,
     ShoppingItemIn,
     ShoppingItemOut,
+    ShoppingItemsBulkUpdate,
     ShoppingItemUpdate,
     ShoppingListIn,
     ShoppingListOut,
     ShoppingListShareIn,
     ShoppingListUpdate,
-    Unit,
 )
-from fastapi import APIRouter, Body, Depends, HTTPException
-from sqlalchemy import or_, select
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 
 
 @router.post("/", response_model=ShoppingListOut)
@@ -51,16 +61,11 @@ def get_all_shopping_lists(
 ) -> list[ShoppingList]:
     q = (
         select(ShoppingList)
-        .outerjoin(
-            ShoppingList.shared_with_users,
-        )
+        .join(ResourceAccess, ResourceAccess.resource_id == ShoppingList.id)
         .where(
-            or_(
-                ShoppingList.user_id == current_user.id,
-                User.id == current_user.id,
-            )
+            ResourceAccess.user_id == current_user.id,
+            ResourceAccess.resource_type == RESOURCE_SHOPPING_LIST,
         )
-        .distinct()
     )
     return list(db.scalars(q).all())
 
@@ -71,8 +76,8 @@ def get_shopping_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> ShoppingList:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    shopping_list = get_list_for_user(db, list_id, current_user.id)
+    if shopping_list is None:
         raise HTTPException(status_code=404, detail="List not found")
 
     return shopping_list
@@ -85,8 +90,8 @@ def update_shopping_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> ShoppingList:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    shopping_list = get_list_for_user(db, list_id, current_user.id)
+    if shopping_list is None:
         raise HTTPException(status_code=404, detail="List not found")
 
     data = payload.model_dump(exclude_unset=True)
@@ -108,16 +113,19 @@ def delete_shopping_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    shopping_list = db.scalar(
-        select(ShoppingList).where(
+    # Items and shares go with the list via ON DELETE CASCADE
+    deleted_id = db.scalar(
+        delete(ShoppingList)
+        .where(
             ShoppingList.id == list_id,
             ShoppingList.user_id == current_user.id,
         )
+        .returning(ShoppingList.id)
     )
-    if not shopping_list:
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="List not found")
 
-    db.delete(shopping_list)
+    revoke_resource_access(db, RESOURCE_SHOPPING_LIST, list_id)
     db.commit()
     return None
 
@@ -185,20 +193,36 @@ def unshare_shopping_list(
 # ---------------------------------- Items ----------------------------------
 
 
-@router.post("/{list_id}/items", response_model=ShoppingItemOut)
+@router.post(
+    "/{list_id}/items",
+    response_model=ShoppingItemOut,
+    dependencies=[Depends(idempotent_request)],
+)
 def add_item(
     list_id: UUID,
     item: ShoppingItemIn,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> ShoppingItem:
-    shopping_list = db.get(ShoppingList, list_id)
-    if shopping_list is None or not user_can_edit_list(current_user, shopping_list):
+    shopping_list = get_list_for_user(db, list_id, current_user.id)
+    if shopping_list is None:
         raise HTTPException(status_code=404, detail="List not found")
-    item = item.model_copy(
-        update={"category_id": resolve_category_id(db, item.category_id, current_user.id)}
-    )
-    return create_or_merge_item(db=db, shopping_list=shopping_list, data=item)
+    if item.category_id is None:
+        # Served from memory after the user's first add; checked inside the INSERT
+        guess = category_hints.guess(db, current_user.id, item.name)
+        added = create_or_merge_item(
+            db=db,
+            shopping_list=shopping_list,
+            data=item,
+            category_guess=usable_category(guess, current_user.id) if guess else None,
+        )
+    else:
+        item = item.model_copy(
+            update={"category_id": resolve_category_id(db, item.category_id, current_user.id)}
+        )
+        added = create_or_merge_item(db=db, shopping_list=shopping_list, data=item)
+        category_hints.remember(current_user.id, item.name, item.category_id)
+    return added
 
 
 @router.get("/{list_id}/items", response_model=list[ShoppingItemOut])
@@ -206,35 +230,43 @@ def get_shopping_list_items(
     list_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[ShoppingItemOut]:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+) -> Response:
+    if not user_can_access_list(db, list_id, current_user.id):
         raise HTTPException(status_code=404, detail="List not found")
 
-    items = db.scalars(
-        select(ShoppingItem)
-        .where(ShoppingItem.list_id == list_id)
-        .options(selectinload(ShoppingItem.recipe), selectinload(ShoppingItem.category))
-        .order_by(ShoppingItem.name)
-    ).all()
-
-    return [
-        ShoppingItemOut(
-            id=item.id,
-            name=item.name,
-            quantity=item.quantity,
-            unit=Unit(item.unit) if item.unit else None,
-            recipe_id=item.recipe_id,
-            category_id=item.category_id,
-            checked=item.checked,
-            recipe_title=item.recipe.title if item.recipe else None,
-            category=item.category,
+    rows = list_item_rows(db, ShoppingItem.list_id == list_id, walk_order_for=current_user.id)
+    return fast_json(list[ShoppingItemOut], rows)
+
+
+@router.patch("/{list_id}/items", response_model=list[ShoppingItemBulkResult])
+def bulk_update_items_in_list(
+    list_id: UUID,
+    payload: ShoppingItemsBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> list[ShoppingItemBulkResult]:
+    if not user_can_access_list(db, list_id, current_user.id):
+        raise HTTPException(status_code=404, detail="List not found")
+
+    # Renames and unit changes can merge rows, so they stay on the single-item PATCH
+    results = bulk_update_items(db, list_id, payload.ops, current_user.id)
+
+    updated = {r.id for r in results if r.status == "updated"}
+    recategorized = {op.id for op in payload.ops if "category_id" in op.model_fields_set and op.id in updated}
+    if recategorized:
+        rows = db.execute(
+            select(ShoppingItem.name, ShoppingItem.category_id).where(ShoppingItem.id.in_(recategorized))
         )
-        for item in items
-    ]
+        for name, category_id in rows:
+            category_hints.remember(current_user.id, name, category_id)
+    return results
 
 
-@router.patch("/{list_id}/items/{item_id}", response_model=ShoppingItemOut)
+@router.patch(
+    "/{list_id}/items/{item_id}",
+    response_model=ShoppingItemOut,
+    dependencies=[Depends(idempotent_request)],
+)
 def update_item(
     list_id: UUID,
     item_id: UUID,
@@ -242,8 +274,7 @@ def update_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> ShoppingItem:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    if not user_can_access_list(db, list_id, current_user.id):
         raise HTTPException(status_code=404, detail="List not found")
 
     item = db.scalar(
@@ -255,64 +286,10 @@ def update_item(
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    data = patch.model_dump(exclude_unset=True)
-
-    if "name" in data and (data["name"] is None or data["name"].strip() == ""):
-        raise HTTPException(status_code=400, detail="Name cannot be empty")
-
-    target_name = item.name
-    target_unit = item.unit
-
-    if "name" in data and data["name"] is not None:
-        target_name = data["name"].strip()
-
-    if "unit" in data:
-        if data["unit"] is None:
-            target_unit = None
-        else:
-            target_unit = data["unit"].strip()
-
-    if "quantity" in data and data["quantity"] is not None:
-        item.quantity = data["quantity"]
-
-    if "checked" in data and data["checked"] is not None:
-        item.checked = data["checked"]
-
-    if "recipe_id" in data:
-        item.recipe_id = data["recipe_id"] if data["recipe_id"] else None
-
-    if "category_id" in data:
-        item.category_id = resolve_category_id(db, data["category_id"], current_user.id)
-
-    if target_name == item.name and target_unit == item.unit:
-        db.commit()
-        db.refresh(item)
-        return item
-
-    existing, name_norm, unit_norm = find_and_merge_existing(
-        db=db,
-        list_id=list_id,
-        name=target_name,
-        unit=target_unit,
-        quantity=item.quantity,
-        recipe_id=item.recipe_id,
-        exclude_item_id=item.id,
-    )
-
-    if existing:
-        db.delete(item)
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    item.name = target_name
-    item.unit = target_unit
-    item.name_norm = name_norm
-    item.unit_norm = unit_norm
-
-    db.commit()
-    db.refresh(item)
-    return item
+    updated = update_list_item(db, item, patch, current_user.id)
+    if "category_id" in patch.model_fields_set:
+        category_hints.remember(current_user.id, updated.name, updated.category_id)
+    return updated
 
 
 @router.delete("/{list_id}/items/{item_id}", status_code=204)
@@ -322,8 +299,7 @@ def delete_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    if not user_can_access_list(db, list_id, current_user.id):
         raise HTTPException(status_code=404, detail="List not found")
 
     item = db.scalar(
@@ -347,17 +323,10 @@ def clear_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    if not user_can_access_list(db, list_id, current_user.id):
         raise HTTPException(status_code=404, detail="List not found")
 
-    q = select(ShoppingItem).where(ShoppingItem.list_id == list_id)
-    if clear_checked:
-        q = q.where(ShoppingItem.checked)
-
-    for row in db.scalars(q).all():
-        db.delete(row)
-
+    delete_list_items(db, list_id, checked_only=clear_checked)
     db.commit()
     return None
 
@@ -369,17 +338,9 @@ def remove_recipe_from_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    shopping_list = db.get(ShoppingList, list_id)
-    if not shopping_list or not user_can_edit_list(current_user, shopping_list):
+    if not user_can_access_list(db, list_id, current_user.id):
         raise HTTPException(status_code=404, detail="List not found")
 
-    recipe_items = db.scalars(
-        select(ShoppingItem).where(
-            ShoppingItem.list_id == list_id,
-            ShoppingItem.recipe_id == recipe_id,
-        )
-    ).all()
-    for r_item in recipe_items:
-        db.delete(r_item)
+    delete_list_items(db, list_id, recipe_id=recipe_id)
     db.commit()
     return None
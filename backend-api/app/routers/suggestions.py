@@ -1,5 +1,6 @@
 from app.core.db import get_db
 from app.core.deps import get_current_user
+from app.models.product import Product, normalize_name
 from app.models.recipe import Ingredient, Recipe
 from app.models.shopping_item import ShoppingItem
 from app.models.user import User
@@ -19,24 +20,28 @@ def get_suggestions(
     if len(q) < 2:
         return []
 
-    shi_q = select(ShoppingItem.name.label("name")).where(
+    # Prefix match runs once against the product dictionary; ranking groups
+    # the user's items and ingredients by integer product ID
+    matching = select(Product.id).where(Product.name.startswith(normalize_name(q), autoescape=True))
+
+    shi_q = select(ShoppingItem.product_id, ShoppingItem.name).where(
         ShoppingItem.user_id == current_user.id,
-        ShoppingItem.name.ilike(f"{q}%"),
+        ShoppingItem.product_id.in_(matching),
     )
 
     ing_q = (
-        select(Ingredient.name.label("name"))
+        select(Ingredient.product_id, Ingredient.name)
         .join(Recipe, Recipe.id == Ingredient.recipe_id)
         .where(
             Recipe.user_id == current_user.id,
-            Ingredient.name.ilike(f"{q}%"),
+            Ingredient.product_id.in_(matching),
         )
     )
 
     subq = union_all(shi_q, ing_q).subquery()
     rows = db.execute(
-        select(subq.c.name, func.count().label("freq"))
-        .group_by(subq.c.name)
+        select(func.min(subq.c.name).label("name"), func.count().label("freq"))
+        .group_by(subq.c.product_id)
         .order_by(func.count().desc())
         .limit(8)
     ).all()
@@ -0,0 +1,31 @@
+from app.core.db import get_db
+from app.core.deps import get_current_user
+from app.core.responses import fast_json
+from app.models.user import User
+from app.schemas.sync import SyncRequest, SyncResponse
+from app.sync import apply_mutations, changes_since
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+
+router = APIRouter()
+
+
+@router.post("", response_model=SyncResponse)
+def sync(
+    payload: SyncRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    results = apply_mutations(db, current_user.id, payload.mutations)
+    revision, changed, deleted, lists_removed, reset = changes_since(db, current_user.id, payload.last_revision)
+    return fast_json(
+        SyncResponse,
+        {
+            "revision": revision,
+            "results": results,
+            "changed": changed,
+            "deleted": deleted,
+            "lists_removed": lists_removed,
+            "reset": reset,
+        },
+    )
@@ -15,3 +15,8 @@ class CategoryOut(BaseModel):
 class CategoryIn(BaseModel):
     name: str = Field(max_length=100)
     icon: str | None = Field(default=None, max_length=10)
+
+
+class CategoryOrderIn(BaseModel):
+    # Store-walk order; categories left out keep the default order after these
+    category_ids: list[UUID] = Field(max_length=500)
@@ -2,7 +2,7 @@ from datetime import date
 from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 MealSlot = Literal["breakfast", "lunch", "dinner", "supper"]
 
@@ -21,9 +21,46 @@ class MealPlanEntryOut(BaseModel):
     date: date
     meal_slot: str
     recipe: RecipeSnippet
+    # Set on occurrences expanded from a template; editing one creates an entry
+    template_id: UUID | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class AssignRecipeRequest(BaseModel):
     recipe_id: UUID
+
+
+class MealPlanAssignment(BaseModel):
+    date: date
+    meal_slot: MealSlot
+    recipe_id: UUID
+
+
+class BulkAssignRequest(BaseModel):
+    # A week is 28 slots; a few weeks at once is still one statement
+    entries: list[MealPlanAssignment] = Field(min_length=1, max_length=200)
+
+
+class CopyWeekRequest(BaseModel):
+    source_week_start: date
+    target_week_start: date
+
+
+class MealPlanTemplateIn(BaseModel):
+    recipe_id: UUID
+    meal_slot: MealSlot
+    starts_on: date
+    ends_on: date | None = None
+    interval_weeks: Literal[1, 2] = 1
+
+
+class MealPlanTemplateOut(BaseModel):
+    id: UUID
+    meal_slot: str
+    starts_on: date
+    ends_on: date | None
+    interval_weeks: int
+    recipe: RecipeSnippet
+
+    model_config = ConfigDict(from_attributes=True)
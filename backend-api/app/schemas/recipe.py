@@ -69,6 +69,18 @@ class RecipeOut(RecipeBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RecipeImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class RecipeImportResult(BaseModel):
+    imported: int
+    failed: int
+    recipe_ids: list[UUID]
+    errors: list[RecipeImportError]
+
+
 class RecipeShareIn(BaseModel):
     shared_with_email: EmailStr
 
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
@@ -15,10 +16,12 @@ class Unit(str, Enum):
 
 VALID_UNITS: tuple[str, ...] = tuple(unit.value for unit in Unit)
 
+MAX_QUANTITY = 999999
+
 
 class ShoppingItemIn(BaseModel):
     name: str = Field(max_length=255)
-    quantity: float = Field(ge=0, le=999999)
+    quantity: float = Field(ge=0, le=MAX_QUANTITY)
     unit: Unit | None = None
     note: str | None = Field(default=None, max_length=500)
     recipe_id: UUID | None = None
@@ -37,13 +40,35 @@ class ShoppingItemOut(ShoppingItemIn):
 class ShoppingItemUpdate(BaseModel):
     name: str | None = Field(default=None, max_length=255)
     unit: Unit | None = None
-    quantity: float | None = Field(default=None, ge=0, le=999999)
+    quantity: float | None = Field(default=None, ge=0, le=MAX_QUANTITY)
     note: str | None = Field(default=None, max_length=500)
     checked: bool | None = None
     recipe_id: UUID | None = None
     category_id: UUID | None = None
 
 
+class ShoppingItemBulkOp(BaseModel):
+    id: UUID
+    checked: bool | None = None
+    quantity: float | None = Field(default=None, ge=0, le=MAX_QUANTITY)
+    note: str | None = Field(default=None, max_length=500)
+    category_id: UUID | None = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ShoppingItemsBulkUpdate(BaseModel):
+    ops: list[ShoppingItemBulkOp] = Field(min_length=1, max_length=500)
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ShoppingItemBulkResult(BaseModel):
+    id: UUID
+    status: Literal["updated", "not_found", "invalid"]
+    detail: str | None = None
+
+
 class ShoppingListBase(BaseModel):
     name: str | None = Field(default=None, max_length=255)
     description: str | None = Field(default=None, max_length=2000)
@@ -0,0 +1,70 @@
+from typing import Annotated, Literal
+from uuid import UUID
+
+from app.schemas.shopping_item import (
+    ShoppingItemIn,
+    ShoppingItemOut,
+    ShoppingItemUpdate,
+)
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class _Mutation(BaseModel):
+    idempotency_key: str = Field(min_length=1, max_length=255)
+    list_id: UUID
+    item_id: UUID
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class AddItemMutation(_Mutation):
+    op: Literal["add_item"]
+    item: ShoppingItemIn
+
+
+class UpdateItemMutation(_Mutation):
+    op: Literal["update_item"]
+    patch: ShoppingItemUpdate
+
+
+class DeleteItemMutation(_Mutation):
+    op: Literal["delete_item"]
+
+
+SyncMutation = Annotated[
+    AddItemMutation | UpdateItemMutation | DeleteItemMutation,
+    Field(discriminator="op"),
+]
+
+
+class SyncRequest(BaseModel):
+    # Revision returned by the previous sync; 0 on first sync
+    last_revision: int = Field(default=0, ge=0)
+    mutations: list[SyncMutation] = Field(default_factory=list, max_length=500)
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class SyncMutationResult(BaseModel):
+    idempotency_key: str
+    # conflict: an add reused an item ID that belongs to another user
+    status: Literal["applied", "merged", "duplicate", "not_found", "invalid", "conflict"]
+    # Server ID of the affected item; differs from the client ID when merged
+    item_id: UUID | None = None
+    detail: str | None = None
+
+
+class SyncItemOut(ShoppingItemOut):
+    list_id: UUID
+
+
+class SyncResponse(BaseModel):
+    revision: int
+    results: list[SyncMutationResult]
+    changed: list[SyncItemOut]
+    deleted: list[UUID]
+    # Lists deleted or no longer shared with the user since last_revision
+    lists_removed: list[UUID]
+    # last_revision predates the retained change log: `changed` holds every
+    # accessible item and the client replaces its local items with them
+    reset: bool = False
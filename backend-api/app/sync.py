@@ -0,0 +1,241 @@
+import typing as t
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.actions import (
+    create_or_merge_item,
+    get_list_for_user,
+    list_item_rows,
+    update_list_item,
+    user_can_access_list,
+    valid_category_ids,
+)
+from app.category_hints import category_hints, usable_category
+from app.core.db import dialect_insert
+from app.models.access import RESOURCE_SHOPPING_LIST, ResourceAccess
+from app.models.shopping_item import ShoppingItem
+from app.models.sync import IdempotencyKey, ShoppingItemChange, sync_horizon
+from app.schemas.sync import (
+    AddItemMutation,
+    DeleteItemMutation,
+    SyncMutation,
+    SyncMutationResult,
+)
+from fastapi import HTTPException
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+
+def apply_mutations(
+    db: Session, user_id: UUID, mutations: t.Sequence[SyncMutation]
+) -> list[SyncMutationResult]:
+    """
+    Apply queued client mutations in order, each in its own transaction.
+
+    Every mutation's result is stored under its idempotency key in the same
+    transaction as the change (the helpers below only flush), so a retried
+    batch replays stored results instead of applying anything twice. Adds follow create_or_merge_item:
+    when the item merges into an existing one, the result carries the
+    server's item ID and later mutations in the batch may keep using the
+    client's ID.
+    """
+    aliases: dict[UUID, UUID] = {}
+    results: list[SyncMutationResult] = []
+
+    for mutation in mutations:
+        result = _stored_result(db, user_id, mutation.idempotency_key)
+        if result is None:
+            result = _apply_once(db, user_id, mutation, aliases)
+
+        if result.item_id is not None and result.item_id != mutation.item_id:
+            aliases[mutation.item_id] = result.item_id
+        results.append(result)
+
+    return results
+
+
+def _stored_result(db: Session, user_id: UUID, key: str) -> SyncMutationResult | None:
+    stored = db.get(IdempotencyKey, (user_id, key))
+    if stored is None:
+        return None
+    if stored.request_fingerprint is not None:
+        raise HTTPException(
+            status_code=409, detail=f"Idempotency key {key!r} was already used for a non-sync request"
+        )
+    if stored.response_body:
+        return SyncMutationResult.model_validate_json(stored.response_body)
+    return SyncMutationResult(idempotency_key=key, status="duplicate")
+
+
+def _reserve_key(db: Session, user_id: UUID, key: str) -> bool:
+    """
+    Insert the idempotency key in the current transaction. False when it
+    already exists: a concurrent retry with the same key got there first
+    (on PostgreSQL the INSERT waits for that transaction to finish).
+    """
+    stmt = (
+        dialect_insert(db.connection())(IdempotencyKey)
+        .values(user_id=user_id, key=key, created_at=datetime.now(timezone.utc))
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKey.key)
+    )
+    return db.scalar(stmt) is not None
+
+
+def _apply_once(
+    db: Session, user_id: UUID, mutation: SyncMutation, aliases: dict[UUID, UUID]
+) -> SyncMutationResult:
+    key = mutation.idempotency_key
+    if not _reserve_key(db, user_id, key):
+        return _stored_result(db, user_id, key) or SyncMutationResult(idempotency_key=key, status="duplicate")
+
+    try:
+        result = _apply(db, user_id, mutation, aliases)
+    except HTTPException as exc:
+        db.rollback()
+        result = SyncMutationResult(idempotency_key=key, status="invalid", detail=str(exc.detail))
+        if not _reserve_key(db, user_id, key):
+            return _stored_result(db, user_id, key) or result
+
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(response_body=result.model_dump_json())
+    )
+    db.commit()
+    return result
+
+
+def _apply(
+    db: Session, user_id: UUID, mutation: SyncMutation, aliases: dict[UUID, UUID]
+) -> SyncMutationResult:
+    def result(status: str, item_id: UUID | None = None, detail: str | None = None) -> SyncMutationResult:
+        return SyncMutationResult(
+            idempotency_key=mutation.idempotency_key, status=status, item_id=item_id, detail=detail
+        )
+
+    if isinstance(mutation, AddItemMutation):
+        shopping_list = get_list_for_user(db, mutation.list_id, user_id)
+        if shopping_list is None:
+            return result("not_found", detail="List not found")
+        category_id = mutation.item.category_id
+        if category_id is not None and not valid_category_ids(db, [category_id], user_id):
+            return result("invalid", detail="Invalid category")
+        taken = db.scalar(select(ShoppingItem.list_id).where(ShoppingItem.id == mutation.item_id))
+        if taken is not None:
+            # Only say so for items the user can see; a foreign ID is just taken
+            if user_can_access_list(db, taken, user_id):
+                return result("duplicate", mutation.item_id)
+            return result("conflict", detail="Item ID already in use")
+
+        guess = category_hints.guess(db, user_id, mutation.item.name) if category_id is None else None
+        added = create_or_merge_item(
+            db=db,
+            shopping_list=shopping_list,
+            data=mutation.item,
+            item_id=mutation.item_id,
+            category_guess=usable_category(guess, user_id) if guess else None,
+            commit=False,
+        )
+        category_hints.remember(user_id, mutation.item.name, category_id)
+        return result("applied" if added.id == mutation.item_id else "merged", added.id)
+
+    if not user_can_access_list(db, mutation.list_id, user_id):
+        return result("not_found", detail="List not found")
+
+    item_id = aliases.get(mutation.item_id, mutation.item_id)
+    item = db.scalar(
+        select(ShoppingItem).where(ShoppingItem.id == item_id, ShoppingItem.list_id == mutation.list_id)
+    )
+    if item is None:
+        return result("not_found", detail="Item not found")
+
+    if isinstance(mutation, DeleteItemMutation):
+        db.delete(item)
+        db.flush()
+        return result("applied", item_id)
+
+    # Same checks update_list_item raises on, done up front so nothing is half-applied
+    patch = mutation.patch
+    if "name" in patch.model_fields_set and not (patch.name or "").strip():
+        return result("invalid", detail="Name cannot be empty")
+    if patch.category_id is not None and not valid_category_ids(db, [patch.category_id], user_id):
+        return result("invalid", detail="Invalid category")
+
+    updated = update_list_item(db, item, patch, user_id, commit=False)
+    if "category_id" in patch.model_fields_set:
+        category_hints.remember(user_id, updated.name, updated.category_id)
+    return result("applied" if updated.id == item_id else "merged", updated.id)
+
+
+def _cursor_expired(db: Session, position: t.Any, revision: int) -> bool:
+    """Whether changes after `revision` may have been purged (app.core.maintenance)."""
+    oldest = db.scalar(select(func.min(position)))
+    return oldest is not None and revision < oldest - 1
+
+
+def changes_since(
+    db: Session, user_id: UUID, revision: int
+) -> tuple[int, list[dict[str, t.Any]], list[UUID], list[UUID], bool]:
+    """
+    Items changed after `revision` in lists the user can access.
+
+    Returns (latest revision, changed items as ShoppingItemOut-shaped dicts,
+    IDs of items deleted since, IDs of lists the user lost since, reset).
+    Lost lists were deleted or unshared; the client drops all of their
+    items. Lists the user gained since come back with all of their items.
+    Revision 0 returns every accessible item, for a first sync or a client
+    that lost its state. So does a revision older than the retained change
+    log, with reset set: the client replaces its items with the snapshot.
+    """
+    position, latest = sync_horizon(db)
+    accessible_lists = select(ResourceAccess.resource_id).where(
+        ResourceAccess.user_id == user_id,
+        ResourceAccess.resource_type == RESOURCE_SHOPPING_LIST,
+    )
+
+    def snapshot(reset: bool) -> tuple[int, list[dict[str, t.Any]], list[UUID], list[UUID], bool]:
+        return latest, list_item_rows(db, ShoppingItem.list_id.in_(accessible_lists)), [], [], reset
+
+    # Checked again after reading the delta, in case a purge ran in between
+    if revision == 0 or _cursor_expired(db, position, revision):
+        return snapshot(revision != 0)
+
+    window = (position > revision, position <= latest)
+    access_changed = set(
+        db.scalars(
+            select(ShoppingItemChange.list_id)
+            .where(*window, ShoppingItemChange.user_id == user_id, ShoppingItemChange.item_id.is_(None))
+            .distinct()
+        ).all()
+    )
+    gained: set[UUID] = set()
+    if access_changed:
+        gained = set(db.scalars(accessible_lists.where(ResourceAccess.resource_id.in_(access_changed))).all())
+    lists_removed = sorted(access_changed - gained)
+
+    changed_ids = {
+        item_id
+        for item_id in db.scalars(
+            select(ShoppingItemChange.item_id)
+            .where(
+                *window,
+                ShoppingItemChange.item_id.is_not(None),
+                ShoppingItemChange.list_id.in_(accessible_lists),
+            )
+            .distinct()
+        )
+        if item_id is not None
+    }
+    if _cursor_expired(db, position, revision):
+        return snapshot(True)
+    if not changed_ids and not gained:
+        return latest, [], [], lists_removed, False
+
+    changed = list_item_rows(
+        db,
+        or_(ShoppingItem.id.in_(changed_ids), ShoppingItem.list_id.in_(gained)),
+        ShoppingItem.list_id.in_(accessible_lists),
+    )
+    deleted = changed_ids - {row["id"] for row in changed}
+    return latest, changed, sorted(deleted), lists_removed, False
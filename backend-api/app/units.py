@@ -0,0 +1,77 @@
+"""
+Unit conversion for shopping items.
+
+Mass and volume units convert through a base unit (g, ml); counts (szt.,
+op.) do not convert. Free-text ingredient units are mapped onto the
+shopping-list units where possible.
+"""
+from app.schemas.shopping_item import Unit
+
+# unit -> (base unit, factor to base)
+_CONVERTIBLE: dict[str, tuple[str, float]] = {
+    Unit.G.value: ("g", 1.0),
+    Unit.KG.value: ("g", 1000.0),
+    Unit.ML.value: ("ml", 1.0),
+    Unit.L.value: ("ml", 1000.0),
+}
+
+# free-text ingredient unit -> (shopping unit, factor)
+_ALIASES: dict[str, tuple[Unit, float]] = {
+    "g": (Unit.G, 1), "gr": (Unit.G, 1), "gram": (Unit.G, 1), "gramy": (Unit.G, 1), "gramów": (Unit.G, 1),
+    "dag": (Unit.G, 10), "dkg": (Unit.G, 10),
+    "kg": (Unit.KG, 1), "kilogram": (Unit.KG, 1), "kilogramy": (Unit.KG, 1),
+    "ml": (Unit.ML, 1), "mililitr": (Unit.ML, 1), "mililitrów": (Unit.ML, 1),
+    "l": (Unit.L, 1), "litr": (Unit.L, 1), "litry": (Unit.L, 1), "litrów": (Unit.L, 1),
+    "szt": (Unit.SZT, 1), "szt.": (Unit.SZT, 1), "sztuka": (Unit.SZT, 1), "sztuki": (Unit.SZT, 1),
+    "sztuk": (Unit.SZT, 1), "pcs": (Unit.SZT, 1),
+    "op": (Unit.OP, 1), "op.": (Unit.OP, 1), "opakowanie": (Unit.OP, 1), "opakowania": (Unit.OP, 1),
+}  # fmt: skip
+
+
+def compatible_units(unit_norm: str) -> tuple[str, ...]:
+    """Normalized units whose quantities can be added to `unit_norm`."""
+    spec = _CONVERTIBLE.get(unit_norm)
+    if spec is None:
+        return (unit_norm,)
+    return tuple(u for u, (base, _) in _CONVERTIBLE.items() if base == spec[0])
+
+
+def convert(quantity: float, unit: str, to_unit: str) -> float:
+    """Express `quantity` of `unit` in `to_unit`; the units must be compatible."""
+    if unit == to_unit:
+        return quantity
+    return round(quantity * _CONVERTIBLE[unit][1] / _CONVERTIBLE[to_unit][1], 6)
+
+
+def add_quantities(quantity: float, unit: str, other_quantity: float, other_unit: str) -> tuple[float, str]:
+    """
+    Sum two quantities in compatible units and express the total in the
+    largest unit it reaches (500 g + 1 kg -> 1.5 kg).
+    """
+    if unit == other_unit or unit not in _CONVERTIBLE or other_unit not in _CONVERTIBLE:
+        return quantity + other_quantity, unit
+
+    base, factor = _CONVERTIBLE[unit]
+    total = quantity * factor + other_quantity * _CONVERTIBLE[other_unit][1]
+    target = max(
+        (u for u, (b, f) in _CONVERTIBLE.items() if b == base and total >= f),
+        key=lambda u: _CONVERTIBLE[u][1],
+        default=base,
+    )
+    return round(total / _CONVERTIBLE[target][1], 6), target
+
+
+def to_shopping_unit(quantity: float, unit: str | None) -> tuple[float, Unit | None, str | None]:
+    """
+    Map a free-text ingredient unit onto a shopping-list unit.
+    Returns (quantity, unit, leftover); `leftover` is the original text when
+    it has no shopping-list equivalent (e.g. "łyżka").
+    """
+    text = (unit or "").strip()
+    if not text:
+        return quantity, None, None
+    alias = _ALIASES.get(text.lower())
+    if alias is None:
+        return quantity, None, text
+    target, factor = alias
+    return round(quantity * factor, 6), target, None
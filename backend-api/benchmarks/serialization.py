@@ -0,0 +1,126 @@
+"""
+CPU cost of serializing the big list responses.
+
+Compares FastAPI's default path (response_model validation, serialization
+to Python objects, json.dumps in JSONResponse) with app.core.responses.fast_json
+(validation plus pydantic-core dump_json straight to bytes) on in-memory
+ORM objects, so no database or HTTP overhead is measured.
+
+Usage (from backend-api/):
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --recipes 500 --items 5000 --repeat 20
+
+Reports CPU milliseconds per response (median over --repeat runs) and the
+speed-up of the fast path for each payload.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import typing as t
+import uuid
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=200)
+    parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=15)
+    return parser.parse_args(argv)
+
+
+def _recipes(count: int, ingredients: int) -> list[t.Any]:
+    from app.models.category import Category
+    from app.models.recipe import Ingredient, Recipe
+    from app.models.tag import Tag
+    from app.models.user import User
+
+    category = Category(id=uuid.uuid4(), name="Nabiał", icon="milk")
+    tags = [Tag(id=uuid.uuid4(), name=f"tag {n}") for n in range(3)]
+    friend = User(id=uuid.uuid4(), email="friend@example.com")
+    recipes = []
+    for n in range(count):
+        recipe = Recipe(id=uuid.uuid4(), title=f"Przepis {n}", description="x" * 2000, source=None)
+        recipe.ingredients = [
+            Ingredient(
+                id=uuid.uuid4(), name=f"składnik {i}", quantity=1.5, unit="g", note=None, category=category
+            )
+            for i in range(ingredients)
+        ]
+        recipe.tags = tags
+        recipe.shared_with_users = [friend]
+        recipes.append(recipe)
+    return recipes
+
+
+def _items(count: int) -> list[t.Any]:
+    from app.models.category import Category
+    from app.schemas.shopping_item import ShoppingItemOut
+
+    category = Category(id=uuid.uuid4(), name="Warzywa", icon="carrot")
+    return [
+        ShoppingItemOut(
+            id=uuid.uuid4(),
+            name=f"produkt {n}",
+            quantity=2,
+            unit=None,
+            note=None,
+            recipe_id=None,
+            category_id=category.id,
+            checked=n % 3 == 0,
+            recipe_title=None,
+            category=category,
+        )
+        for n in range(count)
+    ]
+
+
+def _cpu_ms(render: t.Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    size = len(render())  # warm-up (schema/adapters are built lazily)
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        render()
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples), size
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+    from app.core.responses import fast_json
+    from app.schemas.recipe import RecipeOut
+    from app.schemas.shopping_item import ShoppingItemOut
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    payloads: list[tuple[str, t.Any, list[t.Any]]] = [
+        ("recipe_list", list[RecipeOut], _recipes(args.recipes, args.ingredients_per_recipe)),
+        ("list_items", list[ShoppingItemOut], _items(args.items)),
+    ]
+
+    print(f"{'payload':<12} {'bytes':>9} {'default ms':>11} {'fast ms':>9} {'speed-up':>9}")
+    for name, schema, content in payloads:
+        field = create_model_field(name="Response_" + name, type_=schema, mode="serialization")
+
+        # Bound as defaults: the closures must not see later loop iterations
+        def default(field: t.Any = field, content: list[t.Any] = content) -> bytes:
+            data = asyncio.run(serialize_response(field=field, response_content=content))
+            return bytes(JSONResponse(data).body)
+
+        def fast(schema: t.Any = schema, content: list[t.Any] = content) -> bytes:
+            return bytes(fast_json(schema, content).body)
+
+        default_ms, size = _cpu_ms(default, args.repeat)
+        fast_ms, _ = _cpu_ms(fast, args.repeat)
+        print(f"{name:<12} {size:>9} {default_ms:>11.2f} {fast_ms:>9.2f} {default_ms / fast_ms:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
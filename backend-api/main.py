@@ -1,15 +1,27 @@
-from contextlib import asynccontextmanager
+import asyncio
+import hmac
+import logging
+from contextlib import asynccontextmanager, suppress
 
+import anyio
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.db import SessionLocal
-from app.core.predefined_categories import seed_predefined_categories
-from app.routers import account, auth, categories, meal_plan, recipe, shopping_lists, suggestions, tags
+from app.core.db import SessionLocal, engine
+from app.core.instrumentation import QueryStatsMiddleware
+from app.core.maintenance import purge_expired_rows_periodically
+from app.core.metrics import registry
+from app.core.profiling import ProfilingMiddleware
+from app.core.predefined_categories import predefined_categories_seeded, seed_predefined_categories
+from app.routers import account, auth, categories, meal_plan, recipe, shopping_lists, suggestions, sync, tags
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import PlainTextResponse, Response
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
 
 limiter = Limiter(
     key_func=get_remote_address,
@@ -17,14 +29,46 @@ limiter = Limiter(
 )
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+def _seed() -> None:
     db = SessionLocal()
     try:
         seed_predefined_categories(db)
     finally:
         db.close()
+
+
+def _seeded_before() -> bool:
+    db = SessionLocal()
+    try:
+        return predefined_categories_seeded(db)
+    finally:
+        db.close()
+
+
+async def _seed_in_background() -> None:
+    try:
+        await run_in_threadpool(_seed)
+    except Exception:
+        logger.exception("Seeding predefined categories failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A fresh database has no system categories until the first seed, so that
+    # one is awaited. Later starts only refresh them (or skip, behind the
+    # schema marker) and run while already serving.
+    background: list[asyncio.Task[None]] = []
+    if await run_in_threadpool(_seeded_before):
+        background.append(asyncio.create_task(_seed_in_background()))
+    else:
+        await run_in_threadpool(_seed)
+    if settings.RESET_CODE_PURGE_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(purge_expired_rows_periodically()))
     yield
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
 
 
 app = FastAPI(
@@ -49,7 +93,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
+app.add_middleware(QueryStatsMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        routes=settings.profiling_route_set,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        output_dir=settings.PROFILING_OUTPUT_DIR,
+        header=settings.PROFILING_HEADER if settings.PROFILING_TOKEN or settings.is_dev else None,
+        token=settings.PROFILING_TOKEN or None,
+    )
+# Added last so it wraps QueryStatsMiddleware, which then records uncompressed sizes
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+    )
 
 
 @app.get("/ping")
@@ -57,6 +120,39 @@ def ping():
     return {"ok": True}
 
 
+def _runtime_gauges() -> dict[str, tuple[str, float]]:
+    # Must run on the event loop: the limiter is per event loop
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    gauges: dict[str, tuple[str, float]] = {
+        "threadpool_tokens_in_use": ("Worker threads busy with sync endpoints.", limiter.borrowed_tokens),
+        "threadpool_tokens_total": ("Worker thread limit.", limiter.total_tokens),
+    }
+    pool = engine.pool
+    for name, help_text, attr in (
+        ("db_pool_size", "Configured connection pool size.", "size"),
+        ("db_pool_checked_out", "Connections currently in use.", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool.", "checkedin"),
+        ("db_pool_overflow", "Connections opened beyond the pool size.", "overflow"),
+    ):
+        if hasattr(pool, attr):
+            gauges[name] = (help_text, getattr(pool, attr)())
+    return gauges
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(
+        registry.render(_runtime_gauges()),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(categories.router, prefix="/categories", tags=["categories"])
 app.include_router(recipe.router, prefix="/recipes", tags=["recipes"])
@@ -65,3 +161,4 @@ app.include_router(tags.router, prefix="/tags", tags=["tags"])
 app.include_router(account.router, prefix="/account", tags=["account"])
 app.include_router(suggestions.router, prefix="/suggestions", tags=["suggestions"])
 app.include_router(meal_plan.router, prefix="/meal-plan", tags=["meal-plan"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
@@ -9,6 +9,7 @@ from alembic import command
 from alembic.config import Config
 from app.actions import normalize_key
 from app.core.db import get_db
+from app.core.instrumentation import instrument_engine
 from app.core.predefined_categories import seed_predefined_categories
 from app.models.category import Category  # noqa: F401 — ensures table is known to metadata
 from app.models.recipe import Ingredient, Recipe
@@ -53,6 +54,7 @@ def apply_migrations():
 
 # Global engine; schema is created by Alembic
 engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+instrument_engine(engine)
 
 
 @event.listens_for(engine, "connect")
@@ -265,7 +267,7 @@ def shopping_item_factory(
         name_clean = name.strip()
         unit_clean = unit.strip()
 
-        name_norm, unit_norm = normalize_key(name_clean, unit_clean)
+        _, unit_norm = normalize_key(name_clean, unit_clean)
 
         item = ShoppingItem(
             user_id=user.id,
@@ -275,7 +277,6 @@ def shopping_item_factory(
             quantity=quantity,
             checked=checked,
             recipe_id=recipe_id,
-            name_norm=name_norm,
             unit_norm=unit_norm,
         )
         db_session.add(item)
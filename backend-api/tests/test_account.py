@@ -1,3 +1,4 @@
+import json
 import typing as t
 
 import pytest
@@ -156,3 +157,42 @@ class TestPremiumCheck:
         res = client.get("/account/premium-check", headers=auth_headers)
 
         assert res.status_code == 200
+
+
+class TestExportAccount:
+    def test_streams_owned_data_as_ndjson(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+        shopping_item_factory: t.Callable[..., t.Any],
+        user_factory: t.Callable[..., User],
+    ) -> None:
+        recipe = recipe_factory(
+            title="Pancakes",
+            ingredients=[{"name": "Flour", "quantity": 200, "unit": "g"}],
+        )
+        recipe_id = str(recipe.id)
+        shopping_item_factory(name="Milk")
+        other = user_factory(email="other@example.com")
+        recipe_factory(user=other, title="Not mine")
+
+        res = client.get("/account/export", headers=auth_headers)
+
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in res.text.splitlines()]
+        assert records[0]["type"] == "export"
+        assert records[0]["data"]["email"] == "test@example.com"
+        by_type: dict[str, list[dict]] = {}
+        for record in records[1:]:
+            by_type.setdefault(record["type"], []).append(record["data"])
+        assert [r["title"] for r in by_type["recipe"]] == ["Pancakes"]
+        assert by_type["ingredient"][0]["recipe_id"] == recipe_id
+        assert [i["name"] for i in by_type["shopping_item"]] == ["Milk"]
+        assert len(by_type["shopping_list"]) == 1
+
+    def test_unauthenticated(self, client: TestClient) -> None:
+        res = client.get("/account/export")
+
+        assert res.status_code == 401
@@ -1,7 +1,12 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.maintenance import purge_password_reset_codes
+from app.models.password_reset import PasswordResetCode
 from app.models.user import User
 
 
@@ -127,3 +132,44 @@ class TestRefresh:
         )
 
         assert res.status_code == 401
+
+
+class TestPurgeResetCodes:
+    def _code(self, *, minutes: int, used: bool = False) -> PasswordResetCode:
+        return PasswordResetCode(
+            email="user@example.com",
+            code="123456",
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=minutes),
+            used=used,
+        )
+
+    def test_deletes_used_and_expired_keeps_active(self, db_session: Session) -> None:
+        active = self._code(minutes=10)
+        db_session.add_all(
+            [active, self._code(minutes=-5), self._code(minutes=10, used=True)]
+        )
+        db_session.commit()
+
+        deleted = purge_password_reset_codes(db_session)
+
+        assert deleted == 2
+        remaining = db_session.scalars(select(PasswordResetCode.id)).all()
+        assert remaining == [active.id]
+
+    def test_deletes_in_batches(self, db_session: Session) -> None:
+        db_session.add_all([self._code(minutes=-1) for _ in range(5)])
+        db_session.commit()
+
+        deleted = purge_password_reset_codes(db_session, batch_size=2)
+
+        assert deleted == 5
+        assert db_session.scalars(select(PasswordResetCode)).all() == []
+
+    def test_request_reset_leaves_only_one_active_code(
+        self, client: TestClient, db_session: Session
+    ) -> None:
+        client.post("/auth/request-reset", json={"email": "user@example.com"})
+        client.post("/auth/request-reset", json={"email": "user@example.com"})
+
+        assert purge_password_reset_codes(db_session) == 1
+        assert len(db_session.scalars(select(PasswordResetCode)).all()) == 1
@@ -3,8 +3,16 @@ import typing as t
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.core.predefined_categories import (
+    MARKER_NAME,
+    PREDEFINED_CATEGORIES,
+    PREDEFINED_CATEGORIES_VERSION,
+    predefined_categories_seeded,
+    seed_predefined_categories,
+)
 from app.models.category import Category
 from app.models.recipe import Ingredient, Recipe
+from app.models.schema_marker import SchemaMarker
 from app.models.shopping_item import ShoppingItem, ShoppingList
 from app.models.user import User
 
@@ -71,6 +79,76 @@ class TestGetCategories:
         assert user_cats[0]["is_system"] is False
 
 
+class TestCategoryOrder:
+    def test_set_order_puts_ranked_categories_first(
+        self, client: TestClient, auth_headers: dict[str, str], db_session: Session
+    ) -> None:
+        current_user = db_session.query(User).filter_by(email="test@example.com").one()
+        custom = _category_factory(db_session, current_user, name="custom")
+        bakery = db_session.query(Category).filter_by(name="pieczywo", user_id=None).one()
+
+        res = client.put(
+            "/categories/order",
+            json={"category_ids": [str(custom.id), str(bakery.id)]},
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 200
+        assert [c["name"] for c in res.json()[:3]] == ["custom", "pieczywo", "alkohol"]
+        listed = client.get("/categories/", headers=auth_headers).json()
+        assert [c["id"] for c in listed] == [c["id"] for c in res.json()]
+
+    def test_order_rejects_other_users_categories(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+    ) -> None:
+        other_cat = _category_factory(db_session, user_factory(), name="theirs")
+
+        res = client.put(
+            "/categories/order", json={"category_ids": [str(other_cat.id)]}, headers=auth_headers
+        )
+
+        assert res.status_code == 400
+
+    def test_items_follow_category_order(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        by_name = {
+            c.name: c
+            for c in db_session.query(Category).filter(
+                Category.user_id.is_(None), Category.name.in_(["nabiał", "pieczywo", "owoce i warzywa"])
+            )
+        }
+        for name, category in [
+            ("Rolls", "pieczywo"),
+            ("Apples", "owoce i warzywa"),
+            ("Bread", "pieczywo"),
+            ("Milk", "nabiał"),
+            ("Candles", None),
+        ]:
+            item = shopping_item_factory(name=name, shopping_list=shopping_list)
+            item.category_id = by_name[category].id if category else None
+        db_session.flush()
+
+        client.put(
+            "/categories/order",
+            json={"category_ids": [str(by_name["owoce i warzywa"].id), str(by_name["pieczywo"].id)]},
+            headers=auth_headers,
+        )
+        res = client.get(f"/shopping-lists/{shopping_list.id}/items", headers=auth_headers)
+
+        assert [i["name"] for i in res.json()] == ["Apples", "Bread", "Rolls", "Milk", "Candles"]
+
+
 class TestCreateCategory:
     def test_create_category(
         self, client: TestClient, auth_headers: dict[str, str], db_session: Session
@@ -252,3 +330,35 @@ class TestCategoryPropagation:
         )
 
         assert res.status_code == 400
+
+
+class TestPredefinedCategorySeed:
+    def test_skipped_when_marker_is_current(self, db_session: Session) -> None:
+        # The session fixture already seeded the test DB
+        assert seed_predefined_categories(db_session) is False
+
+    def test_fresh_database_is_reported_unseeded(self, db_session: Session) -> None:
+        assert predefined_categories_seeded(db_session) is True
+
+        marker = db_session.get(SchemaMarker, MARKER_NAME)
+        assert marker is not None
+        db_session.delete(marker)
+        db_session.flush()
+
+        assert predefined_categories_seeded(db_session) is False
+
+    def test_reruns_when_the_list_changed(self, db_session: Session) -> None:
+        marker = db_session.get(SchemaMarker, MARKER_NAME)
+        assert marker is not None
+        marker.version = "outdated"
+        sys_cat = _system_category(db_session)
+        sys_cat.icon = None
+        db_session.flush()
+
+        assert seed_predefined_categories(db_session) is True
+
+        db_session.refresh(sys_cat)
+        assert sys_cat.icon == next(c.icon for c in PREDEFINED_CATEGORIES if c.name == sys_cat.name)
+        db_session.refresh(marker)
+        assert marker.version == PREDEFINED_CATEGORIES_VERSION
+        assert db_session.query(Category).filter(Category.user_id.is_(None)).count() == len(PREDEFINED_CATEGORIES)
@@ -0,0 +1,112 @@
+import gzip
+import zlib
+
+import anyio
+from app.core.compression import CompressionMiddleware, choose_encoding
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+BIG = {"items": ["milk"] * 1000}
+
+
+def _client(**options) -> tuple[TestClient, CompressionMiddleware]:
+    app = FastAPI()
+
+    @app.get("/big")
+    def big() -> dict:
+        return BIG
+
+    @app.get("/small")
+    def small() -> dict:
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse((b"line\n" for _ in range(500)), media_type="application/x-ndjson")
+
+    @app.get("/binary")
+    def binary() -> PlainTextResponse:
+        return PlainTextResponse("x" * 5000, media_type="image/png")
+
+    middleware = CompressionMiddleware(app, minimum_size=500, **options)
+    return TestClient(middleware), middleware
+
+
+class TestCompression:
+    def test_negotiates_supported_encoding(self) -> None:
+        assert choose_encoding("gzip;q=0.5, identity") == "gzip"
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("") is None
+        assert choose_encoding("*") is not None
+
+    def test_compresses_large_json_only(self) -> None:
+        client, _ = _client()
+        headers = {"Accept-Encoding": "gzip"}
+
+        big = client.get("/big", headers=headers)
+        small = client.get("/small", headers=headers)
+        binary = client.get("/binary", headers=headers)
+
+        assert big.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in big.headers["vary"].lower()
+        assert big.json() == BIG
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in binary.headers
+
+    def test_streaming_response_is_compressed_incrementally(self) -> None:
+        client, _ = _client()
+
+        res = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert res.headers["content-encoding"] == "gzip"
+        assert res.text == "line\n" * 500
+
+    def test_streamed_chunks_are_flushed_as_they_are_sent(self) -> None:
+        chunks = [b'{"n": %d}\n' % i for i in range(3)]
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            headers = [(b"content-type", b"application/x-ndjson")]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            for i, chunk in enumerate(chunks):
+                await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+        sent: list[Message] = []
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b""}
+
+        scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+        anyio.run(CompressionMiddleware(app), scope, receive, send)
+
+        decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        bodies = [m["body"] for m in sent if m["type"] == "http.response.body"]
+        assert [decoder.decompress(body) for body in bodies] == chunks
+
+    def test_etag_revalidation_and_compressed_cache(self) -> None:
+        client, middleware = _client()
+
+        first = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["etag"]
+        assert middleware.cache.get((etag, "gzip")) is not None
+
+        repeat = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        not_modified = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+        assert repeat.headers["etag"] == etag
+        assert repeat.json() == BIG
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    def test_cache_is_bounded_by_bytes(self) -> None:
+        _, middleware = _client(cache_max_bytes=100)
+
+        middleware.cache.put(("a", "gzip"), gzip.compress(b"x" * 10))
+        middleware.cache.put(("b", "gzip"), b"y" * 80)
+
+        assert middleware.cache.size <= 100
+        assert middleware.cache.get(("a", "gzip")) is None
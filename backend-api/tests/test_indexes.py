@@ -0,0 +1,105 @@
+import typing as t
+from datetime import date
+from uuid import uuid4
+
+from app.actions import product_id_of
+from app.models.meal_plan import MealPlanEntry
+from app.models.product import Product
+from app.models.recipe import Ingredient, recipe_shares
+from app.models.shopping_item import ShoppingItem
+from sqlalchemy import Executable, delete, event, select
+from sqlalchemy.orm import Session
+
+
+def explain(db: Session, stmt: Executable) -> str:
+    """
+    Query plan of `stmt`, as run by the app: the statement is executed once
+    to capture the exact SQL and bound parameters, then explained.
+    """
+    conn = db.connection()
+    captured: list[tuple[str, t.Any]] = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany) -> None:
+        captured.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", capture)
+    try:
+        conn.execute(stmt)
+    finally:
+        event.remove(conn, "before_cursor_execute", capture)
+
+    statement, parameters = captured[0]
+    if conn.dialect.name == "postgresql":
+        # Test tables are tiny; make the planner show which index it would use
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+        return "\n".join(row[0] for row in rows)
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def index_of(db: Session, name: str, table: str) -> str:
+    """SQLite names the index behind a UNIQUE constraint sqlite_autoindex_<table>_N."""
+    if db.get_bind().dialect.name == "sqlite" and name.startswith("uq_"):
+        return f"sqlite_autoindex_{table}_"
+    return name
+
+
+class TestHotQueryIndexes:
+    def test_merge_lookup_uses_unique_key(self, db_session: Session) -> None:
+        plan = explain(
+            db_session,
+            select(ShoppingItem).where(
+                ShoppingItem.list_id == uuid4(),
+                ShoppingItem.product_id == product_id_of("milk"),
+                ShoppingItem.unit_norm.in_(("ml", "l")),
+                ShoppingItem.recipe_id.is_(None),
+            ),
+        )
+
+        assert index_of(db_session, "uq_shopping_per_source", "shopping_items") in plan
+
+    def test_meal_plan_range_uses_user_date_key(self, db_session: Session) -> None:
+        plan = explain(
+            db_session,
+            select(MealPlanEntry).where(
+                MealPlanEntry.user_id == uuid4(),
+                MealPlanEntry.date >= date(2026, 1, 5),
+                MealPlanEntry.date < date(2026, 1, 12),
+            ),
+        )
+
+        assert index_of(db_session, "uq_meal_plan_user_date_slot", "meal_plan_entries") in plan
+
+    def test_suggestions_use_user_product_index(self, db_session: Session) -> None:
+        matching = select(Product.id).where(Product.name.startswith("mar"))
+        plan = explain(
+            db_session,
+            select(ShoppingItem.product_id, ShoppingItem.name).where(
+                ShoppingItem.user_id == uuid4(),
+                ShoppingItem.product_id.in_(matching),
+            ),
+        )
+
+        assert "ix_shopping_items_user_product" in plan
+
+    def test_recipe_ingredients_use_recipe_index(self, db_session: Session) -> None:
+        plan = explain(db_session, select(Ingredient).where(Ingredient.recipe_id == uuid4()))
+
+        assert "ix_ingredients_recipe_product" in plan
+
+    def test_shared_with_me_uses_user_index(self, db_session: Session) -> None:
+        plan = explain(
+            db_session, select(recipe_shares.c.recipe_id).where(recipe_shares.c.user_id == uuid4())
+        )
+
+        assert "ix_recipe_shares_user_id" in plan
+
+    def test_clearing_checked_items_uses_partial_index(self, db_session: Session) -> None:
+        plan = explain(
+            db_session,
+            delete(ShoppingItem).where(ShoppingItem.list_id == uuid4(), ShoppingItem.checked),
+        )
+
+        assert "ix_shopping_items_list_checked" in plan
+
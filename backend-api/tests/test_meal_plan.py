@@ -0,0 +1,359 @@
+import typing as t
+from datetime import date
+
+import pytest
+from app.models.meal_plan import MealPlanEntry, MealPlanTemplate
+from app.models.recipe import Recipe
+from app.models.user import User
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def premium_headers(auth_headers: dict[str, str], db_session: Session) -> dict[str, str]:
+    user = db_session.query(User).filter_by(email="test@example.com").one()
+    user.plan = "premium"
+    db_session.flush()
+    return auth_headers
+
+
+@pytest.fixture
+def meal_plan_factory(db_session: Session) -> t.Callable[..., MealPlanEntry]:
+    def _factory(*, recipe: Recipe, day: date, slot: str = "dinner") -> MealPlanEntry:
+        entry = MealPlanEntry(user_id=recipe.user_id, date=day, meal_slot=slot, recipe_id=recipe.id)
+        db_session.add(entry)
+        db_session.flush()
+        return entry
+
+    return _factory
+
+
+class TestGetMealPlan:
+    def test_range_returns_entries_in_date_order(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        recipe = recipe_factory(title="Soup", description="x" * 5000)
+        meal_plan_factory(recipe=recipe, day=date(2026, 10, 31), slot="lunch")
+        meal_plan_factory(recipe=recipe, day=date(2026, 10, 1))
+        meal_plan_factory(recipe=recipe, day=date(2026, 11, 1))
+
+        res = client.get("/meal-plan/?from=2026-10-01&to=2026-10-31", headers=premium_headers)
+
+        assert res.status_code == 200
+        body = res.json()
+        assert [e["date"] for e in body] == ["2026-10-01", "2026-10-31"]
+        assert body[0]["recipe"] == {"id": str(recipe.id), "title": "Soup"}
+
+    def test_week_start_still_returns_seven_days(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        recipe = recipe_factory()
+        meal_plan_factory(recipe=recipe, day=date(2026, 10, 18))
+        meal_plan_factory(recipe=recipe, day=date(2026, 10, 19))
+
+        res = client.get("/meal-plan/?week_start=2026-10-12", headers=premium_headers)
+
+        assert [e["date"] for e in res.json()] == ["2026-10-18"]
+
+    @pytest.mark.parametrize(
+        "query",
+        ["", "from=2026-10-01", "from=2026-10-10&to=2026-10-01", "from=2026-01-01&to=2026-12-31"],
+    )
+    def test_invalid_ranges_are_rejected(
+        self, client: TestClient, premium_headers: dict[str, str], query: str
+    ) -> None:
+        res = client.get(f"/meal-plan/?{query}", headers=premium_headers)
+
+        assert res.status_code == 400
+
+    def test_requires_premium(self, client: TestClient, auth_headers: dict[str, str]) -> None:
+        res = client.get("/meal-plan/?from=2026-10-01&to=2026-10-31", headers=auth_headers)
+
+        assert res.status_code == 403
+
+
+class TestBulkAssign:
+    def test_assigns_many_slots_and_updates_occupied_ones(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        soup, pasta = recipe_factory(title="Soup"), recipe_factory(title="Pasta")
+        existing = meal_plan_factory(recipe=soup, day=date(2026, 10, 19), slot="dinner")
+
+        res = client.put(
+            "/meal-plan/batch",
+            json={
+                "entries": [
+                    {"date": "2026-10-19", "meal_slot": "dinner", "recipe_id": str(pasta.id)},
+                    {"date": "2026-10-20", "meal_slot": "lunch", "recipe_id": str(soup.id)},
+                    {"date": "2026-10-20", "meal_slot": "lunch", "recipe_id": str(pasta.id)},
+                ]
+            },
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 200
+        body = res.json()
+        assert [(e["date"], e["meal_slot"], e["recipe"]["title"]) for e in body] == [
+            ("2026-10-19", "dinner", "Pasta"),
+            ("2026-10-20", "lunch", "Pasta"),
+        ]
+        assert body[0]["id"] == str(existing.id)
+
+    def test_rejects_recipes_of_other_users(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        own = recipe_factory()
+        foreign = recipe_factory(user=user_factory())
+
+        res = client.put(
+            "/meal-plan/batch",
+            json={
+                "entries": [
+                    {"date": "2026-10-19", "meal_slot": "dinner", "recipe_id": str(own.id)},
+                    {"date": "2026-10-20", "meal_slot": "dinner", "recipe_id": str(foreign.id)},
+                ]
+            },
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 404
+        assert db_session.query(MealPlanEntry).count() == 0
+
+    def test_rejects_unknown_slot(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        recipe = recipe_factory()
+
+        res = client.put(
+            "/meal-plan/batch",
+            json={"entries": [{"date": "2026-10-19", "meal_slot": "brunch", "recipe_id": str(recipe.id)}]},
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 422
+
+
+class TestCopyWeek:
+    def test_copies_occupied_slots_into_target_week(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        soup, pasta, salad = (recipe_factory(title=title) for title in ("Soup", "Pasta", "Salad"))
+        meal_plan_factory(recipe=soup, day=date(2026, 10, 12), slot="dinner")
+        meal_plan_factory(recipe=pasta, day=date(2026, 10, 18), slot="lunch")
+        meal_plan_factory(recipe=salad, day=date(2026, 10, 19), slot="dinner")
+        meal_plan_factory(recipe=salad, day=date(2026, 10, 20), slot="breakfast")
+
+        res = client.post(
+            "/meal-plan/copy-week",
+            json={"source_week_start": "2026-10-12", "target_week_start": "2026-10-19"},
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 200
+        assert [(e["date"], e["meal_slot"], e["recipe"]["title"]) for e in res.json()] == [
+            ("2026-10-19", "dinner", "Soup"),
+            ("2026-10-20", "breakfast", "Salad"),
+            ("2026-10-25", "lunch", "Pasta"),
+        ]
+
+    def test_cleared_occurrences_do_not_clear_target_slots(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        soup, pasta = recipe_factory(title="Soup"), recipe_factory(title="Pasta")
+        client.post(
+            "/meal-plan/templates",
+            json={
+                "recipe_id": str(soup.id),
+                "meal_slot": "dinner",
+                "starts_on": "2026-10-12",
+                "ends_on": "2026-10-12",
+            },
+            headers=premium_headers,
+        )
+        client.delete("/meal-plan/2026-10-12/dinner", headers=premium_headers)
+        meal_plan_factory(recipe=pasta, day=date(2026, 10, 19), slot="dinner")
+
+        res = client.post(
+            "/meal-plan/copy-week",
+            json={"source_week_start": "2026-10-12", "target_week_start": "2026-10-19"},
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 200
+        week = client.get("/meal-plan/?week_start=2026-10-19", headers=premium_headers).json()
+        assert [(e["date"], e["recipe"]["title"]) for e in week] == [("2026-10-19", "Pasta")]
+
+    def test_same_week_is_rejected(self, client: TestClient, premium_headers: dict[str, str]) -> None:
+        res = client.post(
+            "/meal-plan/copy-week",
+            json={"source_week_start": "2026-10-12", "target_week_start": "2026-10-12"},
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 400
+
+
+class TestTemplates:
+    def test_occurrences_are_expanded_and_overridden(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        soup, pasta = recipe_factory(title="Soup"), recipe_factory(title="Pasta")
+        created = client.post(
+            "/meal-plan/templates",
+            json={"recipe_id": str(soup.id), "meal_slot": "dinner", "starts_on": "2026-10-05"},
+            headers=premium_headers,
+        )
+        meal_plan_factory(recipe=pasta, day=date(2026, 10, 19), slot="dinner")
+
+        res = client.get("/meal-plan/?from=2026-10-10&to=2026-10-31", headers=premium_headers)
+
+        assert created.status_code == 201
+        body = res.json()
+        assert [(e["date"], e["recipe"]["title"], e["template_id"]) for e in body] == [
+            ("2026-10-12", "Soup", created.json()["id"]),
+            ("2026-10-19", "Pasta", None),
+            ("2026-10-26", "Soup", created.json()["id"]),
+        ]
+        # Occurrence IDs are stable across reads
+        again = client.get("/meal-plan/?week_start=2026-10-26", headers=premium_headers).json()
+        assert again[0]["id"] == body[2]["id"]
+        assert db_session.query(MealPlanEntry).count() == 1
+
+    def test_biweekly_template_stops_at_end_date(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        recipe = recipe_factory()
+        client.post(
+            "/meal-plan/templates",
+            json={
+                "recipe_id": str(recipe.id),
+                "meal_slot": "lunch",
+                "starts_on": "2026-09-28",
+                "ends_on": "2026-11-09",
+                "interval_weeks": 2,
+            },
+            headers=premium_headers,
+        )
+
+        res = client.get("/meal-plan/?from=2026-10-01&to=2026-11-30", headers=premium_headers)
+
+        assert [e["date"] for e in res.json()] == ["2026-10-12", "2026-10-26", "2026-11-09"]
+
+    def test_removing_an_occurrence_clears_only_that_date(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        recipe = recipe_factory()
+        client.post(
+            "/meal-plan/templates",
+            json={"recipe_id": str(recipe.id), "meal_slot": "dinner", "starts_on": "2026-10-12"},
+            headers=premium_headers,
+        )
+
+        res = client.delete("/meal-plan/2026-10-19/dinner", headers=premium_headers)
+
+        assert res.status_code == 204
+        week = client.get("/meal-plan/?from=2026-10-12&to=2026-10-26", headers=premium_headers).json()
+        assert [e["date"] for e in week] == ["2026-10-12", "2026-10-26"]
+        cleared = db_session.query(MealPlanEntry).one()
+        assert (cleared.date, cleared.recipe_id) == (date(2026, 10, 19), None)
+
+    def test_deleting_template_keeps_overrides(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+        meal_plan_factory: t.Callable[..., MealPlanEntry],
+    ) -> None:
+        soup, pasta = recipe_factory(title="Soup"), recipe_factory(title="Pasta")
+        template = client.post(
+            "/meal-plan/templates",
+            json={"recipe_id": str(soup.id), "meal_slot": "dinner", "starts_on": "2026-10-12"},
+            headers=premium_headers,
+        ).json()
+        meal_plan_factory(recipe=pasta, day=date(2026, 10, 19), slot="dinner")
+
+        res = client.delete(f"/meal-plan/templates/{template['id']}", headers=premium_headers)
+
+        assert res.status_code == 204
+        assert db_session.query(MealPlanTemplate).count() == 0
+        week = client.get("/meal-plan/?from=2026-10-12&to=2026-10-26", headers=premium_headers).json()
+        assert [(e["date"], e["recipe"]["title"]) for e in week] == [("2026-10-19", "Pasta")]
+
+    def test_rejects_recipes_of_other_users(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        user_factory: t.Callable[..., User],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        foreign = recipe_factory(user=user_factory())
+
+        res = client.post(
+            "/meal-plan/templates",
+            json={"recipe_id": str(foreign.id), "meal_slot": "dinner", "starts_on": "2026-10-12"},
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 404
+
+    def test_end_before_start_is_rejected(
+        self,
+        client: TestClient,
+        premium_headers: dict[str, str],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        recipe = recipe_factory()
+
+        res = client.post(
+            "/meal-plan/templates",
+            json={
+                "recipe_id": str(recipe.id),
+                "meal_slot": "dinner",
+                "starts_on": "2026-10-12",
+                "ends_on": "2026-10-05",
+            },
+            headers=premium_headers,
+        )
+
+        assert res.status_code == 400
@@ -0,0 +1,169 @@
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+import pytest
+from app.core.config import settings
+from app.core.instrumentation import normalize_sql
+from app.core.metrics import registry
+from app.core.profiling import ProfilingMiddleware
+from app.models.shopping_item import ShoppingList
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+class TestRequestInstrumentation:
+    def test_server_timing_and_route_metrics(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        registry.reset()
+
+        res = client.get(f"/shopping-lists/{shopping_list.id}/items", headers=auth_headers)
+
+        assert res.status_code == 200
+        assert res.headers["server-timing"].startswith("db;dur=")
+        stats = registry.snapshot()[("GET", "/shopping-lists/{list_id}/items")]
+        assert stats.requests == 1
+        assert stats.db_statements >= 2
+
+    def test_normalize_sql_groups_query_shapes(self) -> None:
+        sql = "SELECT *\n  FROM items WHERE id IN (?, ?, ?) AND name = 'x' LIMIT 10"
+
+        assert normalize_sql(sql) == "SELECT * FROM items WHERE id IN (?) AND name = ? LIMIT ?"
+
+
+class TestMetricsEndpoint:
+    def test_disabled_by_default(self, client: TestClient) -> None:
+        assert client.get("/metrics").status_code == 404
+
+    def test_exposes_route_histograms_and_runtime_gauges(
+        self, client: TestClient, auth_headers: dict[str, str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+        client.get("/shopping-lists", headers=auth_headers)
+
+        res = client.get("/metrics")
+
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = res.text
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/shopping-lists/"}'
+            in body
+        )
+        assert 'http_response_size_bytes_bucket{method="GET",route="/shopping-lists/",le="+Inf"}' in body
+        assert "http_requests_in_flight 1" in body
+        assert "threadpool_tokens_total" in body
+
+    def test_token_is_required_when_configured(self, client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        registry.reset()
+        for seconds in (0.001, 0.02, 3.0, 30.0):
+            registry.request_started()
+            registry.record_request(
+                method="GET",
+                route="/x",
+                status=200,
+                seconds=seconds,
+                db_statements=1,
+                db_seconds=0.001,
+            )
+
+        body = registry.render()
+
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="0.005"} 1' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="0.025"} 2' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="5"} 3' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="+Inf"} 4' in body
+        assert 'db_statements_total{method="GET",route="/x"} 4' in body
+
+
+class TestProfiling:
+    def _app(self, output_dir: Path, **kwargs: t.Any) -> FastAPI:
+        app = FastAPI()
+
+        def spin(seconds: float) -> int:
+            deadline = time.perf_counter() + seconds
+            total = 0
+            while time.perf_counter() < deadline:
+                total += 1
+            return total
+
+        def background_work() -> int:
+            return spin(0.5)
+
+        @app.get("/busy")
+        def busy_endpoint(background: bool = False) -> dict[str, int]:
+            return {"total": background_work() if background else spin(0.1)}
+
+        @app.get("/other")
+        def other_endpoint() -> dict[str, bool]:
+            return {"ok": True}
+
+        app.add_middleware(
+            ProfilingMiddleware,
+            routes={"busy_endpoint"},
+            sample_rate=0.0,
+            interval_ms=1.0,
+            output_dir=str(output_dir),
+            **kwargs,
+        )
+        return app
+
+    def test_header_profiles_selected_route(self, tmp_path: Path) -> None:
+        with TestClient(self._app(tmp_path)) as client:
+            client.get("/busy", headers={"X-Profile": "1"})
+            client.get("/other", headers={"X-Profile": "1"})
+
+        lines = (tmp_path / "busy_endpoint.folded").read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert stack.startswith("busy_endpoint (")
+        assert int(count) > 0
+        assert not (tmp_path / "other_endpoint.folded").exists()
+
+    def test_concurrent_requests_to_the_route_are_not_sampled(self, tmp_path: Path) -> None:
+        with TestClient(self._app(tmp_path)) as client:
+            other = threading.Thread(target=client.get, args=("/busy?background=true",))
+            other.start()
+            time.sleep(0.1)
+            client.get("/busy", headers={"X-Profile": "1"})
+            other.join()
+
+        stacks = (tmp_path / "busy_endpoint.folded").read_text()
+        assert "spin (" in stacks
+        assert "background_work" not in stacks
+
+    def test_header_needs_the_token_when_one_is_set(self, tmp_path: Path) -> None:
+        with TestClient(self._app(tmp_path, token="s3cret")) as client:
+            client.get("/busy", headers={"X-Profile": "1"})
+            assert not list(tmp_path.iterdir())
+
+            client.get("/busy", headers={"X-Profile": "s3cret"})
+
+        assert (tmp_path / "busy_endpoint.folded").exists()
+
+    def test_header_is_ignored_when_disabled(self, tmp_path: Path) -> None:
+        with TestClient(self._app(tmp_path, header=None)) as client:
+            client.get("/busy", headers={"X-Profile": "1"})
+
+        assert not list(tmp_path.iterdir())
+
+    def test_unsampled_requests_are_not_profiled(self, tmp_path: Path) -> None:
+        with TestClient(self._app(tmp_path)) as client:
+            client.get("/busy")
+
+        assert not list(tmp_path.iterdir())
@@ -1,10 +1,14 @@
+import json
 import typing as t
 from uuid import uuid4
 
+import anyio
+import pytest
 from app.models.recipe import Ingredient, Recipe
 from app.models.shopping_item import ShoppingItem, ShoppingList
 from app.models.tag import Tag
 from app.models.user import User
+from app.recipe_import import iter_import_lines
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
@@ -246,6 +250,23 @@ def test_delete_recipe(
     assert remaining_ings == []
 
 
+def test_delete_recipe_keeps_shopping_items_without_recipe(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    recipe_factory: t.Callable[..., Recipe],
+    shopping_item_factory: t.Callable[..., ShoppingItem],
+    db_session: Session,
+) -> None:
+    recipe = recipe_factory(title="To delete")
+    item = shopping_item_factory(name="Flour", unit="g", recipe_id=recipe.id)
+
+    res = client.delete(f"/recipes/{recipe.id}", headers=auth_headers)
+
+    assert res.status_code == 204
+    db_session.refresh(item)
+    assert item.recipe_id is None
+
+
 def test_delete_recipe_not_found_returns_404(
     client: TestClient,
     auth_headers: dict[str, str],
@@ -640,6 +661,137 @@ def test_add_from_recipe_does_not_merge_items_from_other_recipes(
     assert qty_by_recipe[recipe2.id] == 4.0
 
 
+def test_add_from_recipe_merges_convertible_units(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    db_session: Session,
+    shopping_list_factory: t.Callable[..., ShoppingList],
+    shopping_item_factory: t.Callable[..., ShoppingItem],
+    recipe_factory: t.Callable[..., Recipe],
+) -> None:
+    shopping_list = shopping_list_factory()
+    recipe = recipe_factory(
+        title="Bread",
+        ingredients=[{"name": "Flour", "quantity": 500.0, "unit": "g"}],
+    )
+    shopping_item_factory(
+        name="Flour",
+        quantity=1.0,
+        unit="kg",
+        shopping_list=shopping_list,
+        recipe_id=recipe.id,
+    )
+
+    response = client.post(
+        f"/recipes/{shopping_list.id}/from-recipe/{recipe.id}",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    items = db_session.query(ShoppingItem).filter(ShoppingItem.list_id == shopping_list.id).all()
+    assert len(items) == 1
+    assert items[0].quantity == 1.5
+    assert items[0].unit == "kg"
+
+
+def test_add_from_recipe_scales_quantities_and_keeps_free_text_units(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    shopping_list_factory: t.Callable[..., ShoppingList],
+    recipe_factory: t.Callable[..., Recipe],
+) -> None:
+    shopping_list = shopping_list_factory()
+    recipe = recipe_factory(
+        title="Cake",
+        ingredients=[
+            {"name": "Butter", "quantity": 25.0, "unit": "dag"},
+            {"name": "Sugar", "quantity": 2.0, "unit": "łyżka"},
+            {"name": "Eggs", "quantity": 3.0, "unit": ""},
+        ],
+    )
+
+    response = client.post(
+        f"/recipes/{shopping_list.id}/from-recipe/{recipe.id}?scale=2",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    by_name = {i["name"]: i for i in response.json()}
+    assert (by_name["Butter"]["quantity"], by_name["Butter"]["unit"]) == (500.0, "g")
+    assert (by_name["Sugar"]["quantity"], by_name["Sugar"]["unit"]) == (4.0, None)
+    assert by_name["Sugar"]["note"] == "łyżka"
+    assert (by_name["Eggs"]["quantity"], by_name["Eggs"]["unit"]) == (6.0, None)
+
+
+def test_add_from_recipe_keeps_different_free_text_units_apart(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    db_session: Session,
+    shopping_list_factory: t.Callable[..., ShoppingList],
+    recipe_factory: t.Callable[..., Recipe],
+) -> None:
+    shopping_list = shopping_list_factory()
+    recipe = recipe_factory(
+        title="Cake",
+        ingredients=[
+            {"name": "Sugar", "quantity": 2.0, "unit": "łyżka"},
+            {"name": "Sugar", "quantity": 1.0, "unit": "szklanka"},
+        ],
+    )
+
+    for _ in range(2):
+        response = client.post(
+            f"/recipes/{shopping_list.id}/from-recipe/{recipe.id}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+
+    items = db_session.query(ShoppingItem).filter(ShoppingItem.list_id == shopping_list.id).all()
+    assert sorted((i.quantity, i.note) for i in items) == [(2.0, "szklanka"), (4.0, "łyżka")]
+
+
+def test_add_from_recipe_rejects_over_limit_quantities(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    db_session: Session,
+    shopping_list_factory: t.Callable[..., ShoppingList],
+    recipe_factory: t.Callable[..., Recipe],
+) -> None:
+    shopping_list = shopping_list_factory()
+    recipe = recipe_factory(
+        title="Banquet",
+        ingredients=[
+            {"name": "Salt", "quantity": 1.0, "unit": "g"},
+            {"name": "Flour", "quantity": 50.0, "unit": "kg"},
+            {"name": "Water", "quantity": 20000.0, "unit": "ml"},
+        ],
+    )
+
+    response = client.post(
+        f"/recipes/{shopping_list.id}/from-recipe/{recipe.id}?scale=100",
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+    assert "Water" in response.json()["detail"]
+    assert db_session.query(ShoppingItem).filter(ShoppingItem.list_id == shopping_list.id).count() == 0
+
+
+def test_add_from_recipe_rejects_non_positive_scale(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    shopping_list_factory: t.Callable[..., ShoppingList],
+    recipe_factory: t.Callable[..., Recipe],
+) -> None:
+    shopping_list = shopping_list_factory()
+    recipe = recipe_factory(title="Cake")
+
+    response = client.post(
+        f"/recipes/{shopping_list.id}/from-recipe/{recipe.id}?scale=0",
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+
+
 def test_add_selected_ingredients_from_recipe_to_shopping_list(
     client: TestClient,
     auth_headers: dict[str, str],
@@ -761,3 +913,89 @@ def test_patch_preserves_other_users_tags(
     assert res.status_code == 200
     tag_names = {t["name"] for t in res.json()["tags"]}
     assert "veggie" in tag_names
+
+
+def test_import_recipes_ndjson_reports_per_record_errors(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    tag_factory: t.Callable[..., list[Tag]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.routers.recipe.IMPORT_CHUNK_SIZE", 2)
+    tag = tag_factory("dinner")[0]
+    lines = [
+        json.dumps(
+            {
+                "title": "Soup",
+                "description": "Hot",
+                "ingredients": [{"name": "Water", "quantity": 1, "unit": "l"}],
+                "tag_ids": [str(tag.id), str(uuid4())],
+            }
+        ),
+        '{"title": "Broken"',
+        "",
+        json.dumps({"title": "Salad", "description": ""}),
+        json.dumps(
+            {
+                "title": "Foreign category",
+                "description": "",
+                "ingredients": [{"name": "Salt", "category_id": str(uuid4())}],
+            }
+        ),
+        json.dumps({"title": "Bread", "description": ""}),
+    ]
+
+    res = client.post("/recipes/import", content="\n".join(lines), headers=auth_headers)
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["imported"] == 3
+    assert [e["line"] for e in body["errors"]] == [2, 5]
+    assert body["errors"][1]["detail"] == "Invalid category"
+
+    recipes = {r["title"]: r for r in client.get("/recipes/", headers=auth_headers).json()}
+    assert set(recipes) == {"Soup", "Salad", "Bread"}
+    assert [i["name"] for i in recipes["Soup"]["ingredients"]] == ["Water"]
+    assert [t["name"] for t in recipes["Soup"]["tags"]] == ["dinner"]
+
+
+def test_import_lines_drop_the_rest_of_overlong_lines(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("app.recipe_import.IMPORT_MAX_LINE_BYTES", 10)
+    chunks = [b"first\nabcdef", b"ghijkl", b"mnop", b"qr\nlast", b""]
+
+    async def body() -> t.AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    async def collect() -> list[bytes]:
+        return [line async for line in iter_import_lines(body())]
+
+    # The long line is cut once the buffer passes the limit; its tail is skipped
+    assert anyio.run(collect) == [b"first", b"abcdefghijkl", b"last"]
+
+
+def test_import_recipes_reports_overlong_lines(
+    client: TestClient,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.recipe_import.IMPORT_MAX_LINE_BYTES", 100)
+    lines = [
+        json.dumps({"title": "Soup", "description": ""}),
+        json.dumps({"title": "Long", "description": "x" * 300}),
+        json.dumps({"title": "Bread", "description": ""}),
+    ]
+
+    res = client.post("/recipes/import", content="\n".join(lines), headers=auth_headers)
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["imported"] == 2
+    assert [e["line"] for e in body["errors"]] == [2]
+    assert body["errors"][0]["detail"] == "record: longer than 100 bytes"
+
+
+def test_import_recipes_requires_auth(client: TestClient) -> None:
+    res = client.post("/recipes/import", content="{}")
+
+    assert res.status_code == 401
@@ -0,0 +1,74 @@
+import json
+import typing as t
+
+import anyio
+from app.actions import list_item_rows
+from app.core.responses import fast_json
+from app.models.category import Category
+from app.models.recipe import Recipe
+from app.models.shopping_item import ShoppingItem, ShoppingList
+from app.models.tag import Tag
+from app.schemas.recipe import RecipeOut
+from app.schemas.shopping_item import ShoppingItemOut
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def _response_model_json(schema: t.Any, content: t.Any) -> t.Any:
+    """What FastAPI sends for `content` on a route with response_model=schema."""
+    field = create_model_field(name="Response", type_=schema, mode="serialization")
+
+    async def serialize() -> t.Any:
+        return await serialize_response(field=field, response_content=content)
+
+    return json.loads(bytes(JSONResponse(anyio.run(serialize)).body))
+
+
+class TestFastJson:
+    def test_matches_response_model_for_orm_objects(
+        self,
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+        tag_factory: t.Callable[..., list[Tag]],
+    ) -> None:
+        recipe_factory(
+            title="Pancakes",
+            source="https://example.com",
+            ingredients=[{"name": "Flour", "quantity": 200, "unit": "g"}, {"name": "Eggs", "quantity": 2, "unit": ""}],
+            tags=tag_factory("breakfast"),
+        )
+        recipe_factory(title="Toast")
+        recipes = db_session.scalars(select(Recipe).order_by(Recipe.title)).all()
+
+        fast = json.loads(bytes(fast_json(list[RecipeOut], recipes).body))
+
+        assert fast == _response_model_json(list[RecipeOut], recipes)
+        assert [r["title"] for r in fast] == ["Pancakes", "Toast"]
+
+    def test_matches_response_model_for_item_rows(
+        self,
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        category = db_session.scalars(select(Category).where(Category.user_id.is_(None))).first()
+        assert category is not None
+        item = shopping_item_factory(name="Milk", quantity=1.5, shopping_list=shopping_list)
+        item.category_id = category.id
+        item.note = "lactose-free"
+        shopping_item_factory(
+            name="Flour", unit="kg", shopping_list=shopping_list, recipe_id=recipe_factory(title="Bread").id
+        )
+        db_session.flush()
+        rows = list_item_rows(db_session, ShoppingItem.list_id == shopping_list.id)
+
+        fast = json.loads(bytes(fast_json(list[ShoppingItemOut], rows).body))
+
+        assert fast == _response_model_json(list[ShoppingItemOut], rows)
+        assert fast[1]["category"]["name"] == category.name
+        assert fast[0]["recipe_title"] == "Bread"
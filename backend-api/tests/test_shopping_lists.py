@@ -1,12 +1,21 @@
 import typing as t
+from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
 
 import pytest
+from app.actions import delete_list_items, get_list_for_user, user_can_access_list
+from app.category_hints import category_hints
+from app.core.idempotency import response_cache
+from app.core.maintenance import purge_idempotency_keys
+from app.models.access import RESOURCE_SHOPPING_LIST, ResourceAccess
+from app.models.category import Category
 from app.models.recipe import Recipe
 from app.models.shopping_item import ShoppingItem, ShoppingList
+from app.models.sync import IdempotencyKey
 from app.models.user import User
 from app.schemas.shopping_item import VALID_UNITS
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 
@@ -292,6 +301,26 @@ class TestShoppingLists:
         deleted = db_session.get(ShoppingList, shopping_list.id)
         assert deleted is None
 
+    def test_delete_shopping_list_cascades_items(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        item = shopping_item_factory(shopping_list=shopping_list)
+        item_id = item.id
+
+        response = client.delete(
+            f"/shopping-lists/{shopping_list.id}", headers=auth_headers
+        )
+
+        assert response.status_code == 204
+        db_session.expunge_all()
+        assert db_session.get(ShoppingItem, item_id) is None
+
     def test_delete_shopping_list_404_when_not_found(
         self,
         client: TestClient,
@@ -365,6 +394,43 @@ class TestShoppingLists:
         names = {item["name"] for item in body}
         assert names == {"Milk", "Bread"}
 
+    def test_get_shopping_list_items_projects_recipe_and_category(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        recipe = recipe_factory(title="Pancakes", description="x" * 5000)
+        category = Category(name="Dairy", icon="🥛")
+        db_session.add(category)
+        db_session.flush()
+        item = shopping_item_factory(name="Milk", recipe_id=recipe.id, shopping_list=shopping_list)
+        item.category_id = category.id
+        item.note = "lactose free"
+        shopping_item_factory(name="Bread", unit="szt.", shopping_list=shopping_list)
+        db_session.commit()
+
+        response = client.get(
+            f"/shopping-lists/{shopping_list.id}/items", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        milk, bread = response.json()  # uncategorized items come last
+        assert bread["recipe_title"] is None
+        assert bread["category"] is None
+        assert milk["recipe_title"] == "Pancakes"
+        assert milk["note"] == "lactose free"
+        assert milk["category"] == {
+            "id": str(category.id),
+            "name": "Dairy",
+            "icon": "🥛",
+            "is_system": True,
+        }
+
     def test_get_shopping_list_items_returns_for_shared_user(
         self,
         client: TestClient,
@@ -1060,6 +1126,27 @@ class TestShoppingLists:
         assert remaining[0].id == manual_item.id
         assert remaining[0].recipe_id is None
 
+    def test_delete_list_items_returns_deleted_ids(
+        self,
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        other_list = shopping_list_factory()
+        checked = shopping_item_factory(
+            name="Bread", checked=True, shopping_list=shopping_list
+        )
+        shopping_item_factory(name="Milk", checked=False, shopping_list=shopping_list)
+        untouched = shopping_item_factory(
+            name="Bread", checked=True, shopping_list=other_list
+        )
+
+        deleted = delete_list_items(db_session, shopping_list.id, checked_only=True)
+
+        assert deleted == [checked.id]
+        assert db_session.get(ShoppingItem, untouched.id) is not None
+
     def test_remove_recipe_from_list_no_items_is_noop(
         self,
         client: TestClient,
@@ -1306,3 +1393,570 @@ class TestUnshareShoppingList:
         )
 
         assert res.status_code == 404
+
+
+class TestBulkUpdateItems:
+    def test_updates_many_items_and_reports_per_op(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        milk = shopping_item_factory(name="Milk", shopping_list=shopping_list)
+        bread = shopping_item_factory(name="Bread", shopping_list=shopping_list)
+        eggs = shopping_item_factory(name="Eggs", quantity=6, shopping_list=shopping_list)
+        missing_id = uuid4()
+
+        res = client.patch(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={
+                "ops": [
+                    {"id": str(milk.id), "checked": True},
+                    {"id": str(bread.id), "checked": True},
+                    {"id": str(eggs.id), "quantity": 12},
+                    {"id": str(missing_id), "checked": True},
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 200
+        assert [r["status"] for r in res.json()] == [
+            "updated",
+            "updated",
+            "updated",
+            "not_found",
+        ]
+        db_session.expire_all()
+        milk_row = db_session.get(ShoppingItem, milk.id)
+        bread_row = db_session.get(ShoppingItem, bread.id)
+        eggs_row = db_session.get(ShoppingItem, eggs.id)
+        assert milk_row is not None and bread_row is not None and eggs_row is not None
+        assert milk_row.checked is True
+        assert bread_row.checked is True
+        assert eggs_row.quantity == 12
+        assert eggs_row.checked is False
+
+    def test_later_ops_for_same_item_win(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        item = shopping_item_factory(name="Milk")
+
+        res = client.patch(
+            f"/shopping-lists/{item.list_id}/items",
+            json={
+                "ops": [
+                    {"id": str(item.id), "checked": True},
+                    {"id": str(item.id), "checked": False},
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 200
+        db_session.expire_all()
+        row = db_session.get(ShoppingItem, item.id)
+        assert row is not None
+        assert row.checked is False
+
+    def test_does_not_touch_items_from_other_lists(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        foreign_item = shopping_item_factory(name="Milk")
+
+        res = client.patch(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"ops": [{"id": str(foreign_item.id), "checked": True}]},
+            headers=auth_headers,
+        )
+
+        assert res.json()[0]["status"] == "not_found"
+        db_session.expire_all()
+        row = db_session.get(ShoppingItem, foreign_item.id)
+        assert row is not None
+        assert row.checked is False
+
+    def test_invalid_category_is_reported_without_aborting(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        milk = shopping_item_factory(name="Milk", shopping_list=shopping_list)
+        bread = shopping_item_factory(name="Bread", shopping_list=shopping_list)
+
+        res = client.patch(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={
+                "ops": [
+                    {"id": str(milk.id), "category_id": str(uuid4())},
+                    {"id": str(bread.id), "checked": True},
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert [r["status"] for r in res.json()] == ["invalid", "updated"]
+        db_session.expire_all()
+        row = db_session.get(ShoppingItem, bread.id)
+        assert row is not None
+        assert row.checked is True
+
+    def test_invalid_category_rejects_only_its_own_op(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        item = shopping_item_factory(name="Milk")
+
+        res = client.patch(
+            f"/shopping-lists/{item.list_id}/items",
+            json={
+                "ops": [
+                    {"id": str(item.id), "checked": True},
+                    {"id": str(item.id), "category_id": str(uuid4())},
+                    {"id": str(item.id), "quantity": 3},
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert [r["status"] for r in res.json()] == ["updated", "invalid", "updated"]
+        db_session.expire_all()
+        row = db_session.get(ShoppingItem, item.id)
+        assert row is not None
+        assert (row.checked, row.quantity, row.category_id) == (True, 3, None)
+
+    def test_404_for_list_of_other_user(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        other_list = shopping_list_factory(user=user_factory())
+
+        res = client.patch(
+            f"/shopping-lists/{other_list.id}/items",
+            json={"ops": [{"id": str(uuid4()), "checked": True}]},
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 404
+
+
+class TestListAccess:
+    def test_owner_and_shared_user_have_access(
+        self,
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        owner = user_factory()
+        member = user_factory()
+        stranger = user_factory()
+        shopping_list = shopping_list_factory(user=owner)
+        shopping_list.shared_with_users.append(member)
+        db_session.flush()
+
+        assert user_can_access_list(db_session, shopping_list.id, owner.id)
+        assert user_can_access_list(db_session, shopping_list.id, member.id)
+        assert not user_can_access_list(db_session, shopping_list.id, stranger.id)
+        assert get_list_for_user(db_session, shopping_list.id, member.id) is shopping_list
+        assert get_list_for_user(db_session, shopping_list.id, stranger.id) is None
+
+    def test_answer_is_refreshed_after_commit(
+        self,
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        member = user_factory()
+        shopping_list = shopping_list_factory(user=user_factory())
+        assert not user_can_access_list(db_session, shopping_list.id, member.id)
+
+        shopping_list.shared_with_users.append(member)
+        db_session.commit()
+
+        assert user_can_access_list(db_session, shopping_list.id, member.id)
+
+
+class TestResourceAccessIndex:
+    def _access_rows(self, db_session: Session, list_id: UUID) -> dict[UUID, str]:
+        rows = db_session.query(ResourceAccess).filter_by(
+            resource_type=RESOURCE_SHOPPING_LIST, resource_id=list_id
+        )
+        return {row.user_id: row.role for row in rows}
+
+    def test_share_and_unshare_maintain_listing(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+    ) -> None:
+        member = user_factory(email="member@example.com")
+        list_id = UUID(
+            client.post("/shopping-lists", json={"name": "Household"}, headers=auth_headers).json()["id"]
+        )
+        owner = db_session.query(User).filter_by(email="test@example.com").one()
+
+        client.post(
+            f"/shopping-lists/{list_id}/share",
+            json={"shared_with_email": "member@example.com"},
+            headers=auth_headers,
+        )
+        assert self._access_rows(db_session, list_id) == {
+            owner.id: "owner",
+            member.id: "member",
+        }
+
+        client.delete(f"/shopping-lists/{list_id}/share/{member.id}", headers=auth_headers)
+        assert self._access_rows(db_session, list_id) == {owner.id: "owner"}
+
+    def test_delete_list_drops_access_rows(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        shopping_list.shared_with_users.append(user_factory())
+        db_session.commit()
+        list_id = shopping_list.id
+
+        client.delete(f"/shopping-lists/{list_id}", headers=auth_headers)
+
+        assert self._access_rows(db_session, list_id) == {}
+
+    def test_listing_hides_unshared_list(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        current_user = db_session.query(User).filter_by(email="test@example.com").one()
+        shopping_list = shopping_list_factory(user=user_factory(), name="Theirs")
+        shopping_list.shared_with_users.append(current_user)
+        db_session.commit()
+        assert [lst["name"] for lst in client.get("/shopping-lists", headers=auth_headers).json()] == ["Theirs"]
+
+        shopping_list.shared_with_users.remove(current_user)
+        db_session.commit()
+
+        assert client.get("/shopping-lists", headers=auth_headers).json() == []
+
+
+class TestCategoryHints:
+    @pytest.fixture(autouse=True)
+    def empty_hints(self) -> t.Iterator[None]:
+        category_hints.clear()
+        yield
+        category_hints.clear()
+
+    def test_new_item_gets_category_from_recipe_history(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        category = Category(name="Baking", icon="🥖")
+        db_session.add(category)
+        recipe = recipe_factory(ingredients=[{"name": "Flour", "quantity": 500, "unit": "g"}])
+        recipe.ingredients[0].category_id = category.id
+        db_session.flush()
+        shopping_list = shopping_list_factory()
+
+        res = client.post(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"name": "flour", "quantity": 1, "unit": "kg"},
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 200
+        assert res.json()["category_id"] == str(category.id)
+
+    def test_offline_adds_are_categorized(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        dairy = Category(name="Dairy")
+        db_session.add(dairy)
+        db_session.flush()
+        shopping_list = shopping_list_factory()
+        client.post(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"name": "Milk", "quantity": 1, "unit": "l", "category_id": str(dairy.id)},
+            headers=auth_headers,
+        )
+
+        res = client.post(
+            "/sync",
+            json={
+                "mutations": [
+                    {
+                        "op": "add_item",
+                        "idempotency_key": str(uuid4()),
+                        "list_id": str(shopping_list_factory().id),
+                        "item_id": str(uuid4()),
+                        "item": {"name": "milk", "quantity": 2, "unit": "l"},
+                    }
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert [i["category_id"] for i in res.json()["changed"]] == [str(dairy.id)] * 2
+
+    def test_picked_category_is_reused_for_later_adds(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        dairy, fridge = Category(name="Dairy"), Category(name="Fridge")
+        db_session.add_all([dairy, fridge])
+        db_session.flush()
+        first_list, second_list = shopping_list_factory(), shopping_list_factory()
+        url = f"/shopping-lists/{first_list.id}/items"
+
+        client.post(url, json={"name": "Milk", "quantity": 1, "unit": "l"}, headers=auth_headers)
+        client.post(
+            url,
+            json={"name": "Butter", "quantity": 1, "unit": "szt.", "category_id": str(dairy.id)},
+            headers=auth_headers,
+        )
+        butter = client.get(url, headers=auth_headers).json()[0]
+        client.patch(f"{url}/{butter['id']}", json={"category_id": str(fridge.id)}, headers=auth_headers)
+
+        res = client.post(
+            f"/shopping-lists/{second_list.id}/items",
+            json={"name": "butter", "quantity": 2, "unit": "szt."},
+            headers=auth_headers,
+        )
+
+        assert res.json()["category_id"] == str(fridge.id)
+
+    def test_bulk_patch_and_sync_update_hints(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        dairy, bakery = Category(name="Dairy"), Category(name="Bakery")
+        db_session.add_all([dairy, bakery])
+        db_session.flush()
+        shopping_list = shopping_list_factory()
+        cheese = shopping_item_factory(name="Cheese", shopping_list=shopping_list)
+        user = db_session.query(User).filter_by(email="test@example.com").one()
+        category_hints.guess(db_session, user.id, "cheese")  # load the user's map
+
+        client.patch(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"ops": [{"id": str(cheese.id), "category_id": str(dairy.id)}]},
+            headers=auth_headers,
+        )
+        client.post(
+            "/sync",
+            json={
+                "mutations": [
+                    {
+                        "op": "add_item",
+                        "idempotency_key": str(uuid4()),
+                        "list_id": str(shopping_list.id),
+                        "item_id": str(uuid4()),
+                        "item": {"name": "Rolls", "quantity": 4, "category_id": str(bakery.id)},
+                    }
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert category_hints.guess(db_session, user.id, "cheese") == dairy.id
+        assert category_hints.guess(db_session, user.id, "rolls") == bakery.id
+
+    def test_stale_guess_is_dropped(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        user = db_session.query(User).filter_by(email="test@example.com").one()
+        shopping_list = shopping_list_factory()
+        category_hints.guess(db_session, user.id, "tea")
+        category_hints.remember(user.id, "Tea", uuid4())
+
+        res = client.post(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"name": "Tea", "quantity": 1, "unit": "op."},
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 200
+        assert res.json()["category_id"] is None
+
+
+class TestIdempotencyKey:
+    def test_retry_replays_response_without_adding_again(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        headers = {**auth_headers, "Idempotency-Key": "add-milk-1"}
+        payload = {"name": "Milk", "quantity": 1, "unit": "l"}
+
+        first = client.post(f"/shopping-lists/{shopping_list.id}/items", json=payload, headers=headers)
+        response_cache.clear()  # force the second lookup through the table
+        retry = client.post(f"/shopping-lists/{shopping_list.id}/items", json=payload, headers=headers)
+
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        quantities = db_session.scalars(
+            select(ShoppingItem.quantity).where(ShoppingItem.list_id == shopping_list.id)
+        ).all()
+        assert quantities == [1.0]
+
+    def test_key_reused_for_another_request_is_rejected(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        first_list = shopping_list_factory()
+        second_list = shopping_list_factory()
+        headers = {**auth_headers, "Idempotency-Key": "reused"}
+        payload = {"name": "Milk", "quantity": 1, "unit": "l"}
+
+        client.post(f"/shopping-lists/{first_list.id}/items", json=payload, headers=headers)
+        res = client.post(f"/shopping-lists/{second_list.id}/items", json=payload, headers=headers)
+
+        assert res.status_code == 422
+
+    def test_sync_mutation_key_is_rejected(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        mutation = {
+            "op": "add_item",
+            "idempotency_key": "shared-key",
+            "list_id": str(shopping_list.id),
+            "item_id": str(uuid4()),
+            "item": {"name": "Bread", "quantity": 1, "unit": "szt."},
+        }
+        client.post("/sync", json={"mutations": [mutation]}, headers=auth_headers)
+
+        res = client.post(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"name": "Milk", "quantity": 1, "unit": "l"},
+            headers={**auth_headers, "Idempotency-Key": "shared-key"},
+        )
+        replay = client.post("/sync", json={"mutations": [mutation]}, headers=auth_headers)
+
+        assert res.status_code == 409
+        assert replay.status_code == 200
+
+    def test_header_key_is_rejected_by_sync(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        client.post(
+            f"/shopping-lists/{shopping_list.id}/items",
+            json={"name": "Milk", "quantity": 1, "unit": "l"},
+            headers={**auth_headers, "Idempotency-Key": "shared-key"},
+        )
+
+        res = client.post(
+            "/sync",
+            json={
+                "mutations": [
+                    {
+                        "op": "delete_item",
+                        "idempotency_key": "shared-key",
+                        "list_id": str(shopping_list.id),
+                        "item_id": str(uuid4()),
+                    }
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert res.status_code == 409
+
+    def test_failed_request_releases_key(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+    ) -> None:
+        headers = {**auth_headers, "Idempotency-Key": "missing-list"}
+
+        res = client.post(
+            f"/shopping-lists/{uuid4()}/items",
+            json={"name": "Milk", "quantity": 1, "unit": "l"},
+            headers=headers,
+        )
+
+        assert res.status_code == 404
+        assert db_session.scalars(select(IdempotencyKey)).all() == []
+
+    def test_purge_removes_expired_keys(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+    ) -> None:
+        user = db_session.query(User).filter_by(email="test@example.com").one()
+        now = datetime.now(timezone.utc)
+        db_session.add_all(
+            [
+                IdempotencyKey(user_id=user.id, key="old", created_at=now - timedelta(days=2)),
+                IdempotencyKey(user_id=user.id, key="fresh", created_at=now),
+            ]
+        )
+        db_session.commit()
+
+        deleted = purge_idempotency_keys(db_session, now=now, batch_size=1)
+
+        assert deleted == 1
+        assert db_session.scalars(select(IdempotencyKey.key)).all() == ["fresh"]
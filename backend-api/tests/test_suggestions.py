@@ -84,7 +84,7 @@ class TestSuggestions:
         db_session.add(other_list)
         db_session.flush()
 
-        name_norm, unit_norm = normalize_key("secretitem", "kg")
+        _, unit_norm = normalize_key("secretitem", "kg")
         db_session.add(
             ShoppingItem(
                 user_id=other.id,
@@ -92,7 +92,6 @@ class TestSuggestions:
                 name="secretitem",
                 quantity=1.0,
                 unit="kg",
-                name_norm=name_norm,
                 unit_norm=unit_norm,
             )
         )
@@ -108,3 +107,22 @@ class TestSuggestions:
         assert res.status_code == 200
         assert "secretitem" not in res.json()
         assert "secretingredient" not in res.json()
+
+    def test_groups_spellings_of_the_same_product(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+        recipe_factory: t.Callable[..., Recipe],
+    ) -> None:
+        item = shopping_item_factory(name="Marchew")
+        recipe = recipe_factory(ingredients=[{"name": " marchew ", "quantity": 2, "unit": "kg"}])
+        shopping_item_factory(name="marchewka")
+
+        assert recipe.ingredients[0].product_id == item.product_id
+
+        res = client.get("/suggestions/?q=MAR", headers=auth_headers)
+
+        assert res.status_code == 200
+        assert len(res.json()) == 2
+        assert res.json()[0] in {"Marchew", " marchew "}
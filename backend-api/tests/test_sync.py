@@ -0,0 +1,307 @@
+import typing as t
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from app.core.maintenance import purge_sync_changes
+from app.models.category import Category
+from app.models.recipe import Recipe
+from app.models.shopping_item import ShoppingItem, ShoppingList
+from app.models.sync import IdempotencyKey
+from app.models.user import User
+from app.schemas.sync import AddItemMutation, SyncMutation, SyncMutationResult
+from app.sync import _apply_once
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+def _add(list_id: t.Any, name: str, quantity: float = 1.0, item_id: t.Any = None) -> dict[str, t.Any]:
+    return {
+        "op": "add_item",
+        "idempotency_key": str(uuid4()),
+        "list_id": str(list_id),
+        "item_id": str(item_id or uuid4()),
+        "item": {"name": name, "quantity": quantity, "unit": "l"},
+    }
+
+
+class TestSync:
+    def test_first_sync_returns_all_accessible_items(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        item = shopping_item_factory(name="Milk")
+
+        res = client.post("/sync", json={"last_revision": 0}, headers=auth_headers)
+
+        assert res.status_code == 200
+        body = res.json()
+        assert [i["id"] for i in body["changed"]] == [str(item.id)]
+        assert body["changed"][0]["list_id"] == str(item.list_id)
+        assert body["deleted"] == []
+
+    def test_adds_use_client_ids_and_merge_into_existing_items(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        milk = shopping_item_factory(name="Milk", quantity=1.0, shopping_list=shopping_list)
+        client_id = uuid4()
+        mutations = [_add(shopping_list.id, "Bread", item_id=client_id), _add(shopping_list.id, " milk ", 2.0)]
+
+        first = client.post("/sync", json={"mutations": mutations}, headers=auth_headers).json()
+        retry = client.post("/sync", json={"mutations": mutations}, headers=auth_headers).json()
+
+        assert [(r["status"], r["item_id"]) for r in first["results"]] == [
+            ("applied", str(client_id)),
+            ("merged", str(milk.id)),
+        ]
+        assert retry["results"] == first["results"]
+        items = {i["name"]: i for i in retry["changed"]}
+        assert items["Milk"]["quantity"] == 3.0
+        assert items["Bread"]["id"] == str(client_id)
+
+    def test_returns_deltas_since_last_revision(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        untouched = shopping_item_factory(name="Eggs", shopping_list=shopping_list)
+        gone = shopping_item_factory(name="Butter", shopping_list=shopping_list)
+        revision = client.post("/sync", json={}, headers=auth_headers).json()["revision"]
+        new_id = uuid4()
+
+        res = client.post(
+            "/sync",
+            json={
+                "last_revision": revision,
+                "mutations": [
+                    _add(shopping_list.id, "Juice", item_id=new_id),
+                    {
+                        "op": "update_item",
+                        "idempotency_key": str(uuid4()),
+                        "list_id": str(shopping_list.id),
+                        "item_id": str(new_id),
+                        "patch": {"checked": True},
+                    },
+                    {
+                        "op": "delete_item",
+                        "idempotency_key": str(uuid4()),
+                        "list_id": str(shopping_list.id),
+                        "item_id": str(gone.id),
+                    },
+                ],
+            },
+            headers=auth_headers,
+        )
+
+        body = res.json()
+        assert [r["status"] for r in body["results"]] == ["applied", "applied", "applied"]
+        assert body["revision"] > revision
+        assert [(i["id"], i["checked"]) for i in body["changed"]] == [(str(new_id), True)]
+        assert body["deleted"] == [str(gone.id)]
+        assert str(untouched.id) not in {i["id"] for i in body["changed"]}
+
+    def test_cursor_behind_purged_changes_gets_a_snapshot(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        shopping_list = shopping_list_factory()
+        shopping_item_factory(name="Eggs", shopping_list=shopping_list)
+        stale = client.post("/sync", json={}, headers=auth_headers).json()["revision"]
+        shopping_item_factory(name="Milk", shopping_list=shopping_list)
+        shopping_item_factory(name="Bread", shopping_list=shopping_list)
+        fresh = client.post("/sync", json={}, headers=auth_headers).json()["revision"]
+
+        deleted = purge_sync_changes(db_session, now=datetime.now(timezone.utc) + timedelta(days=365))
+
+        assert deleted > 0
+        snapshot = client.post("/sync", json={"last_revision": stale}, headers=auth_headers).json()
+        assert snapshot["reset"] is True
+        assert sorted(i["name"] for i in snapshot["changed"]) == ["Bread", "Eggs", "Milk"]
+        delta = client.post("/sync", json={"last_revision": fresh}, headers=auth_headers).json()
+        assert delta["reset"] is False
+        assert delta["changed"] == []
+
+    def test_mutations_on_foreign_lists_are_not_applied(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        other = user_factory(email="other@example.com")
+        foreign = shopping_list_factory(user=other)
+
+        res = client.post(
+            "/sync", json={"mutations": [_add(foreign.id, "Milk")]}, headers=auth_headers
+        )
+
+        result = res.json()["results"][0]
+        assert result["status"] == "not_found"
+        assert res.json()["changed"] == []
+
+    def test_add_reusing_a_foreign_item_id_is_a_conflict(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        foreign = shopping_item_factory(name="Caviar", shopping_list=shopping_list_factory(user=user_factory()))
+        mine = shopping_item_factory(name="Milk")
+
+        mutations = [_add(mine.list_id, "Caviar", item_id=foreign.id), _add(mine.list_id, "Milk", item_id=mine.id)]
+
+        res = client.post("/sync", json={"mutations": mutations}, headers=auth_headers)
+
+        assert [(r["status"], r["item_id"]) for r in res.json()["results"]] == [
+            ("conflict", None),
+            ("duplicate", str(mine.id)),
+        ]
+
+    def test_reports_deleted_and_unshared_lists(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        me = db_session.query(User).filter_by(email="test@example.com").one()
+        own = shopping_list_factory()
+        shared = shopping_list_factory(user=user_factory(email="other@example.com"))
+        shared.shared_with_users.append(me)
+        db_session.flush()
+        shopping_item_factory(name="Milk", shopping_list=own)
+        revision = client.post("/sync", json={}, headers=auth_headers).json()["revision"]
+
+        client.delete(f"/shopping-lists/{own.id}", headers=auth_headers)
+        shared.shared_with_users.remove(me)
+        db_session.flush()
+        body = client.post("/sync", json={"last_revision": revision}, headers=auth_headers).json()
+
+        assert sorted(body["lists_removed"]) == sorted([str(own.id), str(shared.id)])
+        assert body["changed"] == []
+        assert body["deleted"] == []
+
+    def test_newly_shared_list_returns_all_its_items(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        user_factory: t.Callable[..., User],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        me = db_session.query(User).filter_by(email="test@example.com").one()
+        shared = shopping_list_factory(user=user_factory(email="other@example.com"))
+        shopping_item_factory(name="Eggs", shopping_list=shared)
+        revision = client.post("/sync", json={}, headers=auth_headers).json()["revision"]
+
+        shared.shared_with_users.append(me)
+        db_session.flush()
+        body = client.post("/sync", json={"last_revision": revision}, headers=auth_headers).json()
+
+        assert [(i["name"], i["list_id"]) for i in body["changed"]] == [("Eggs", str(shared.id))]
+        assert body["lists_removed"] == []
+
+    def test_deleting_a_recipe_or_category_reports_affected_items(
+        self,
+        client: TestClient,
+        auth_headers: dict[str, str],
+        db_session: Session,
+        recipe_factory: t.Callable[..., Recipe],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+    ) -> None:
+        me = db_session.query(User).filter_by(email="test@example.com").one()
+        recipe = recipe_factory()
+        category = Category(user_id=me.id, name="Mine")
+        db_session.add(category)
+        db_session.flush()
+        from_recipe = shopping_item_factory(name="Flour", recipe_id=recipe.id)
+        categorized = shopping_item_factory(name="Salt")
+        categorized.category_id = category.id
+        db_session.flush()
+        revision = client.post("/sync", json={}, headers=auth_headers).json()["revision"]
+
+        client.delete(f"/recipes/{recipe.id}", headers=auth_headers)
+        client.delete(f"/categories/{category.id}", headers=auth_headers)
+        body = client.post("/sync", json={"last_revision": revision}, headers=auth_headers).json()
+
+        changed = {i["id"]: i for i in body["changed"]}
+        assert changed.keys() == {str(from_recipe.id), str(categorized.id)}
+        assert changed[str(from_recipe.id)]["recipe_id"] is None
+        assert changed[str(categorized.id)]["category"] is None
+
+    def test_retry_that_loses_the_key_race_replays_the_winner(
+        self,
+        db_session: Session,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+    ) -> None:
+        me = db_session.query(User).filter_by(email="test@example.com").one()
+        mutation = AddItemMutation.model_validate(_add(shopping_list_factory().id, "Milk"))
+        # Committed by a concurrent request after this one found no stored result
+        winner = SyncMutationResult(
+            idempotency_key=mutation.idempotency_key, status="applied", item_id=mutation.item_id
+        )
+        db_session.add(
+            IdempotencyKey(
+                user_id=me.id,
+                key=mutation.idempotency_key,
+                created_at=datetime.now(timezone.utc),
+                response_body=winner.model_dump_json(),
+            )
+        )
+        db_session.flush()
+
+        result = _apply_once(db_session, me.id, mutation, {})
+
+        assert result == winner
+        assert db_session.query(ShoppingItem).count() == 0
+
+    def test_changes_commit_with_their_results(
+        self,
+        db_session: Session,
+        auth_headers: dict[str, str],
+        shopping_list_factory: t.Callable[..., ShoppingList],
+        shopping_item_factory: t.Callable[..., ShoppingItem],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        me = db_session.query(User).filter_by(email="test@example.com").one()
+        shopping_list = shopping_list_factory()
+        item = shopping_item_factory(name="Eggs", shopping_list=shopping_list)
+        target = {"list_id": str(shopping_list.id), "item_id": str(item.id)}
+        mutations = TypeAdapter(list[SyncMutation]).validate_python(
+            [
+                _add(shopping_list.id, "Milk"),
+                {"op": "update_item", "idempotency_key": str(uuid4()), "patch": {"name": "Butter"}, **target},
+                {"op": "delete_item", "idempotency_key": str(uuid4()), **target},
+            ]
+        )
+        # Keys still without a result at each COMMIT
+        pending: list[int] = []
+        count_pending = select(func.count()).where(IdempotencyKey.response_body.is_(None))
+        monkeypatch.setattr(db_session, "commit", lambda: pending.append(db_session.scalar(count_pending) or 0))
+
+        results = [_apply_once(db_session, me.id, mutation, {}).status for mutation in mutations]
+
+        assert results == ["applied", "applied", "applied"]
+        assert pending == [0, 0, 0]
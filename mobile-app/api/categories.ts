@@ -17,5 +17,10 @@ export function useCategoriesApi() {
       }),
     deleteCategory: (id: string) =>
       api<void>(`/categories/${id}`, { method: 'DELETE' }),
+    setCategoryOrder: (categoryIds: string[]) =>
+      api<CategoryOut[]>('/categories/order', {
+        method: 'PUT',
+        body: JSON.stringify({ category_ids: categoryIds }),
+      }),
   };
 }
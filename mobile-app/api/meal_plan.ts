@@ -1,4 +1,9 @@
-import type { MealPlanEntry, MealSlot } from 'types/types';
+import type {
+  MealPlanEntry,
+  MealPlanTemplate,
+  MealPlanTemplateIn,
+  MealSlot,
+} from 'types/types';
 import { useApi } from './useApi';
 
 export function useMealPlanApi() {
@@ -8,13 +13,46 @@ export function useMealPlanApi() {
     getWeek: (weekStart: string) =>
       api<MealPlanEntry[]>(`/meal-plan/?week_start=${weekStart}`),
 
+    // Both dates inclusive; the server caps the range at 62 days
+    getRange: (from: string, to: string) =>
+      api<MealPlanEntry[]>(`/meal-plan/?from=${from}&to=${to}`),
+
     assignRecipe: (date: string, slot: MealSlot, recipeId: string) =>
       api<MealPlanEntry>(`/meal-plan/${date}/${slot}`, {
         method: 'PUT',
         body: JSON.stringify({ recipe_id: recipeId }),
       }),
 
+    assignRecipes: (
+      entries: { date: string; meal_slot: MealSlot; recipe_id: string }[],
+    ) =>
+      api<MealPlanEntry[]>('/meal-plan/batch', {
+        method: 'PUT',
+        body: JSON.stringify({ entries }),
+      }),
+
+    copyWeek: (sourceWeekStart: string, targetWeekStart: string) =>
+      api<MealPlanEntry[]>('/meal-plan/copy-week', {
+        method: 'POST',
+        body: JSON.stringify({
+          source_week_start: sourceWeekStart,
+          target_week_start: targetWeekStart,
+        }),
+      }),
+
+    // Clears a template occurrence for that date only
     removeRecipe: (date: string, slot: MealSlot) =>
       api<void>(`/meal-plan/${date}/${slot}`, { method: 'DELETE' }),
+
+    getTemplates: () => api<MealPlanTemplate[]>('/meal-plan/templates'),
+
+    createTemplate: (data: MealPlanTemplateIn) =>
+      api<MealPlanTemplate>('/meal-plan/templates', {
+        method: 'POST',
+        body: JSON.stringify(data),
+      }),
+
+    deleteTemplate: (id: string) =>
+      api<void>(`/meal-plan/templates/${id}`, { method: 'DELETE' }),
   };
 }
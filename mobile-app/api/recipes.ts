@@ -1,6 +1,8 @@
 import { RecipeIn, RecipeOut, ShoppingItemOut } from '../types/types';
 import { useApi } from './useApi';
 
+const scaleQuery = (scale?: number) =>
+  scale !== undefined && scale !== 1 ? `?scale=${scale}` : '';
 
 export function useRecipesApi() {
   const api = useApi();
@@ -29,17 +31,29 @@ export function useRecipesApi() {
       api<void>(`/recipes/${recipeId}/share/${userId}`, {
         method: "DELETE",
       }),
-    addFromRecipe: (listId: string, recipeId: string) =>
-      api<ShoppingItemOut[]>(`/recipes/${listId}/from-recipe/${recipeId}`, {
-        method: 'POST',
-      }),
+    addFromRecipe: (
+      listId: string,
+      recipeId: string,
+      idempotencyKey?: string,
+      scale?: number,
+    ) =>
+      api<ShoppingItemOut[]>(
+        `/recipes/${listId}/from-recipe/${recipeId}${scaleQuery(scale)}`,
+        {
+          method: 'POST',
+          headers: idempotencyKey
+            ? { 'Idempotency-Key': idempotencyKey }
+            : undefined,
+        },
+      ),
     addSelectedIngredientsToList: (
       recipeId: string,
       listId: string,
       ingredientIds: string[],
+      scale?: number,
     ) =>
       api<ShoppingItemOut[]>(
-        `/recipes/${recipeId}/shopping-lists/${listId}/items`,
+        `/recipes/${recipeId}/shopping-lists/${listId}/items${scaleQuery(scale)}`,
         {
           method: 'POST',
           body: JSON.stringify({ ingredient_ids: ingredientIds }),
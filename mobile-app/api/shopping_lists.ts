@@ -1,8 +1,12 @@
 import type {
+  ShoppingItemBulkOp,
+  ShoppingItemBulkResult,
   ShoppingItemIn,
   ShoppingItemOut,
   ShoppingListIn,
   ShoppingListOut,
+  SyncMutation,
+  SyncResponse,
 } from 'types/types';
 import { useApi } from './useApi';
 
@@ -55,10 +59,12 @@ export function useShoppingListApi() {
     getShoppingListItems: (listId: string) =>
       api<ShoppingItemOut[]>(`${base}/${listId}/items`),
 
-    addShoppingItem: (listId: string, item: ShoppingItemIn) =>
+    // Pass the same idempotencyKey when retrying, so the item is not added twice
+    addShoppingItem: (listId: string, item: ShoppingItemIn, idempotencyKey?: string) =>
       api<ShoppingItemOut>(`${base}/${listId}/items`, {
         method: "POST",
         body: JSON.stringify(item),
+        headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
       }),
 
     patchShoppingItem: (
@@ -71,6 +77,12 @@ export function useShoppingListApi() {
         body: JSON.stringify(patch),
       }),
 
+    bulkPatchShoppingItems: (listId: string, ops: ShoppingItemBulkOp[]) =>
+      api<ShoppingItemBulkResult[]>(`${base}/${listId}/items`, {
+        method: "PATCH",
+        body: JSON.stringify({ ops }),
+      }),
+
     deleteShoppingItem: (listId: string, itemId: string) =>
       api<void>(`${base}/${listId}/items/${itemId}`, {
         method: "DELETE",
@@ -86,5 +98,13 @@ export function useShoppingListApi() {
       api<void>(`${base}/${listId}/recipes/${recipeId}`, {
         method: "DELETE",
       }),
+
+    // ---------- Offline sync ----------
+
+    syncShoppingItems: (lastRevision: number, mutations: SyncMutation[]) =>
+      api<SyncResponse>("/sync", {
+        method: "POST",
+        body: JSON.stringify({ last_revision: lastRevision, mutations }),
+      }),
   };
 }
\ No newline at end of file
@@ -31,6 +31,17 @@ function getWeekDays(weekStart: Date): Date[] {
   });
 }
 
+function addDays(d: Date, days: number): Date {
+  const result = new Date(d);
+  result.setDate(result.getDate() + days);
+  return result;
+}
+
+// One request covers the previous week and the next five, so paging
+// between weeks rarely has to wait for the network
+const PREFETCH_DAYS_BEFORE = 7;
+const PREFETCH_DAYS_AFTER = 34;
+
 function formatWeekRange(weekStart: Date): string {
   const end = new Date(weekStart);
   end.setDate(end.getDate() + 6);
@@ -54,11 +65,12 @@ const SLOTS: { key: MealSlot; label: string; icon: keyof typeof Ionicons.glyphMa
 // ── component ────────────────────────────────────────────
 
 export default function MealPlannerScreen() {
-  const { getWeek, assignRecipe, removeRecipe } = useMealPlanApi();
+  const { getRange, assignRecipe, removeRecipe } = useMealPlanApi();
   const { fetchRecipes } = useRecipesApi();
 
   const [weekOffset, setWeekOffset] = useState(0);
   const [entries, setEntries] = useState<MealPlanEntry[]>([]);
+  const [loadedRange, setLoadedRange] = useState<{ from: string; to: string } | null>(null);
   const [recipes, setRecipes] = useState<RecipeOut[]>([]);
   const [loading, setLoading] = useState(true);
 
@@ -75,19 +87,27 @@ export default function MealPlannerScreen() {
     return map;
   }, [entries]);
 
-  const loadWeek = useCallback(async (start: Date) => {
+  const loadRange = useCallback(async (start: Date) => {
+    const from = toDateStr(addDays(start, -PREFETCH_DAYS_BEFORE));
+    const to = toDateStr(addDays(start, PREFETCH_DAYS_AFTER));
     setLoading(true);
     try {
-      const data = await getWeek(toDateStr(start));
+      const data = await getRange(from, to);
       setEntries(data);
+      setLoadedRange({ from, to });
     } catch {
       // silently fail — user sees empty slots
     } finally {
       setLoading(false);
     }
-  }, [getWeek]);
+  }, [getRange]);
 
-  useEffect(() => { loadWeek(weekStart); }, [weekStart]);
+  useEffect(() => {
+    const from = toDateStr(weekStart);
+    const to = toDateStr(addDays(weekStart, 6));
+    if (loadedRange && from >= loadedRange.from && to <= loadedRange.to) return;
+    loadRange(weekStart);
+  }, [weekStart]);
 
   useEffect(() => {
     fetchRecipes().then(setRecipes).catch(() => {});
@@ -87,6 +87,25 @@ export interface MealPlanEntry {
   date: string;       // YYYY-MM-DD
   meal_slot: MealSlot;
   recipe: { id: UUID; title: string };
+  // Set on occurrences of a recurring template; not stored until edited
+  template_id?: UUID | null;
+}
+
+export interface MealPlanTemplateIn {
+  recipe_id: UUID;
+  meal_slot: MealSlot;
+  starts_on: string;         // YYYY-MM-DD, first occurrence
+  ends_on?: string | null;   // YYYY-MM-DD, inclusive
+  interval_weeks?: 1 | 2;
+}
+
+export interface MealPlanTemplate {
+  id: UUID;
+  meal_slot: MealSlot;
+  starts_on: string;
+  ends_on: string | null;
+  interval_weeks: 1 | 2;
+  recipe: { id: UUID; title: string };
 }
 
 // ---------- Shopping Items ----------
@@ -96,4 +115,52 @@ export interface ShoppingItemOut extends ShoppingItemIn {
   checked: boolean;
   recipe_title?: string | null;
   category?: CategoryOut | null;
-}
\ No newline at end of file
+}
+
+export interface ShoppingItemBulkOp {
+  id: UUID;
+  checked?: boolean;
+  quantity?: number;
+  note?: string | null;
+  category_id?: UUID | null;
+}
+
+export interface ShoppingItemBulkResult {
+  id: UUID;
+  status: 'updated' | 'not_found' | 'invalid';
+  detail?: string | null;
+}
+// ---------- Offline sync ----------
+
+interface SyncMutationBase {
+  idempotency_key: string;
+  list_id: UUID;
+  item_id: UUID; // client-generated for add_item
+}
+
+export type SyncMutation =
+  | (SyncMutationBase & { op: 'add_item'; item: ShoppingItemIn })
+  | (SyncMutationBase & { op: 'update_item'; patch: Partial<ShoppingItemIn> & { checked?: boolean } })
+  | (SyncMutationBase & { op: 'delete_item' });
+
+export interface SyncMutationResult {
+  idempotency_key: string;
+  status: 'applied' | 'merged' | 'duplicate' | 'not_found' | 'invalid' | 'conflict';
+  item_id?: UUID | null; // server ID; differs from the client ID when merged
+  detail?: string | null;
+}
+
+export interface SyncItemOut extends ShoppingItemOut {
+  list_id: UUID;
+}
+
+export interface SyncResponse {
+  revision: number;
+  results: SyncMutationResult[];
+  changed: SyncItemOut[];
+  deleted: UUID[];
+  // Lists deleted or no longer shared with the user; drop all their items
+  lists_removed: UUID[];
+  // last_revision was too old; `changed` is a full snapshot that replaces local items
+  reset: boolean;
+}